@@ -0,0 +1,117 @@
+"""
+Agregat riwayat latihan yang diperbarui inkremental (per hari, per minggu, per latihan, streak).
+
+Setiap sesi cukup di-fold sekali ke agregat (O(1) per sesi), jadi biaya per simpan tidak tergantung
+panjang riwayat. Tabel ringkasan untuk UI dibuat dari agregat dan di-cache sampai ada sesi baru.
+"""
+from datetime import date, timedelta
+
+import pandas as pd
+
+class HistoryAnalytics:
+    """
+    Agregat riwayat. fold() dipanggil sekali per sesi (urutan id); HistoryStore yang memanggilnya.
+
+    daily / weekly: {(tanggal | "YYYY-Www", latihan): [jumlah_sesi, total_repetisi]}
+    exercises:      {latihan: {"sesi", "repetisi", "terbaik", "tanggal_terbaik"}} (terbaik = rekor per sesi)
+    Streak = jumlah hari berturut-turut yang ada latihannya.
+    """
+    def __init__(self):
+        self.daily = {}
+        self.weekly = {}
+        self.exercises = {}
+        self.version = 0  # naik setiap ada sesi baru; kunci cache tabel ringkasan
+        self._dates = set()
+        self._last_date = None
+        self._run = 0
+        self._longest = 0
+        self._tables = {}
+
+    def fold(self, tanggal, exercise, count):
+        """Menambahkan satu sesi (tanggal "YYYY-MM-DD", nama latihan, repetisi) ke semua agregat."""
+        day = date.fromisoformat(tanggal)
+        year, week, _ = day.isocalendar()
+        for table, key in ((self.daily, (tanggal, exercise)), (self.weekly, (f"{year}-W{week:02d}", exercise))):
+            totals = table.get(key)
+            if totals is None:
+                table[key] = [1, count]
+            else:
+                totals[0] += 1
+                totals[1] += count
+
+        stats = self.exercises.get(exercise)
+        if stats is None:
+            self.exercises[exercise] = {"sesi": 1, "repetisi": count, "terbaik": count, "tanggal_terbaik": tanggal}
+        else:
+            stats["sesi"] += 1
+            stats["repetisi"] += count
+            if count > stats["terbaik"]:
+                stats["terbaik"], stats["tanggal_terbaik"] = count, tanggal
+
+        self._add_date(day)
+        self.version += 1
+
+    def _add_date(self, day):
+        if day in self._dates:
+            return
+        self._dates.add(day)
+        if self._last_date is None or day > self._last_date:
+            self._run = self._run + 1 if self._last_date == day - timedelta(days=1) else 1
+            self._last_date = day
+            self._longest = max(self._longest, self._run)
+        else:
+            # Tanggal lebih lama dari sesi terakhir (mis. impor CSV): satu-satunya kasus yang menghitung ulang
+            self._recompute_streaks()
+
+    def _recompute_streaks(self):
+        run = longest = 0
+        previous = None
+        for day in sorted(self._dates):
+            run = run + 1 if previous == day - timedelta(days=1) else 1
+            longest = max(longest, run)
+            previous = day
+        self._run, self._longest = run, longest
+
+    def streak(self, today=None):
+        """Tuple: (streak saat ini, streak terpanjang). Streak saat ini 0 jika kemarin & hari ini kosong."""
+        today = today or date.today()
+        if self._last_date is None or self._last_date < today - timedelta(days=1):
+            return 0, self._longest
+        return self._run, self._longest
+
+    def weekly_table(self, weeks=8):
+        """Repetisi per minggu (baris, terbaru di atas) x latihan (kolom) untuk `weeks` minggu terakhir."""
+        return self._cached(("weekly", weeks), lambda: self._pivot(self.weekly, weeks, "Minggu"))
+
+    def daily_table(self, days=14):
+        """Repetisi per hari x latihan untuk `days` hari terakhir yang ada latihannya."""
+        return self._cached(("daily", days), lambda: self._pivot(self.daily, days, "Tanggal"))
+
+    def exercise_table(self):
+        """Total sesi, total repetisi dan rekor per latihan."""
+        def build():
+            rows = [
+                (name, s["sesi"], s["repetisi"], s["terbaik"], s["tanggal_terbaik"])
+                for name, s in sorted(self.exercises.items())
+            ]
+            return pd.DataFrame(rows, columns=["Jenis Latihan", "Sesi", "Total Repetisi", "Rekor", "Tanggal Rekor"])
+        return self._cached(("exercise",), build)
+
+    def _cached(self, key, build):
+        cached = self._tables.get(key)
+        if cached is None or cached[0] != self.version:
+            cached = self._tables[key] = (self.version, build())
+        return cached[1]
+
+    @staticmethod
+    def _pivot(table, limit, label):
+        periods = sorted({period for period, _ in table}, reverse=True)[:limit]
+        if not periods:
+            return pd.DataFrame(columns=[label])
+        keep = set(periods)
+        rows = [(period, exercise, totals[1]) for (period, exercise), totals in table.items() if period in keep]
+        frame = pd.DataFrame(rows, columns=[label, "Jenis Latihan", "Repetisi"])
+        pivot = frame.pivot_table(index=label, columns="Jenis Latihan", values="Repetisi", aggfunc="sum", fill_value=0)
+        pivot = pivot.sort_index(ascending=False).reset_index()
+        pivot.columns.name = None
+        return pivot
@@ -1,14 +1,26 @@
+import time
+# Awal run script ini, untuk metrik waktu startup
+SCRIPT_START = time.perf_counter()
+
 import cv2
 import streamlit as st
-import numpy as np
-import tempfile
-from ultralytics import YOLO
-import math
-from PIL import Image
-import torch
-import pandas as pd
-import os
-from datetime import datetime
+import uuid
+from multiprocessing import AuthenticationError
+from exercises import ANGLE_LABELS, EXERCISE_DEFINITIONS
+from pose_analyzer import ANALYZER_DEFAULTS, PoseAnalyzer, EXERCISE_TYPES
+import model_utils
+from metrics import StageMetrics
+from pipeline import FramePipeline
+from history import HistoryStore
+from cadence import AdaptiveRunner
+from roi import RoiRunner
+from overlay import OverlayRenderer
+from display import RenderScheduler
+from tracking import MultiPersonTracker
+from traces import TraceRecorder, replay_trace
+from uploads import UploadCache
+from autotune import load_or_tune
+from inference_server import InferenceService, RemoteClient, parse_address
 
 # Konfigurasi Halaman Streamlit
 st.set_page_config(
@@ -17,54 +29,110 @@ st.set_page_config(
 )
 
 # --- KONFIGURASI HISTORY ---
-HISTORY_FILE = "workout_history.csv"
+@st.cache_resource
+def get_history_store():
+    """Satu HistoryStore (SQLite) per proses, dipakai bersama semua sesi dan rerun."""
+    return HistoryStore()
+
+@st.cache_resource
+def get_upload_cache():
+    """Cache video upload di disk (dedup per hash isi, dibatasi ukuran), dipakai bersama semua sesi."""
+    return UploadCache()
 
 def load_history():
-    """Memuat data riwayat dari CSV."""
-    if os.path.exists(HISTORY_FILE):
-        return pd.read_csv(HISTORY_FILE)
-    return pd.DataFrame(columns=["Tanggal", "Waktu", "Jenis Latihan", "Repetisi", "Status"])
-
-def save_history(exercise, count):
-    """Menyimpan sesi latihan ke CSV."""
-    df = load_history()
-    now = datetime.now()
-    new_data = pd.DataFrame({
-        "Tanggal": [now.strftime("%Y-%m-%d")],
-        "Waktu": [now.strftime("%H:%M:%S")],
-        "Jenis Latihan": [exercise],
-        "Repetisi": [count],
-        "Status": ["Selesai"]
-    })
-    # Menggabungkan data lama dan baru
-    df = pd.concat([new_data, df], ignore_index=True)
-    df.to_csv(HISTORY_FILE, index=False)
+    """Memuat data riwayat (view yang di-cache dan diperbarui inkremental)."""
+    return get_history_store().view()
+
+def save_history(exercise, count, athlete=None, trace=None):
+    """Menyimpan sesi latihan (append satu baris ke SQLite)."""
+    get_history_store().append(exercise, count, athlete=athlete, trace=trace)
+
+def finish_trace_recording(keep=True):
+    """Menutup rekaman keypoints sesi aktif. Mengembalikan path trace, atau None jika tidak merekam/dibuang."""
+    recorder = st.session_state.pop('trace_recorder', None)
+    if recorder is None:
+        return None
+    if keep and recorder.frames > 0:
+        return recorder.close()
+    recorder.discard()
+    return None
+
+def save_tracked_sessions(tracker):
+    """Menyimpan sesi setiap atlet (mode multi-orang) secara terpisah. Mengembalikan ringkasan teks."""
+    saved = []
+    for track_id, track_analyzer in tracker.sessions():
+        save_history(tracker.exercise_type, track_analyzer.counter, athlete=f"Atlet #{track_id}")
+        saved.append(f"Atlet #{track_id}: {track_analyzer.counter} Reps")
+    tracker.reset()
+    return saved
+
+# Pilihan penghalusan di sidebar -> nilai parameter smoothing PoseAnalyzer
+SMOOTHING_OPTIONS = {"Tidak": None, "One-Euro": "one_euro", "EMA": "ema"}
+# Pilihan server inferensi di sidebar -> mode
+INFERENCE_MODES = {"Per Sesi": None, "Bersama (Proses Ini)": "shared", "Socket Lokal": "socket"}
 
 # --- CALLBACK UNTUK TOMBOL STOP (SOLUSI BUG SIMPAN) ---
+def stop_pipeline():
+    """Menghentikan pipeline run sebelumnya (jika ada) dan menunggu thread analisisnya selesai."""
+    if 'pipeline' in st.session_state:
+        st.session_state.pop('pipeline').stop()
+
 def stop_webcam_callback():
     """Callback ini dipanggil SEBELUM script rerun, menjamin data tersimpan."""
     # 1. Matikan status aktif agar script tidak mencoba buka kamera lagi
     st.session_state.webcam_active = False
+    # Thread analisis pipeline masih bisa memanggil analyzer/trace_recorder: hentikan sebelum simpan & reset
+    stop_pipeline()
     
     # 2. Cek apakah ada data yang perlu disimpan
-    if 'analyzer' in st.session_state:
+    if st.session_state.get('multi_person') and 'tracker' in st.session_state:
+        saved = save_tracked_sessions(st.session_state.tracker)
+        if saved:
+            st.session_state.save_message = {
+                "type": "success",
+                "text": f"✅ Latihan Disimpan: {st.session_state.tracker.exercise_type} ({', '.join(saved)})"
+            }
+        else:
+            st.session_state.save_message = {
+                "type": "info",
+                "text": "🛑 Latihan dihentikan. Tidak ada repetisi untuk disimpan."
+            }
+    elif 'analyzer' in st.session_state:
         analyzer = st.session_state.analyzer
         if analyzer.counter > 0:
-            save_history(analyzer.exercise_type, analyzer.counter)
+            save_history(analyzer.exercise_type, analyzer.counter, trace=finish_trace_recording())
             # Simpan pesan sukses di session state untuk ditampilkan setelah rerun
             st.session_state.save_message = {
                 "type": "success", 
                 "text": f"✅ Latihan Disimpan: {analyzer.exercise_type} ({analyzer.counter} Reps)"
             }
-            # Reset counter
-            analyzer.counter = 0
-            analyzer.stage = None
+            # Reset counter (beserta state filter & riwayat sudut)
+            analyzer.reset()
         else:
+            finish_trace_recording(keep=False)
             st.session_state.save_message = {
                 "type": "info", 
                 "text": "🛑 Latihan dihentikan. Tidak ada repetisi untuk disimpan."
             }
 
+@st.cache_resource
+def get_model_preloader():
+    """Pemuat model latar belakang bersama semua sesi (model yang sudah dimuat dipakai ulang)."""
+    return model_utils.ModelPreloader()
+
+@st.cache_resource
+def get_inference_service(model_name, device, backend, precision, threads, autotune, max_latency_ms, _loaded):
+    """Satu InferenceService per (model, device, backend, presisi, ...) per proses, dipakai bersama semua sesi."""
+    profile = _loaded["profile"] or {}
+    return InferenceService(_loaded["model"], _loaded["device"], max_latency=max_latency_ms / 1000,
+                            half=profile.get("half", False), infer_size=profile.get("infer_size"))
+
+def session_client_id():
+    """Nama klien sesi ini di server inferensi (tetap selama sesi browser, untuk metrik per klien)."""
+    if 'client_id' not in st.session_state:
+        st.session_state.client_id = f"sesi-{uuid.uuid4().hex[:6]}"
+    return st.session_state.client_id
+
 # --- JUDUL & SIDEBAR ---
 st.title("AI Workout Assistant (High Res)")
 st.markdown("""
@@ -79,31 +147,151 @@ with st.sidebar.form(key='config_form'):
     # Menambahkan opsi YOLOv8 dan YOLO11 lengkap (Tanpa P6)
     model_type = st.selectbox(
         "Pilih Model", 
-        [
-            # YOLOv8 Standard
-            "yolov8n-pose.pt", "yolov8s-pose.pt", "yolov8m-pose.pt", "yolov8l-pose.pt", "yolov8x-pose.pt",
-            # YOLO11 Standard
-            "yolo11n-pose.pt", "yolo11s-pose.pt", "yolo11m-pose.pt", "yolo11l-pose.pt", "yolo11x-pose.pt"
-        ]
+        model_utils.MODEL_CHOICES
     )
 
-    # Cek ketersediaan GPU untuk opsi default
-    default_device_index = 1 if torch.cuda.is_available() else 0
+    # "auto" dicek di thread pemuat model (import torch tidak menahan render sidebar)
     device_option = st.selectbox(
         "Device", 
-        ["cpu", "cuda:0"], 
-        index=default_device_index, 
-        help="Jika GPU tidak terdeteksi, sistem akan otomatis menggunakan CPU."
+        ["auto", "cpu", "cuda:0"], 
+        help="auto: GPU jika terdeteksi, selain itu CPU. Jika GPU tidak terdeteksi, sistem akan otomatis "
+             "menggunakan CPU."
+    )
+
+    backend_option = st.selectbox(
+        "Backend Model",
+        model_utils.BACKENDS,
+        help="Backend hasil ekspor (ONNX Runtime / OpenVINO / TorchScript) biasanya lebih cepat di CPU. "
+             "Ekspor dilakukan sekali lalu disimpan di folder model_cache."
     )
+    precision_option = st.selectbox(
+        "Presisi",
+        ["fp32", "fp16", "int8"],
+        help="Per backend: " + "; ".join(f"{b}: {', '.join(p)}" for b, p in model_utils.PRECISIONS.items())
+             + ". FP16 di backend pytorch diatur lewat Auto-Tune."
+    )
+    cpu_threads = st.number_input("Thread CPU (0 = otomatis)", min_value=0, max_value=64, value=0)
+    use_autotune = st.checkbox(
+        "Auto-Tune Inferensi",
+        value=False,
+        help="Saat pemrosesan pertama dimulai, coba FP16 (GPU), jumlah thread & channels-last (CPU) dan ukuran "
+             "inferensi pada frame awal video/webcam, lalu pakai yang tercepat dengan keypoints tetap akurat. "
+             "Hasil disimpan per model & device, jadi pengukuran hanya sekali. Menggantikan pilihan Ukuran "
+             "Inferensi (kecuali jika di frame awal belum ada orang)."
+    )
+
+    inference_mode = INFERENCE_MODES[st.selectbox(
+        "Server Inferensi",
+        list(INFERENCE_MODES),
+        help="Bersama: semua sesi di server ini memakai satu model, frame digabung menjadi batch dinamis. "
+             "Socket Lokal: memakai server terpisah (python inference_server.py), model tidak dimuat di sini."
+    )]
+    service_latency_ms = st.slider("Batas Tunggu Batch (ms)", 1, 50, 10,
+                                   help="Waktu tunggu maksimum frame di server sebelum batch dikirim ke model.")
+    service_address = st.text_input("Alamat Server Socket", value="localhost:6010")
 
     input_source = st.radio("Sumber Input", ["Video Upload", "Webcam"])
-    exercise_type = st.selectbox("Jenis Latihan", ["PushUp", "PullUp"])
+    exercise_type = st.selectbox("Jenis Latihan", EXERCISE_TYPES)
 
     confidence_threshold = st.slider("Confidence Threshold", 0.0, 1.0, 0.5, 0.05)
+
+    smoothing_option = st.selectbox(
+        "Penghalusan Sudut",
+        list(SMOOTHING_OPTIONS),
+        index=list(SMOOTHING_OPTIONS.values()).index(ANALYZER_DEFAULTS["smoothing"]),
+        help="Filter sudut antar frame untuk meredam jitter keypoints, sehingga model kecil (nano) "
+             "tetap menghitung repetisi dengan stabil."
+    )
+    stage_hysteresis = st.slider("Histeresis Stage (°)", 0, 15, int(ANALYZER_DEFAULTS["hysteresis"]),
+                                 help="Sudut harus melewati ambang UP/DOWN sejauh margin ini sebelum stage berubah. "
+                                      "Margin besar bisa membuat repetisi dengan gerakan tidak penuh tidak terhitung.")
+    stage_dwell = st.slider("Konfirmasi Stage (frame)", 1, 5, ANALYZER_DEFAULTS["min_dwell"],
+                            help="Jumlah frame berturut-turut yang dibutuhkan sebelum stage berubah.")
+
+    infer_size = st.selectbox(
+        "Ukuran Inferensi",
+        ["Asli"] + model_utils.INFER_SIZES,
+        help="Frame dikecilkan ke ukuran ini (sisi terpanjang) sebelum masuk model. "
+             "Keypoints dikembalikan ke koordinat asli, jadi ambang sudut dan overlay tetap sama."
+    )
+
+    batch_size = st.select_slider(
+        "Batch Inferensi (Video Upload)",
+        options=[1, 2, 4, 8, 16],
+        value=1,
+        help="Jumlah frame yang diproses model sekaligus. Webcam selalu 1 frame agar latensi tetap rendah."
+    )
+
+    multi_person = st.checkbox(
+        "Mode Multi-Orang",
+        value=False,
+        help="Mendeteksi semua orang, memberi ID tetap per atlet, dan menghitung repetisi masing-masing. "
+             "Setiap atlet disimpan terpisah di riwayat."
+    )
+    max_people = st.slider("Maks. Orang", 2, 10, 5)
+
+    record_trace = st.checkbox(
+        "Rekam Keypoints (Replay)",
+        value=False,
+        help="Menyimpan keypoints per frame di samping riwayat, agar sesi bisa dihitung ulang dengan "
+             "ambang/pengaturan baru tanpa menjalankan model lagi. Tidak berlaku di Mode Multi-Orang."
+    )
+
+    use_adaptive = st.checkbox(
+        "Inferensi Adaptif (Lewati Frame)",
+        value=False,
+        help="Model hanya dijalankan tiap k frame atau saat ada gerakan besar; keypoints di antaranya diinterpolasi. "
+             "Saat sudut siku dekat ambang UP/DOWN, setiap frame tetap diinferensi."
+    )
+    max_stride = st.slider("Maks. Lompatan Frame", 2, 8, 4)
+
+    use_roi = st.checkbox(
+        "Tracking ROI",
+        value=False,
+        help="Setelah atlet ditemukan, model hanya menjalankan potongan di sekitar skeleton frame sebelumnya "
+             "(ukuran inferensi kecil), lalu kembali mencari di frame penuh jika confidence turun. "
+             "Paling terasa untuk webcam resolusi tinggi. Tidak berlaku di Mode Multi-Orang."
+    )
+    roi_size = st.select_slider("Ukuran Inferensi ROI", options=[256, 320, 416, 480], value=320)
+
+    show_video = st.checkbox(
+        "Tampilkan Video & Skeleton",
+        value=True,
+        help="Matikan untuk mode tanpa video: hanya statistik yang diperbarui, tanpa biaya render frame."
+    )
+
+    display_fps = st.slider(
+        "FPS Tampilan", 5, 30, 15,
+        help="Batas frame video yang dikirim ke browser per detik. Analisis tetap berjalan di setiap frame; "
+             "nilai rendah menghemat CPU server (penting jika beberapa kiosk memakai server yang sama)."
+    )
+    jpeg_quality = st.slider("Kualitas JPEG Tampilan", 40, 95, 75,
+                             help="Frame dikirim ke browser sebagai JPEG dengan kualitas ini.")
+
+    use_pipeline = st.checkbox(
+        "Pipeline Multi-Thread",
+        value=True,
+        help="Capture, inferensi dan analisis berjalan di thread terpisah sehingga FPS dibatasi tahap paling lambat."
+    )
+
+    show_perf = st.checkbox(
+        "Panel Performa",
+        value=True,
+        help="Menampilkan FPS, latensi p50/p95 tiap tahap (capture, inferensi, analisis, render, tampilan), "
+             "frame yang dibuang dan device aktif."
+    )
+    metrics_export = st.selectbox("Ekspor Metrik", ["Tidak", "Prometheus", "CSV"])
+    metrics_path = st.text_input("File Metrik", value="workout_metrics.prom",
+                                 help="Prometheus: file ditimpa tiap ekspor. CSV: baris ditambahkan.")
     
     # Tombol konfirmasi
     submit_btn = st.form_submit_button("OK / Terapkan")
 
+# Pilihan di dalam form tidak bisa saling menyaring, jadi presisi yang tidak didukung backend diganti di sini
+if precision_option not in model_utils.PRECISIONS[backend_option]:
+    st.sidebar.warning(f"Presisi {precision_option} tidak didukung backend {backend_option}, memakai fp32.")
+    precision_option = "fp32"
+
 # --- SIDEBAR HISTORY (Di luar form agar bisa interaksi langsung) ---
 st.sidebar.markdown("---")
 st.sidebar.header("Riwayat Latihan")
@@ -116,190 +304,144 @@ if st.sidebar.checkbox("Tampilkan Tabel Riwayat", value=True):
             use_container_width=True
         )
         if st.sidebar.button("Hapus Riwayat"):
-            if os.path.exists(HISTORY_FILE):
-                os.remove(HISTORY_FILE)
-                st.rerun()
+            get_history_store().clear()
+            st.rerun()
     else:
         st.sidebar.info("Belum ada data latihan.")
 
-# --- FUNGSI UTILITAS MATEMATIKA ---
-def calculate_angle(a, b, c):
-    """Menghitung sudut antara tiga titik (a, b, c). b adalah titik sudut."""
-    a = np.array(a)
-    b = np.array(b)
-    c = np.array(c)
-    
-    radians = np.arctan2(c[1]-b[1], c[0]-b[0]) - np.arctan2(a[1]-b[1], a[0]-b[0])
-    angle = np.abs(radians*180.0/np.pi)
-    
-    if angle > 180.0:
-        angle = 360-angle
-        
-    return angle
-
+# --- STATISTIK RIWAYAT: agregat inkremental (tidak memindai ulang riwayat setiap rerun) ---
+history_analytics = get_history_store().analytics()
+if history_analytics.exercises:
+    with st.sidebar.expander("Statistik Latihan"):
+        current_streak, longest_streak = history_analytics.streak()
+        streak_col, longest_col = st.columns(2)
+        streak_col.metric("Streak (hari)", current_streak)
+        longest_col.metric("Terpanjang", longest_streak)
+        st.dataframe(history_analytics.exercise_table(), hide_index=True, use_container_width=True)
+        st.caption("Repetisi per minggu")
+        st.caption("Repetisi per hari")
+        st.dataframe(history_analytics.daily_table(), hide_index=True, use_container_width=True)
+        st.dataframe(history_analytics.weekly_table(), hide_index=True, use_container_width=True)
+
+# --- REPLAY TRACE: hitung ulang sesi terekam tanpa inferensi ---
+traced_sessions = get_history_store().traces()
+if traced_sessions:
+    with st.sidebar.expander("Replay Trace"):
+        session = st.selectbox(
+            "Sesi",
+            traced_sessions,
+            format_func=lambda row: f"{row[1]} {row[2]} - {row[3]} ({row[4]} Reps)"
+        )
+        definition = EXERCISE_DEFINITIONS.get(session[3], {"high": 0.0, "low": 0.0})
+        replay_high = st.number_input("Ambang Atas (°)", value=float(definition["high"]), step=1.0)
+        replay_low = st.number_input("Ambang Bawah (°)", value=float(definition["low"]), step=1.0)
+        if st.button("Hitung Ulang"):
+            try:
+                replay = replay_trace(
+                    session[5],
+                    overrides={"high": replay_high, "low": replay_low},
+                    smoothing=SMOOTHING_OPTIONS[smoothing_option],
+                    hysteresis=float(stage_hysteresis),
+                    min_dwell=stage_dwell,
+                )
+                st.success(f"{replay['Repetisi']} Reps (tersimpan {session[4]}) - "
+                           f"{replay['Frame Terdeteksi']} frame dalam {replay['Durasi Replay (ms)']} ms")
+            except (OSError, ValueError) as e:
+                st.error(f"Replay gagal: {e}")
+
+# --- FUNGSI UTILITAS TAMPILAN ---
 def get_dynamic_font_scale(frame_width):
     """Menyesuaikan ukuran teks berdasarkan lebar video agar tidak kekecilan di resolusi tinggi."""
     # Base scale 1.0 untuk lebar 1000px
     return frame_width / 1000.0
 
-# --- KELAS ANALISIS POSE ---
-class PoseAnalyzer:
-    def __init__(self, exercise_type):
-        self.exercise_type = exercise_type
-        self.counter = 0
-        self.stage = None
-        self.feedback = ""
-        self.form_status = "OK"
-        
-        self.pushup_up_angle = 145 
-        self.pushup_down_angle = 90
-        self.body_straight_threshold = 150
-        
-        self.pullup_up_angle = 90   # Diubah ke 90 sesuai permintaan
-        self.pullup_down_angle = 145 # Diubah ke 145 sesuai permintaan
-        
-    def analyze(self, keypoints):
-        if keypoints.shape[0] == 0:
-            return None, "Tidak ada orang terdeteksi"
-
-        l_shoulder, r_shoulder = keypoints[5], keypoints[6]
-        l_elbow, r_elbow = keypoints[7], keypoints[8]
-        l_wrist, r_wrist = keypoints[9], keypoints[10]
-        l_hip, r_hip = keypoints[11], keypoints[12]
-        l_knee, r_knee = keypoints[13], keypoints[14]
-        l_ankle, r_ankle = keypoints[15], keypoints[16]
-        l_ear, r_ear = keypoints[3], keypoints[4]
-        nose = keypoints[0]
-
-        a_shoulder, a_elbow, a_wrist, a_hip, a_knee, a_ankle, a_ear = \
-            r_shoulder, r_elbow, r_wrist, r_hip, r_knee, r_ankle, r_ear
-        
-        side = "Kanan"
-        orientation = "Depan/Belakang"
-        
-        # Inisialisasi variabel sudut agar tidak error
-        neck_angle = 0
-        body_angle = 0
-        elbow_angle = 0
-
-        if self.exercise_type == "PushUp":
-            if nose[0] > l_shoulder[0] and nose[0] > r_shoulder[0]:
-                orientation = "Menghadap Kanan"
-            elif nose[0] < l_shoulder[0] and nose[0] < r_shoulder[0]:
-                orientation = "Menghadap Kiri"
-            else:
-                orientation = "Depan/Belakang"
-
-            if l_hip[0] > 0 and r_hip[0] == 0:
-                side = "Kiri"
-                a_shoulder, a_elbow, a_wrist, a_hip, a_knee, a_ankle, a_ear = \
-                    l_shoulder, l_elbow, l_wrist, l_hip, l_knee, l_ankle, l_ear
-            elif r_hip[0] > 0 and l_hip[0] == 0:
-                side = "Kanan"
-            
-            elif l_hip[0] > 0 and r_hip[0] > 0:
-                if orientation == "Menghadap Kiri":
-                    side = "Kiri" 
-                    a_shoulder, a_elbow, a_wrist, a_hip, a_knee, a_ankle, a_ear = \
-                        l_shoulder, l_elbow, l_wrist, l_hip, l_knee, l_ankle, l_ear
-                else:
-                    side = "Kanan"
-
-        elif self.exercise_type == "PullUp":
-            orientation = "Depan/Belakang"
-
-        # --- LOGIKA PUSHUP ---
-        if self.exercise_type == "PushUp":
-            elbow_angle = calculate_angle(a_shoulder, a_elbow, a_wrist)
-            body_angle = calculate_angle(a_shoulder, a_hip, a_ankle)
-            neck_angle = calculate_angle(a_ear, a_shoulder, a_hip)
-
-            self.feedback = []
-            self.form_status = "OK"
-
-            if body_angle < self.body_straight_threshold:
-                self.feedback.append("LURUSKAN PUNGGUNG!")
-                self.form_status = "BAD"
-            
-            if neck_angle < 140:
-                self.feedback.append("KEPALA LURUS KE DEPAN!")
-                self.form_status = "BAD"
-
-            if elbow_angle > self.pushup_up_angle:
-                self.stage = "UP"
-            if elbow_angle < self.pushup_down_angle and self.stage == 'UP':
-                if self.form_status == "OK":
-                    self.stage = "DOWN"
-                    self.counter += 1
-                else:
-                    self.feedback.append("Repetisi tidak dihitung (Form Buruk)")
-
-            return {
-                "count": self.counter,
-                "stage": self.stage,
-                "feedback": self.feedback,
-                "angle": elbow_angle,
-                "body_angle": body_angle,
-                "neck_angle": neck_angle, # Ditambahkan ke return value
-                "orientation": orientation,
-                "side": side
-            }
-
-        # --- LOGIKA PULLUP ---
-        elif self.exercise_type == "PullUp":
-            l_elbow_angle = calculate_angle(l_shoulder, l_elbow, l_wrist)
-            r_elbow_angle = calculate_angle(r_shoulder, r_elbow, r_wrist)
-            avg_elbow_angle = (l_elbow_angle + r_elbow_angle) / 2
-            
-            self.feedback = []
-            if avg_elbow_angle > self.pullup_down_angle:
-                self.stage = "DOWN"
-            if avg_elbow_angle < self.pullup_up_angle and self.stage == "DOWN":
-                self.stage = "UP"
-                self.counter += 1
-                
-            return {
-                "count": self.counter,
-                "stage": self.stage,
-                "feedback": self.feedback,
-                "angle": avg_elbow_angle,
-                "orientation": orientation
-            }
-
 # --- MAIN APP LOGIC ---
 
-@st.cache_resource
-def load_model(model_name, device):
-    final_device = device
-    if device == 'cuda:0' and not torch.cuda.is_available():
-        final_device = 'cpu'
-        st.warning(f"GPU tidak terdeteksi oleh PyTorch. Otomatis beralih ke {final_device}.")
-    
+# Model dimuat & di-warm-up di thread latar belakang: UI (upload, riwayat, pengaturan) tetap bisa dipakai
+# selama memuat, dan model baru ditunggu tepat sebelum frame pertama diproses.
+# Mode socket tidak memuat model sama sekali (model ada di proses server).
+model_future = None
+if inference_mode != "socket":
+    model_future = get_model_preloader().load(
+        model_type, device_option, backend_option, precision_option, cpu_threads or None,
+        warmup_size=model_utils.EXPORT_IMGSZ if infer_size == "Asli" else infer_size,
+        autotune=use_autotune,
+    )
+st_model_status = st.sidebar.empty()
+
+def wait_for_model():
+    """Menunggu model dari pemuat latar belakang. Mengembalikan dict hasil ModelPreloader (model, device, ...)."""
+    start = time.perf_counter()
+    while not model_future.done():
+        # Update placeholder tiap putaran: interaksi UI tetap bisa memicu rerun (pemuatan tetap berlanjut)
+        st_model_status.info(f"⏳ Memuat {model_type} ({backend_option}, {precision_option})... "
+                             f"{time.perf_counter() - start:.0f} s")
+        time.sleep(0.25)
     try:
-        model = YOLO(model_name)
-        model.to(final_device)
-        return model, final_device
+        loaded = model_future.result()
     except Exception as e:
-        if final_device != 'cpu':
-            st.warning(f"Gagal memuat di {final_device}, mencoba CPU...")
-            model = YOLO(model_name)
-            model.to('cpu')
-            return model, 'cpu'
-        else:
-            raise e
+        st.error(f"Gagal memuat model: {e}.")
+        st.stop()
+    for warning in loaded["warnings"]:
+        st.warning(warning)
+    tuned = ""
+    if loaded["profile"]:
+        profile = loaded["profile"]
+        tuned = (f" · auto-tune: {'FP16' if profile['half'] else 'FP32'}, "
+                 f"ukuran {profile['infer_size'] or 'asli'}, {profile['latency_ms']} ms/frame")
+    st_model_status.success(
+        f"Model berjalan di: {loaded['device'].upper()} ({backend_option}, {precision_option}){tuned}"
+    )
+    return loaded
+
+def run_autotune(loaded, cap):
+    """
+    Auto-tune pertama untuk model ini, diukur pada frame awal sumber yang dibuka (bukan frame sintetis).
+    Hasil disimpan ke `loaded` dan model_cache/autotune.json; run berikutnya memakai profil tersimpan.
+    """
+    frames = model_utils.read_frames(cap, 8)
+    if input_source == "Video Upload":
+        cap.set(cv2.CAP_PROP_POS_FRAMES, 0)  # frame uji tetap dianalisis dari awal
+    if not frames:
+        return
+    with st.spinner("Auto-tune inferensi pada frame awal video..."):
+        start = time.perf_counter()
+        profile, _ = load_or_tune(loaded["model"], model_type, loaded["device"], backend_option, precision_option,
+                                  conf=confidence_threshold, frames=frames)
+        metrics.record("model_autotune", time.perf_counter() - start)
+    if profile is None:
+        st.warning("Auto-tune dilewati: belum ada orang terlihat di frame awal. Pengaturan biasa dipakai.")
+        return
+    loaded["profile"] = profile
+    st.toast(f"Auto-tune selesai: {profile['latency_ms']} ms/frame (awal {profile['baseline_latency_ms']} ms/frame).")
+
+if model_future is None:
+    st_model_status.info(f"Inferensi lewat server socket {service_address}")
+elif model_future.done():
+    wait_for_model()
+else:
+    st_model_status.info(f"⏳ Memuat {model_type} di latar belakang...")
+
+# Analyzer dibuat ulang jika jenis latihan atau pengaturan penghalusan berubah
+analyzer_options = {
+    "smoothing": SMOOTHING_OPTIONS[smoothing_option],
+    "hysteresis": float(stage_hysteresis),
+    "min_dwell": stage_dwell,
+}
+analyzer_config = (exercise_type, tuple(sorted(analyzer_options.items())))
+if 'analyzer' not in st.session_state or st.session_state.current_exercise != analyzer_config:
+    st.session_state.analyzer = PoseAnalyzer(exercise_type, **analyzer_options)
+    st.session_state.current_exercise = analyzer_config
 
-try:
-    model, active_device = load_model(model_type, device_option)
-    st.sidebar.success(f"Model berjalan di: {active_device.upper()}")
-except Exception as e:
-    st.error(f"Gagal memuat model: {e}.")
-    st.stop()
+analyzer = st.session_state.analyzer
 
-if 'analyzer' not in st.session_state or st.session_state.current_exercise != exercise_type:
-    st.session_state.analyzer = PoseAnalyzer(exercise_type)
-    st.session_state.current_exercise = exercise_type
+# Mode multi-orang: satu PoseAnalyzer per ID track, dikelola MultiPersonTracker
+st.session_state.multi_person = multi_person
+if ('tracker' not in st.session_state or st.session_state.tracker.exercise_type != exercise_type
+        or st.session_state.tracker.analyzer_options != analyzer_options):
+    st.session_state.tracker = MultiPersonTracker(exercise_type, analyzer_options=analyzer_options)
 
-analyzer = st.session_state.analyzer
+tracker = st.session_state.tracker
 
 col1, col2 = st.columns([3, 1])
 with col2:
@@ -314,16 +456,190 @@ with col2:
     st_body_angle = st.empty()
     st_neck_angle = st.empty() # Placeholder untuk Sudut Leher
     st_orientation = st.empty()
+    st_batch = st.empty() # Placeholder untuk statistik batch inferensi
+    st_cadence = st.empty() # Placeholder untuk statistik inferensi adaptif
+    st_roi = st.empty() # Placeholder untuk statistik tracking ROI
+    st_service = st.empty() # Placeholder untuk metrik server inferensi per klien
+    st_perf = st.empty() # Placeholder untuk panel performa per tahap
     
     # Tombol Reset Manual
     if st.button("Reset Counter", key="reset_btn"):
-        analyzer.counter = 0
-        analyzer.stage = None
+        stop_pipeline()
+        analyzer.reset()
+        tracker.reset()  # Mode multi-orang: hitungan per atlet ikut direset
+        finish_trace_recording(keep=False)
         st.rerun()
 
 with col1:
     st_frame = st.empty()
 
+# Renderer overlay ringan: resize dulu, lalu gambar 17 keypoints + skeleton di buffer 640px
+renderer = OverlayRenderer(display_width=640, enabled=show_video)
+# Laju kirim frame & update widget ke browser, terpisah dari laju analisis (dibuat ulang tiap run)
+scheduler = RenderScheduler(display_fps=display_fps, jpeg_quality=jpeg_quality)
+
+# Perekam trace keypoints sesi aktif (diisi saat pemrosesan dimulai jika opsi rekam aktif)
+trace_recorder = None
+
+# Latensi per tahap loop utama (capture, inference, analysis, render, display), dibuat ulang tiap run
+metrics = StageMetrics()
+first_frame_pending = False  # diset True saat pemrosesan dimulai, lihat show_result
+PERF_PANEL_INTERVAL = 0.5  # detik antar update panel performa
+METRICS_EXPORT_INTERVAL = 5.0  # detik antar ekspor file metrik
+
+def prepare_result(frame, result):
+    """
+    Menganalisis hasil inferensi satu frame dan menyiapkan frame tampilan.
+    Tidak memanggil Streamlit sehingga aman dijalankan di thread pipeline.
+    Mengembalikan tuple: (data analisis atau None, frame JPEG untuk ditampilkan atau None)
+    """
+    if multi_person:
+        # Semua atlet dianalisis sekaligus; data berupa dict {track_id: hasil analisis}
+        with metrics.time("analysis"):
+            keypoints = model_utils.all_keypoints(result)
+            tracks = tracker.update(keypoints[..., :2], model_utils.all_boxes(result))
+        frame_resized = None
+        if renderer.enabled and scheduler.frame_due():
+            labels = [f"#{track_id}" for track_id in tracks]
+            with metrics.time("render"):
+                frame_resized = scheduler.encode(renderer.render(frame, keypoints, labels))
+        return tracks, frame_resized
+
+    data = None
+    keypoints = model_utils.all_keypoints(result)
+    with metrics.time("analysis"):
+        try:
+            person_keypoints = model_utils.person_keypoints(result)
+            if person_keypoints is not None:
+                data = analyzer.analyze(person_keypoints)
+        except Exception as e:
+            pass
+    if trace_recorder is not None:
+        trace_recorder.append(keypoints[0] if len(keypoints) else None)
+
+    # --- PERBAIKAN DISPLAY: RESIZE VISUAL ---
+    # Frame dikecilkan dulu ke 640px, baru skeleton digambar di buffer kecil itu (bukan di frame asli).
+    # AI (model) di atas tetap memproses frame sesuai pengaturan Ukuran Inferensi.
+    # Hanya frame yang jatuh jadwal FPS Tampilan yang dirender & di-encode JPEG (di thread ini, bukan UI).
+    frame_resized = None
+    if renderer.enabled and scheduler.frame_due():
+        with metrics.time("render"):
+            frame_resized = scheduler.encode(renderer.render(frame, keypoints))
+    return data, frame_resized
+
+def show_tracks(tracks):
+    """Statistik mode multi-orang: jumlah atlet dan repetisi per atlet (hanya ditulis jika berubah)."""
+    if scheduler.changed("count", len(tracks)):
+        st_count.metric("Atlet Terdeteksi", len(tracks))
+    lines = [
+        f"**Atlet #{track_id}:** {track['count']} Reps ({track['stage'] if track['stage'] else 'Mulai'})"
+        for track_id, track in sorted(tracks.items())
+    ]
+    text = "\n\n".join(lines) if lines else "Tidak ada orang terdeteksi"
+    if scheduler.changed("stage", text):
+        st_stage.markdown(text)
+
+def show_result(data, frame_resized):
+    """Memperbarui statistik dan tampilan video (hanya dari thread script Streamlit)."""
+    global first_frame_pending
+    with metrics.time("display"):
+        _show_result(data, frame_resized)
+    metrics.tick()
+    if first_frame_pending:
+        # Waktu dari awal run sampai frame pertama tampil (startup + capture + inferensi + render)
+        metrics.record("first_frame", time.perf_counter() - SCRIPT_START)
+        first_frame_pending = False
+
+def _show_result(data, frame_resized):
+    # Widget hanya ditulis ulang jika nilainya berubah; sudut (berubah hampir tiap frame) juga dibatasi FPS Tampilan
+    if multi_person:
+        show_tracks(data)
+    elif data is not None:
+        # Update UI Side Bar (Col2) - Semua teks dipindah ke sini
+        if scheduler.changed("count", data['count']):
+            st_count.metric("Repetisi", data['count'])
+        stage_text = f"Posisi: {data['stage'] if data['stage'] else 'Mulai'}"
+        if scheduler.changed("stage", stage_text):
+            st_stage.info(stage_text)
+
+        # Menampilkan data detail di panel samping (sudut mengikuti definisi latihan aktif)
+        if scheduler.ui_due():
+            angle_keys = analyzer.exercise.result_keys
+            for i, placeholder in enumerate((st_angle, st_body_angle, st_neck_angle)):
+                text = None
+                if i < len(angle_keys) and data.get(angle_keys[i][0], 0) > 0:
+                    key, name = angle_keys[i]
+                    text = f"**Sudut {ANGLE_LABELS.get(name, name)}:** {int(data[key])}°"
+                if scheduler.changed(f"angle_{i}", text):
+                    if text is None:
+                        placeholder.empty()
+                    else:
+                        placeholder.write(text)
+
+            orientation_text = f"**Arah:** {data.get('orientation', '-')}"
+            if scheduler.changed("orientation", orientation_text):
+                st_orientation.write(orientation_text)
+
+        feedback_text = tuple(data.get('feedback', ()))
+        if scheduler.changed("feedback", feedback_text):
+            if feedback_text:
+                st_feedback.error("\n".join(feedback_text))
+                # cv2.putText DIHAPUS agar frame bersih
+            else:
+                st_feedback.success("Form Bagus!")
+
+        # cv2.putText untuk Badan dan Arah DIHAPUS agar frame bersih
+
+    if frame_resized is None:
+        # Overlay dimatikan (mode tanpa video) atau frame ini di luar jadwal FPS Tampilan
+        return
+    try:
+        # JPEG sudah di-encode di thread analisis; ukuran mengikuti hasil resize (640px)
+        st_frame.image(frame_resized)
+    except Exception:
+        # Mengabaikan error jika frame gagal dirender saat cleanup (video selesai)
+        pass
+
+def show_perf_panel():
+    """Panel performa: FPS efektif, latensi p50/p95 per tahap, frame yang dibuang dan device aktif."""
+    rows = "\n".join(
+        f"| {stage} | {stats['p50_ms']:.1f} | {stats['p95_ms']:.1f} |"
+        for stage, stats in metrics.snapshot().items()
+    )
+    st_perf.markdown(
+        f"**Performa:** {metrics.fps:.1f} FPS · Device: `{metrics.info.get('device', '-')}` · "
+        f"Frame dibuang: {metrics.counters.get('dropped_frames', 0)} · "
+        f"Frame tampil/dilewati: {scheduler.frames_sent}/{scheduler.frames_skipped} · "
+        f"Update widget dilewati: {scheduler.updates_skipped}\n\n"
+        f"| Tahap | p50 (ms) | p95 (ms) |\n|---|---|---|\n{rows}"
+    )
+
+def show_service_panel(client):
+    """Metrik server inferensi: batch rata-rata dan antrian/latensi per klien (sesi ini ditandai)."""
+    try:
+        service_metrics = client.metrics()
+    except (OSError, EOFError, RuntimeError):
+        return  # Server socket terputus; error inferensi berikutnya yang akan ditampilkan
+    rows = "\n".join(
+        f"| {'**' + name + '**' if name == client.name else name} | {stats['queue_depth']} | "
+        f"{stats['p50_ms']:.1f} | {stats['p95_ms']:.1f} | {stats['wait_p95_ms']:.1f} |"
+        for name, stats in sorted(service_metrics["clients"].items())
+    )
+    st_service.markdown(
+        f"**Server Inferensi:** {len(service_metrics['clients'])} klien · "
+        f"batch rata-rata {service_metrics['mean_batch']} frame · antri {service_metrics['pending']} frame\n\n"
+        f"| Klien | Antrian | p50 (ms) | p95 (ms) | Tunggu p95 (ms) |\n|---|---|---|---|---|\n{rows}"
+    )
+
+def export_metrics():
+    """Menulis metrik ke file Prometheus (ditimpa) atau CSV (ditambahkan) sesuai pilihan sidebar."""
+    if metrics_export == "Prometheus":
+        metrics.write_prometheus(metrics_path)
+    elif metrics_export == "CSV":
+        # Nama file default berakhiran .prom, diganti .csv agar formatnya jelas
+        path = metrics_path[:-len(".prom")] + ".csv" if metrics_path.endswith(".prom") else metrics_path
+        metrics.append_csv(path)
+
 # --- MENAMPILKAN PESAN SUKSES SETELAH STOP ---
 # Kita cek apakah ada pesan yang ditinggalkan oleh Callback Stop
 if 'save_message' in st.session_state:
@@ -342,9 +658,14 @@ cap = None
 if input_source == "Video Upload":
     uploaded_file = st.file_uploader("Upload Video Latihan (Resolusi Asli)", type=['mp4', 'mov', 'avi'])
     if uploaded_file is not None:
-        tfile = tempfile.NamedTemporaryFile(delete=False) 
-        tfile.write(uploaded_file.read())
-        cap = cv2.VideoCapture(tfile.name)
+        # Path disimpan per file_id: rerun (klik tombol, ubah pengaturan) tidak meng-hash/menyalin ulang
+        if st.session_state.get('upload_id') != uploaded_file.file_id:
+            video_path, copied = get_upload_cache().ingest(uploaded_file, uploaded_file.name)
+            st.session_state.upload_id = uploaded_file.file_id
+            st.session_state.upload_path = video_path
+            if not copied:
+                st.toast("Video yang sama sudah ada, memakai salinan tersimpan.")
+        cap = cv2.VideoCapture(st.session_state.upload_path)
 
 elif input_source == "Webcam":
     # Inisialisasi State Webcam jika belum ada
@@ -374,92 +695,162 @@ if cap is not None and cap.isOpened():
     # PERBAIKAN: Menggunakan callback (on_click) untuk menjamin penyimpanan data
     st.button("Stop & Simpan", type="primary", use_container_width=True, on_click=stop_webcam_callback)
     
-    # Loop hanya jalan jika webcam masih berstatus aktif (belum distop lewat callback)
-    while st.session_state.get('webcam_active', True) and cap.isOpened():
-        ret, frame = cap.read()
-        if not ret:
-            # --- LOGIKA AUTO-SAVE SAAT VIDEO UPLOAD SELESAI ---
-            if input_source == "Video Upload":
-                if analyzer.counter > 0:
-                    save_history(exercise_type, analyzer.counter)
-                    st.success(f"Video Selesai. Latihan Disimpan: {exercise_type} ({analyzer.counter} Reps)")
-                    # Reset counter
-                    analyzer.counter = 0
-                    analyzer.stage = None
-                else:
-                    st.warning("Video selesai. Tidak ada repetisi untuk disimpan.")
-            break
-        
-        h, w, _ = frame.shape
-        
-        # --- UPDATE DISINI: TRY-EXCEPT UNTUK INFERENCE ---
+    # MENAMBAHKAN max_det=1 AGAR HANYA MENDETEKSI 1 ORANG
+    max_det = max_people if multi_person else 1
+    if inference_mode == "socket":
+        # Koneksi run sebelumnya ditutup; model & batch dinamis ada di proses server
+        if 'remote_client' in st.session_state:
+            st.session_state.pop('remote_client').close()
+        # "Asli" = ukuran inferensi server (bisa hasil auto-tune di server)
+        size_option = {} if infer_size == "Asli" else {"infer_size": infer_size}
         try:
-            # MENAMBAHKAN max_det=1 AGAR HANYA MENDETEKSI 1 ORANG
-            results = model(frame, verbose=False, conf=confidence_threshold, device=active_device, max_det=1)
-        except Exception as e:
-            # Jika error GPU saat runtime, pindah ke CPU dan coba lagi
-            if active_device == 'cuda:0':
-                st.toast("Error GPU Runtime. Switch ke CPU...", icon="⚠️")
-                active_device = 'cpu'
-                model.to('cpu')
-                results = model(frame, verbose=False, conf=confidence_threshold, device='cpu', max_det=1)
-            else:
-                raise e
-
-        # Plot keypoints saja (boxes=False akan menghilangkan kotak, menyisakan dot)
-        annotated_frame = results[0].plot(boxes=False)
+            runner = RemoteClient(parse_address(service_address), session_client_id(), confidence_threshold,
+                                  max_det=max_det, **size_option)
+        except (OSError, EOFError, RuntimeError, AuthenticationError) as e:
+            st.error(f"Tidak bisa terhubung ke server inferensi {service_address}: {e}.")
+            st.stop()
+        st.session_state.remote_client = runner
+        active_device, runner_infer_size = runner.device, runner.infer_size
+    else:
+        loaded = wait_for_model()
+        model, active_device = loaded["model"], loaded["device"]
+        if use_autotune and loaded["profile"] is None:
+            run_autotune(loaded, cap)
+        # Profil auto-tune (jika aktif) menentukan FP16 & ukuran inferensi
+        profile = loaded["profile"] or {}
+        runner_infer_size = profile.get("infer_size") if profile else (None if infer_size == "Asli" else infer_size)
+        for step, elapsed in loaded["timings"].items():
+            metrics.record(f"model_{step}", elapsed)
+        if inference_mode == "shared":
+            service = get_inference_service(
+                model_type, device_option, backend_option, precision_option, cpu_threads, use_autotune,
+                service_latency_ms, _loaded=loaded,
+            )
+            runner = service.client(session_client_id(), confidence_threshold, max_det=max_det,
+                                    infer_size=runner_infer_size)
+        else:
+            runner = model_utils.InferenceRunner(
+                model, active_device, confidence_threshold, max_det=max_det,
+                infer_size=runner_infer_size, half=profile.get("half", False)
+            )
+    service_client = runner if inference_mode else None
+    # Waktu dari awal run script sampai siap memproses (termasuk menunggu model)
+    metrics.record("startup", time.perf_counter() - SCRIPT_START)
+    first_frame_pending = True
+
+    # Batch hanya dipakai untuk Video Upload, webcam tetap 1 frame per inferensi
+    frames_per_call = batch_size if input_source == "Video Upload" else 1
+    # ROI mengikuti satu atlet; AdaptiveRunner (jika aktif) membungkusnya sehingga frame yang
+    # diinferensi pun cukup memakai potongan
+    if use_roi and not multi_person:
+        runner = RoiRunner(runner, roi_size=roi_size)
+    roi_runner = runner if isinstance(runner, RoiRunner) else None
+    # Interpolasi keypoints AdaptiveRunner hanya untuk satu orang
+    if use_adaptive and not multi_person:
+        # k otomatis mengikuti latensi device aktif terhadap FPS sumber
+        source_fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+        runner = AdaptiveRunner(runner, analyzer, fps=source_fps, max_stride=max_stride)
+
+    # Rekaman keypoints berlanjut lintas rerun selama sesi (analyzer) yang sama belum disimpan/di-reset
+    if record_trace and not multi_person and 'trace_recorder' not in st.session_state:
+        st.session_state.trace_recorder = TraceRecorder(
+            exercise_type, fps=cap.get(cv2.CAP_PROP_FPS) or None, source=input_source
+        )
+    trace_recorder = st.session_state.get('trace_recorder') if not multi_person else None
 
-        try:
-            keypoints = results[0].keypoints.xy.cpu().numpy()
-            
-            if len(keypoints) > 0:
-                person_keypoints = keypoints[0]
-                data = analyzer.analyze(person_keypoints)
-                
-                # Update UI Side Bar (Col2) - Semua teks dipindah ke sini
-                st_count.metric("Repetisi", data['count'])
-                st_stage.info(f"Posisi: {data['stage'] if data['stage'] else 'Mulai'}")
-                
-                # Menampilkan data detail di panel samping
-                st_angle.write(f"**Sudut Siku:** {int(data.get('angle', 0))}°")
-                st_body_angle.write(f"**Sudut Badan:** {int(data.get('body_angle', 0))}°")
-                
-                # Menampilkan Sudut Leher jika ada datanya
-                if data.get('neck_angle', 0) > 0:
-                     st_neck_angle.write(f"**Sudut Leher:** {int(data.get('neck_angle', 0))}°")
-                else:
-                     st_neck_angle.empty()
-
-                st_orientation.write(f"**Arah:** {data.get('orientation', '-')}")
-                
-                feedback_text = data.get('feedback', [])
-                if feedback_text:
-                    st_feedback.error("\n".join(feedback_text))
-                    # cv2.putText DIHAPUS agar frame bersih
-                else:
-                    st_feedback.success("Form Bagus!")
-
-                # cv2.putText untuk Badan dan Arah DIHAPUS agar frame bersih
+    metrics.set_info("device", active_device)
+    last_panel = last_export = time.perf_counter()
 
-        except Exception as e:
-            pass
-
-        frame_rgb = cv2.cvtColor(annotated_frame, cv2.COLOR_BGR2RGB)
-        
-        # --- PERBAIKAN DISPLAY: RESIZE VISUAL ---
-        # Kita kecilkan ukuran frame HANYA untuk ditampilkan di layar (biar gak kegedean).
-        # Tapi AI (model) di atas tetap memproses frame resolusi ASLI.
-        display_width = 640
-        aspect_ratio = h / w
-        display_height = int(display_width * aspect_ratio)
-        frame_resized = cv2.resize(frame_rgb, (display_width, display_height))
-        
-        try:
-            # Hapus width="stretch" agar ukuran mengikuti hasil resize (640px)
-            st_frame.image(frame_resized, channels="RGB")
-        except Exception:
-            # Mengabaikan error jika frame gagal dirender saat cleanup (video selesai)
-            pass
+    def show_stats():
+        """Menampilkan notifikasi fallback GPU, statistik batch/pipeline dan panel performa."""
+        global active_device, last_panel, last_export
+        if runner.device != active_device:
+            if runner.device == "cpu":
+                st.toast("Error GPU Runtime. Switch ke CPU (GPU dicoba lagi nanti)...", icon="⚠️")
+            else:
+                st.toast(f"Kembali ke {runner.device.upper()}.", icon="✅")
+            active_device = runner.device
+            metrics.set_info("device", active_device)
+        if frames_per_call > 1:
+            st_batch.caption(
+                f"Batch {frames_per_call}: {runner.stats.throughput:.1f} FPS inferensi, "
+                f"{runner.stats.mean_latency_ms:.0f} ms/batch"
+            )
+        if isinstance(runner, AdaptiveRunner):
+            st_cadence.caption(f"Adaptif: k={runner.stride}, {runner.skip_ratio:.0%} frame diinterpolasi")
+        if roi_runner is not None:
+            st_roi.caption(f"ROI: {roi_runner.roi_ratio:.0%} frame dari potongan, "
+                           f"{roi_runner.fallbacks} kali kembali ke frame penuh")
+
+        # Panel & ekspor dibatasi per interval agar tidak menambah beban loop utama
+        now = time.perf_counter()
+        if (show_perf or service_client is not None) and now - last_panel >= PERF_PANEL_INTERVAL:
+            if show_perf:
+                show_perf_panel()
+            if service_client is not None:
+                show_service_panel(service_client)
+            last_panel = now
+        if metrics_export != "Tidak" and now - last_export >= METRICS_EXPORT_INTERVAL:
+            export_metrics()
+            last_export = now
+
+    video_finished = False
+    if use_pipeline:
+        # Pipeline lama (dari run sebelumnya yang terputus oleh rerun) dihentikan dulu
+        stop_pipeline()
+
+        # Webcam membuang frame basi, file video memakai backpressure agar tidak ada frame terlewat
+        pipeline = FramePipeline(
+            cap, runner, prepare_result, frames_per_call, live=(input_source == "Webcam"), metrics=metrics
+        )
+        st.session_state.pipeline = pipeline
+        with pipeline:
+            for data, frame_resized in pipeline:
+                show_result(data, frame_resized)
+                show_stats()
+                if not st.session_state.get('webcam_active', True):
+                    break
+        video_finished = pipeline.finished
+    else:
+        # Loop hanya jalan jika webcam masih berstatus aktif (belum distop lewat callback)
+        while st.session_state.get('webcam_active', True) and cap.isOpened():
+            with metrics.time("capture", frames_per_call):
+                frames = model_utils.read_frames(cap, frames_per_call)
+
+            if frames:
+                # --- UPDATE DISINI: FALLBACK GPU -> CPU ADA DI InferenceRunner ---
+                with metrics.time("inference", len(frames)):
+                    results = runner(frames)
+                show_stats()
+
+                # Hasil diproses berurutan sesuai urutan frame, jadi hitungan repetisi sama dengan mode 1 frame
+                for frame, result in zip(frames, results):
+                    show_result(*prepare_result(frame, result))
+
+            if len(frames) < frames_per_call:
+                video_finished = True
+                break
+
+    # Ekspor terakhir agar file metrik mencakup seluruh sesi
+    if metrics_export != "Tidak":
+        export_metrics()
+
+    # --- LOGIKA AUTO-SAVE SAAT VIDEO UPLOAD SELESAI ---
+    if video_finished and input_source == "Video Upload" and multi_person:
+        saved = save_tracked_sessions(tracker)
+        if saved:
+            st.success(f"Video Selesai. Latihan Disimpan: {exercise_type} ({', '.join(saved)})")
+        else:
+            st.warning("Video selesai. Tidak ada repetisi untuk disimpan.")
+    elif video_finished and input_source == "Video Upload":
+        if analyzer.counter > 0:
+            save_history(exercise_type, analyzer.counter, trace=finish_trace_recording())
+            st.success(f"Video Selesai. Latihan Disimpan: {exercise_type} ({analyzer.counter} Reps)")
+            # Reset counter (beserta state filter & riwayat sudut)
+            analyzer.reset()
+        else:
+            finish_trace_recording(keep=False)
+            st.warning("Video selesai. Tidak ada repetisi untuk disimpan.")
 
     # Jangan release di sini jika webcam masih aktif, tapi karena kita break loop, ok untuk release jika stop ditekan
     # Jika loop berhenti karena tombol stop ditekan (via callback webcam_active jadi False), cap.release()
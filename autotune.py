@@ -0,0 +1,209 @@
+"""
+Auto-tuning konfigurasi inferensi per (model, device, backend).
+
+Beberapa kandidat (FP16 di GPU, jumlah thread & channels-last di CPU, ukuran inferensi) diukur pada
+frame uji. Dipilih kandidat dengan latensi per frame terendah yang keypoints-nya masih sesuai dengan
+konfigurasi acuan (FP32, ukuran asli) dalam batas toleransi. Profil disimpan di model_cache/autotune.json
+sehingga start berikutnya langsung memakai hasilnya tanpa mengukur ulang.
+
+Frame uji sebaiknya frame sungguhan (awal video/webcam). Jika konfigurasi acuan hampir tidak menemukan orang
+di frame uji, kesesuaian tidak bisa dinilai: tuning dibatalkan dan tidak ada profil yang disimpan.
+"""
+import json
+import os
+import time
+from datetime import datetime
+
+import cv2
+import numpy as np
+
+from model_utils import EXPORT_DIR, InferenceRunner, all_keypoints, read_frames
+from synthetic import exercise_sequence, render_frame
+
+PROFILE_PATH = os.path.join(EXPORT_DIR, "autotune.json")
+TUNE_SIZES = [None, 480, 320]
+# Rata-rata selisih keypoints maksimum, relatif terhadap sisi terpanjang frame
+KEYPOINT_TOLERANCE = 0.02
+# Bagian frame maksimum yang boleh berbeda status deteksinya (ada/tidak ada orang) dari acuan
+DETECTION_TOLERANCE = 0.1
+# Bagian frame uji minimum yang harus berisi orang menurut acuan agar hasil tuning bisa dipercaya
+MIN_REFERENCE_DETECTIONS = 0.5
+
+DEFAULT_PROFILE = {"half": False, "threads": None, "channels_last": False, "infer_size": None}
+
+def profile_key(model_name, device, backend="pytorch", precision="fp32"):
+    return f"{os.path.basename(model_name)}|{device}|{backend}|{precision}"
+
+def load_profiles(path=PROFILE_PATH):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_profile(key, profile, path=PROFILE_PATH):
+    """Menyimpan satu profil ke file (ditulis atomik, profil lain tetap)."""
+    profiles = load_profiles(path)
+    profiles[key] = profile
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(profiles, f, indent=2)
+    os.replace(tmp_path, path)
+
+def sample_frames(count=8, size=(1280, 720)):
+    """Frame uji sintetis (figur stik push-up) bila tidak ada frame dari video sungguhan."""
+    sequence = exercise_sequence("PushUp", frames=count, period=count)
+    return [render_frame(keypoints, size) for keypoints in sequence]
+
+def candidate_profiles(device, backend="pytorch"):
+    """
+    Daftar kandidat; kandidat pertama adalah acuan (setara perilaku tanpa auto-tune).
+    Thread & channels-last hanya dicoba untuk backend pytorch: apply_profile mengatur thread lewat torch,
+    yang tidak berpengaruh pada sesi ONNX Runtime/OpenVINO (thread-nya diatur load_model(threads=...)).
+    """
+    candidates = []
+    if backend == "pytorch" and device != "cpu":
+        options = [{"half": half} for half in (False, True)]
+    elif backend == "pytorch" and device == "cpu":
+        cores = os.cpu_count() or 1
+        threads = sorted({cores, max(1, cores // 2)}, reverse=True)
+        options = [{"threads": t, "channels_last": layout} for t in threads for layout in (False, True)]
+        options[0]["threads"] = None  # acuan: jumlah thread bawaan
+    else:
+        options = [{}]
+    for size in TUNE_SIZES:
+        for option in options:
+            candidates.append({**DEFAULT_PROFILE, **option, "infer_size": size})
+    return candidates
+
+def apply_profile(model, profile, default_threads=None):
+    """
+    Menerapkan bagian profil yang melekat pada model/proses (thread torch, channels-last).
+    threads None di profil berarti `default_threads` (jika diberikan) atau tidak diubah.
+    """
+    import torch
+
+    threads = profile.get("threads") or default_threads
+    if threads:
+        torch.set_num_threads(threads)
+    if isinstance(getattr(model, "model", None), torch.nn.Module):
+        memory_format = torch.channels_last if profile.get("channels_last") else torch.contiguous_format
+        model.model.to(memory_format=memory_format)
+
+def _first_person(results):
+    keypoints = np.zeros((len(results), 17, 2), dtype=np.float32)
+    detected = np.zeros(len(results), dtype=bool)
+    for i, result in enumerate(results):
+        people = all_keypoints(result)
+        if len(people):
+            keypoints[i], detected[i] = people[0, :, :2], True
+    return keypoints, detected
+
+def agreement(reference, candidate, frame_size):
+    """
+    Kesesuaian hasil kandidat terhadap acuan. reference/candidate: (keypoints (N, 17, 2), detected (N,)).
+    Mengembalikan tuple: (selisih keypoints relatif rata-rata, bagian frame yang beda status deteksi).
+    """
+    ref_kp, ref_det = reference
+    cand_kp, cand_det = candidate
+    mismatch = float(np.mean(ref_det != cand_det)) if len(ref_det) else 0.0
+    both = ref_det & cand_det
+    if not both.any():
+        return 0.0, mismatch
+    error = np.linalg.norm(ref_kp[both] - cand_kp[both], axis=-1).mean() / max(frame_size)
+    return float(error), mismatch
+
+def tune(model, device, conf=0.5, frames=None, backend="pytorch", repeat=3, tolerance=KEYPOINT_TOLERANCE,
+         detection_tolerance=DETECTION_TOLERANCE, min_detections=MIN_REFERENCE_DETECTIONS, log=None):
+    """
+    Mengukur semua kandidat dan mengembalikan profil tercepat yang lolos toleransi kesesuaian.
+    Profil berisi konfigurasi + latensi terukur (ms/frame) + hasil semua kandidat untuk ditinjau.
+    None jika acuan menemukan orang di kurang dari `min_detections` bagian frame uji (tidak bisa dinilai);
+    model dikembalikan ke konfigurasi bawaan.
+    """
+    import torch
+
+    frames = frames if frames is not None else sample_frames()
+    frame_size = frames[0].shape[:2]
+    default_threads = torch.get_num_threads()
+    reference = None
+    measured = []
+    for candidate in candidate_profiles(device, backend):
+        try:
+            apply_profile(model, candidate, default_threads)
+            runner = InferenceRunner(model, device, conf, max_det=1, infer_size=candidate["infer_size"],
+                                     half=candidate["half"])
+            runner(frames[:1])  # warm-up kandidat (alokasi ulang buffer, autotune cuDNN)
+            start = time.perf_counter()
+            for _ in range(repeat):
+                results = runner(frames)
+            latency = (time.perf_counter() - start) / (repeat * len(frames))
+        except Exception as e:
+            # Kombinasi tidak didukung (mis. FP16 di GPU lama) dilewati
+            if log:
+                log(f"Kandidat {candidate} gagal: {e}")
+            continue
+
+        output = _first_person(results)
+        if reference is None:
+            reference = output
+            if reference[1].mean() < min_detections:
+                if log:
+                    log(f"Auto-tune dibatalkan: orang hanya terdeteksi di {reference[1].sum()} dari "
+                        f"{len(frames)} frame uji.")
+                apply_profile(model, DEFAULT_PROFILE, default_threads)
+                return None
+        error, mismatch = agreement(reference, output, frame_size)
+        accepted = error <= tolerance and mismatch <= detection_tolerance
+        measured.append({**candidate, "latency_ms": round(latency * 1000, 3), "keypoint_error": round(error, 5),
+                         "detection_mismatch": round(mismatch, 3), "accepted": accepted})
+        if log:
+            log(f"{candidate}: {latency * 1000:.1f} ms/frame, selisih {error:.4f}, "
+                f"{'OK' if accepted else 'ditolak'}")
+
+    accepted = [m for m in measured if m["accepted"]]
+    best = min(accepted, key=lambda m: m["latency_ms"]) if accepted else {**DEFAULT_PROFILE}
+    profile = {key: best.get(key, value) for key, value in DEFAULT_PROFILE.items()}
+    profile.update({
+        "latency_ms": best.get("latency_ms"),
+        "baseline_latency_ms": measured[0]["latency_ms"] if measured else None,
+        "candidates": measured,
+        "tuned": datetime.now().isoformat(timespec="seconds"),
+    })
+    apply_profile(model, profile, default_threads)
+    return profile
+
+def read_sample_frames(video_path, count=8):
+    """Beberapa frame awal video sungguhan sebagai frame uji (lebih representatif dari frame sintetis)."""
+    cap = cv2.VideoCapture(video_path)
+    try:
+        return read_frames(cap, count) or None
+    finally:
+        cap.release()
+
+def cached_profile(model, model_name, device, backend="pytorch", precision="fp32", path=PROFILE_PATH):
+    """Profil tersimpan untuk (model, device, backend, presisi), diterapkan ke model; None jika belum ada."""
+    profile = load_profiles(path).get(profile_key(model_name, device, backend, precision))
+    if profile is not None:
+        if backend != "pytorch":
+            # Profil lama bisa berisi thread hasil kandidat torch yang tidak berefek pada backend ekspor
+            profile = {**profile, "threads": None, "channels_last": False}
+        apply_profile(model, profile)
+    return profile
+
+def load_or_tune(model, model_name, device, backend="pytorch", precision="fp32", conf=0.5, frames=None,
+                 retune=False, path=PROFILE_PATH, log=None):
+    """
+    Profil tersimpan untuk (model, device, backend, presisi), atau hasil tune() baru yang langsung disimpan.
+    Profil yang dipakai selalu diterapkan ke model. Mengembalikan tuple: (profil, dari_cache);
+    profil None jika tuning tidak bisa dinilai pada `frames` (konfigurasi bawaan dipakai, tidak disimpan).
+    """
+    if not retune:
+        profile = cached_profile(model, model_name, device, backend, precision, path)
+        if profile is not None:
+            return profile, True
+    profile = tune(model, device, conf, frames, backend, log=log)
+    if profile is not None:
+        save_profile(profile_key(model_name, device, backend, precision), profile, path)
+    return profile, False
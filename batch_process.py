@@ -0,0 +1,290 @@
+"""
+Pemrosesan video secara offline tanpa UI Streamlit.
+
+Contoh:
+    python batch_process.py uploads/ --exercise PushUp --model yolov8n-pose.pt --output-dir hasil_batch
+    python batch_process.py uploads/ --workers 4 --save-history
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures.process import BrokenProcessPool
+
+import cv2
+import numpy as np
+import pandas as pd
+
+from autotune import load_or_tune, read_sample_frames
+from exercises import get_exercise
+from history import HistoryStore
+from model_utils import (
+    BACKENDS, INFER_SIZES, MODEL_CHOICES, PRECISIONS, InferenceRunner, load_model, person_keypoints, read_frames,
+)
+from parallel import OVERLAP_FRAMES, SEGMENT_FRAMES, extract_videos_parallel, worker_threads
+from pose_analyzer import PoseAnalyzer, EXERCISE_TYPES
+
+VIDEO_EXTENSIONS = ('.mp4', '.mov', '.avi')
+
+def find_videos(paths):
+    """Mengumpulkan file video dari daftar file dan/atau direktori (tidak rekursif)."""
+    videos = []
+    for path in paths:
+        if os.path.isdir(path):
+            for name in sorted(os.listdir(path)):
+                if name.lower().endswith(VIDEO_EXTENSIONS):
+                    videos.append(os.path.join(path, name))
+        elif os.path.isfile(path):
+            videos.append(path)
+        else:
+            print(f"⚠️ Lewati, path tidak ditemukan: {path}")
+    return videos
+
+def extract_keypoints(runner, video_path, batch_size=1):
+    """
+    Menjalankan InferenceRunner pada setiap frame video, `batch_size` frame per panggilan model.
+    Latensi setiap batch tercatat di runner.stats.
+    Mengembalikan tuple: (keypoints (N, 17, 2), detected (N,) bool, fps)
+    """
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise IOError(f"Video tidak bisa dibuka: {video_path}")
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+
+    keypoints_list = []
+    detected = []
+    try:
+        while True:
+            frames = read_frames(cap, batch_size)
+            if not frames:
+                break
+
+            for result in runner(frames):
+                keypoints = person_keypoints(result)
+                if keypoints is not None:
+                    keypoints_list.append(keypoints)
+                    detected.append(True)
+                else:
+                    keypoints_list.append(np.zeros((17, 2), dtype=np.float32))
+                    detected.append(False)
+            if len(frames) < batch_size:
+                break
+    finally:
+        cap.release()
+
+    if not keypoints_list:
+        return np.zeros((0, 17, 2), dtype=np.float32), np.zeros(0, dtype=bool), fps
+    return np.stack(keypoints_list), np.array(detected), fps
+
+def build_trace(results, frame_indices, fps, exercise="PushUp"):
+    """Menyusun trace sudut per frame dari hasil PoseAnalyzer.analyze_batch (kolom sudut sesuai definisi latihan)."""
+    trace = pd.DataFrame({
+        "frame": frame_indices,
+        "waktu_detik": np.asarray(frame_indices, dtype=np.float64) / fps,
+    })
+    for column, _ in get_exercise(exercise).result_keys:
+        trace[column] = [float(r[column]) if column in r else np.nan for r in results]
+    trace["stage"] = [r["stage"] for r in results]
+    trace["count"] = [r["count"] for r in results]
+    return trace
+
+def analyze_keypoints(video_path, exercise, keypoints, detected, fps, analyzer_options=None):
+    """
+    Menjalankan PoseAnalyzer pada keypoints satu video (frame tanpa orang dilewati).
+    Mengembalikan tuple: (ringkasan dict, trace DataFrame).
+    """
+    analyzer = PoseAnalyzer(exercise, fps=fps, **(analyzer_options or {}))
+    results = analyzer.analyze_batch(keypoints[detected, :, :2])
+    trace = build_trace(results, np.flatnonzero(detected), fps, exercise)
+    summary = {
+        "Video": video_path,
+        "Jenis Latihan": exercise,
+        "Repetisi": analyzer.counter,
+        "Frame": len(detected),
+        "Frame Terdeteksi": int(detected.sum()),
+    }
+    return summary, trace
+
+def process_video(model, device, video_path, exercise, conf, batch_size=1, infer_size=None, analyzer_options=None,
+                  half=False):
+    """
+    Menghitung repetisi satu video. Mengembalikan tuple: (ringkasan dict, trace DataFrame).
+    analyzer_options diteruskan ke PoseAnalyzer (mis. smoothing, hysteresis, min_dwell).
+    """
+    start = time.perf_counter()
+    runner = InferenceRunner(model, device, conf, max_det=1, infer_size=infer_size, half=half)
+    keypoints, detected, fps = extract_keypoints(runner, video_path, batch_size)
+    stats = runner.stats
+
+    summary, trace = analyze_keypoints(video_path, exercise, keypoints, detected, fps, analyzer_options)
+    summary.update({
+        "Durasi Proses (s)": round(time.perf_counter() - start, 3),
+        "Batch": batch_size,
+        "Ukuran Inferensi": infer_size or "Asli",
+        "Throughput (FPS)": round(stats.throughput, 2),
+        "Latensi Batch (ms)": round(stats.mean_latency_ms, 2),
+    })
+    return summary, trace
+
+def process_videos_parallel(videos, args, analyzer_options, profile=None):
+    """
+    Mode --workers > 1: inferensi di process pool (lihat parallel.py), analisis di proses ini.
+    Mengembalikan list tuple (video, ringkasan, trace) untuk video yang berhasil.
+    """
+    processed = []
+    infer_size = profile["infer_size"] if profile else args.imgsz
+
+    def on_done(video_path, extracted):
+        summary, trace = analyze_keypoints(
+            video_path, args.exercise, extracted["keypoints"], extracted["detected"], extracted["fps"],
+            analyzer_options,
+        )
+        inference_time = extracted["inference_time"]
+        summary.update({
+            "Durasi Proses (s)": round(extracted["wall_time"], 3),
+            "Batch": args.batch_size,
+            "Ukuran Inferensi": infer_size or "Asli",
+            "Throughput (FPS)": round(len(extracted["detected"]) / inference_time, 2) if inference_time else 0.0,
+            "Latensi Batch (ms)": round(1000.0 * inference_time / max(1, extracted["batches"]), 2),
+            "Segmen": extracted["segments"],
+        })
+        processed.append((video_path, summary, trace))
+        print(f"✅ {video_path}: {summary['Repetisi']} Reps ({summary['Frame']} frame, "
+              f"{summary['Segmen']} segmen, {extracted['device'].upper()})")
+        if extracted["realigned"]:
+            print(f"⚠️ {video_path}: {extracted['realigned']} segmen dibaca ulang tanpa seek "
+                  f"(sambungan antar segmen tidak meyakinkan)")
+
+    print(f"🔄 Memproses {len(videos)} video dengan {args.workers} worker "
+          f"({worker_threads(args.workers)} thread/worker)...")
+    try:
+        results = extract_videos_parallel(
+            videos, args.model, args.device, args.conf, args.workers, args.batch_size, infer_size,
+            backend=args.backend, precision=args.precision,
+            segment_frames=args.segment_frames, overlap=args.overlap, on_done=on_done,
+            half=bool(profile and profile["half"]), profile=profile,
+        )
+    except BrokenProcessPool as e:
+        print(f"❌ Worker berhenti tidak normal (gagal memuat model?): {e}")
+        return []
+    for extracted in results:
+        if "error" in extracted:
+            print(f"❌ {extracted['error']}")
+    order = {video: i for i, video in enumerate(videos)}
+    return sorted(processed, key=lambda item: order[item[0]])
+
+def autotune_profile(model, device, args, sample_video):
+    """
+    Profil auto-tune (dari cache atau diukur pada frame awal `sample_video`) dan menerapkannya ke model.
+    None jika tuning tidak bisa dinilai pada video itu.
+    """
+    profile, cached = load_or_tune(
+        model, args.model, device, backend=args.backend, precision=args.precision, conf=args.conf,
+        frames=read_sample_frames(sample_video), log=print,
+    )
+    if profile is None:
+        print(f"⚠️ Auto-tune dilewati (tidak ada orang di awal {sample_video}), memakai pengaturan biasa.")
+        return None
+    source = "tersimpan" if cached else "baru diukur"
+    print(f"⚙️ Auto-tune ({source}): {'FP16' if profile['half'] else 'FP32'}, "
+          f"ukuran {profile['infer_size'] or 'asli'}, thread {profile['threads'] or 'bawaan'}, "
+          f"channels-last {'ya' if profile['channels_last'] else 'tidak'}, {profile['latency_ms']} ms/frame")
+    return profile
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Hitung repetisi dari video latihan tanpa UI.")
+    parser.add_argument("inputs", nargs="+", help="File video atau direktori berisi video.")
+    parser.add_argument("--exercise", choices=EXERCISE_TYPES, default="PushUp")
+    parser.add_argument("--model", choices=MODEL_CHOICES, default="yolov8n-pose.pt")
+    parser.add_argument("--device", choices=["cpu", "cuda:0"], default="cpu")
+    parser.add_argument("--backend", choices=BACKENDS, default="pytorch",
+                        help="Backend inferensi. Selain pytorch memakai model ekspor dari cache (diekspor jika belum ada).")
+    parser.add_argument("--precision", default="fp32",
+                        help="Presisi model ekspor: " + "; ".join(f"{b}: {', '.join(p)}" for b, p in PRECISIONS.items()) + ".")
+    parser.add_argument("--conf", type=float, default=0.5, help="Confidence threshold.")
+    parser.add_argument("--batch-size", type=int, default=1, help="Jumlah frame per panggilan model.")
+    parser.add_argument("--imgsz", type=int, choices=INFER_SIZES, default=None,
+                        help="Ukuran inferensi (sisi terpanjang). Default: frame asli.")
+    parser.add_argument("--smoothing", choices=["none", "ema", "one_euro"], default="none",
+                        help="Penghalusan sudut antar frame sebelum state machine.")
+    parser.add_argument("--hysteresis", type=float, default=0.0, help="Margin ambang stage (derajat).")
+    parser.add_argument("--min-dwell", type=int, default=1, help="Frame berturut-turut sebelum stage berubah.")
+    parser.add_argument("--output-dir", default="hasil_batch", help="Direktori output CSV.")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Jumlah proses paralel. >1: video dipecah per segmen ke process pool.")
+    parser.add_argument("--segment-frames", type=int, default=SEGMENT_FRAMES,
+                        help="Panjang segmen per tugas worker (frame). 0 = satu video satu tugas.")
+    parser.add_argument("--overlap", type=int, default=OVERLAP_FRAMES,
+                        help="Frame tumpang tindih antar segmen untuk penyelarasan sambungan.")
+    parser.add_argument("--autotune", action="store_true",
+                        help="Pilih FP16/thread/channels-last/ukuran inferensi tercepat (disimpan per model & device). "
+                             "Menggantikan --imgsz.")
+    parser.add_argument("--save-history", action="store_true",
+                        help="Simpan hasil semua video ke riwayat (history.db) setelah selesai.")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.precision not in PRECISIONS[args.backend]:
+        print(f"❌ Presisi {args.precision} tidak didukung untuk backend {args.backend} "
+              f"(pilihan: {', '.join(PRECISIONS[args.backend])}).")
+        return 2
+    videos = find_videos(args.inputs)
+    if not videos:
+        print("❌ Tidak ada video untuk diproses.")
+        return 1
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    analyzer_options = {
+        "smoothing": None if args.smoothing == "none" else args.smoothing,
+        "hysteresis": args.hysteresis,
+        "min_dwell": args.min_dwell,
+    }
+    if args.workers > 1:
+        profile = None
+        if args.autotune:
+            # Profil diukur sekali di proses ini, worker hanya menerapkannya
+            model, device = load_model(args.model, args.device, backend=args.backend, precision=args.precision)
+            profile = autotune_profile(model, device, args, videos[0])
+            del model
+        processed = process_videos_parallel(videos, args, analyzer_options, profile)
+    else:
+        processed = []
+        model, device = load_model(args.model, args.device, backend=args.backend, precision=args.precision)
+        print(f"✅ Model {args.model} ({args.backend}/{args.precision}) berjalan di: {device.upper()}")
+        profile = autotune_profile(model, device, args, videos[0]) if args.autotune else None
+        infer_size = profile["infer_size"] if profile else args.imgsz
+        for video_path in videos:
+            print(f"\n🔄 Memproses: {video_path}")
+            try:
+                summary, trace = process_video(
+                    model, device, video_path, args.exercise, args.conf, args.batch_size, infer_size,
+                    analyzer_options, half=bool(profile and profile["half"]),
+                )
+            except IOError as e:
+                print(f"❌ {e}")
+                continue
+            processed.append((video_path, summary, trace))
+            print(f"✅ {summary['Repetisi']} Reps ({summary['Frame']} frame, {summary['Durasi Proses (s)']} s, "
+                  f"{summary['Throughput (FPS)']} FPS inferensi)")
+
+    for video_path, _, trace in processed:
+        stem = os.path.splitext(os.path.basename(video_path))[0]
+        trace.to_csv(os.path.join(args.output_dir, f"{stem}_trace.csv"), index=False)
+    summaries = [summary for _, summary, _ in processed]
+
+    if args.save_history and summaries:
+        # Satu penulis di akhir: worker tidak pernah menyentuh SQLite
+        store = HistoryStore()
+        for summary in summaries:
+            store.append(summary["Jenis Latihan"], summary["Repetisi"], status="Batch")
+        store.close()
+        print(f"📝 {len(summaries)} hasil disimpan ke riwayat.")
+
+    summary_path = os.path.join(args.output_dir, "ringkasan.csv")
+    pd.DataFrame(summaries).to_csv(summary_path, index=False)
+    print(f"\n🎉 Selesai. Ringkasan disimpan di {summary_path}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
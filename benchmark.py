@@ -0,0 +1,443 @@
+"""
+Benchmark performa pipeline AI Workout Assistant.
+
+Contoh:
+    python benchmark.py batch latihan.mp4 --sizes 1,2,4,8,16 --device cpu
+    python benchmark.py resolution latihan.mp4 --sizes 320,480,640,960
+    python benchmark.py backends latihan.mp4 --backends onnx:fp32,onnx:int8,openvino:fp32 --threads 4
+    python benchmark.py suite --output hasil.json --baseline baseline.json
+
+Subcommand `suite` memakai data sintetis (synthetic.py) sehingga bisa berjalan offline di mesin CPU-only.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import cv2
+import numpy as np
+
+from batch_process import extract_keypoints, process_video
+from history import HistoryStore
+from model_utils import (
+    MODEL_CHOICES, InferenceRunner, load_model, person_keypoints, read_frames, resize_for_inference,
+)
+from overlay import OverlayRenderer
+from pose_analyzer import ANGLE_TRIPLETS, EXERCISE_TYPES, PoseAnalyzer, calculate_angle, calculate_angles
+from synthetic import exercise_sequence, write_video
+
+def parse_int_list(text):
+    return [int(x) for x in text.split(",") if x.strip()]
+
+def bench_batch_sizes(model, device, video_path, exercise, conf, sizes):
+    """
+    Menjalankan video yang sama dengan beberapa ukuran batch.
+    Mengembalikan list dict (satu per ukuran batch) berisi throughput, latensi dan jumlah repetisi.
+    """
+    rows = []
+    for size in sizes:
+        summary, _ = process_video(model, device, video_path, exercise, conf, batch_size=size)
+        rows.append(summary)
+    return rows
+
+def keypoint_error(keypoints, detected, ref_keypoints, ref_detected):
+    """Rata-rata jarak (piksel, koordinat asli) antar keypoints yang terlihat di kedua hasil."""
+    both = detected & ref_detected
+    if not both.any():
+        return float("nan")
+    a, b = keypoints[both], ref_keypoints[both]
+    visible = (a != 0).all(axis=-1) & (b != 0).all(axis=-1)
+    if not visible.any():
+        return float("nan")
+    return float(np.linalg.norm(a - b, axis=-1)[visible].mean())
+
+def bench_resolutions(model, device, video_path, exercise, conf, sizes):
+    """
+    Membandingkan latensi per frame dan akurasi (repetisi & error keypoints) untuk tiap ukuran inferensi.
+    Acuan akurasi adalah frame asli (tanpa pre-resize).
+    """
+    runs = []
+    for size in [None] + list(sizes):
+        runner = InferenceRunner(model, device, conf, max_det=1, infer_size=size)
+        keypoints, detected, _ = extract_keypoints(runner, video_path)
+        analyzer = PoseAnalyzer(exercise)
+        analyzer.analyze_batch(keypoints[detected])
+        runs.append((size, keypoints, detected, analyzer.counter, runner.stats))
+
+    _, ref_keypoints, ref_detected, ref_reps, _ = runs[0]
+    rows = []
+    for size, keypoints, detected, reps, stats in runs:
+        rows.append({
+            "Ukuran": size or "Asli",
+            "Latensi/frame (ms)": round(stats.mean_latency_ms, 2),
+            "p95 (ms)": round(stats.percentile_latency_ms(95), 2),
+            "Repetisi": reps,
+            "Selisih Repetisi": reps - ref_reps,
+            "Error Keypoint (px)": round(keypoint_error(keypoints, detected, ref_keypoints, ref_detected), 2),
+        })
+    return rows
+
+def load_frames(video_path, count):
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise IOError(f"Video tidak bisa dibuka: {video_path}")
+    try:
+        return read_frames(cap, count)
+    finally:
+        cap.release()
+
+def run_frames(model, device, frames, conf):
+    """Inferensi per frame. Mengembalikan tuple: (keypoints (N, 17, 2), detected (N,), BatchStats)."""
+    runner = InferenceRunner(model, device, conf, max_det=1)
+    keypoints = np.zeros((len(frames), 17, 2), dtype=np.float32)
+    detected = np.zeros(len(frames), dtype=bool)
+    for i, frame in enumerate(frames):
+        person = person_keypoints(runner([frame])[0])
+        if person is not None:
+            keypoints[i], detected[i] = person, True
+    return keypoints, detected, runner.stats
+
+def bench_backends(model_names, backends, device, frames, conf, threads=None, tolerance_px=5.0):
+    """
+    Membandingkan latensi per frame dan kecocokan keypoints setiap backend ekspor terhadap baseline .pt.
+    backends: list tuple (backend, presisi), mis. [("onnx", "fp32"), ("openvino", "int8")].
+    """
+    rows = []
+    for model_name in model_names:
+        model, active_device = load_model(model_name, device, threads=threads)
+        run_frames(model, active_device, frames[:1], conf)  # warm-up
+        ref_keypoints, ref_detected, ref_stats = run_frames(model, active_device, frames, conf)
+        rows.append({
+            "Model": model_name, "Backend": "pytorch", "Presisi": "fp32",
+            "Latensi/frame (ms)": round(ref_stats.mean_latency_ms, 2),
+            "Error Keypoint (px)": 0.0, f"<= {tolerance_px:g}px": "100%",
+        })
+
+        for backend, precision in backends:
+            try:
+                model, active_device = load_model(model_name, device, backend=backend, precision=precision, threads=threads)
+            except Exception as e:
+                print(f"⚠️ Lewati {model_name} {backend}/{precision}: {e}")
+                continue
+            keypoints, detected, stats = run_frames(model, active_device, frames, conf)
+
+            both = detected & ref_detected
+            distance = np.linalg.norm(keypoints[both] - ref_keypoints[both], axis=-1)
+            within = f"{(distance <= tolerance_px).mean():.0%}" if distance.size else "-"
+            rows.append({
+                "Model": model_name, "Backend": backend, "Presisi": precision,
+                "Latensi/frame (ms)": round(stats.mean_latency_ms, 2),
+                "Error Keypoint (px)": round(keypoint_error(keypoints, detected, ref_keypoints, ref_detected), 2),
+                f"<= {tolerance_px:g}px": within,
+            })
+    return rows
+
+def measure(name, fn, items=1, repeat=15, warmup=1, **extra):
+    """
+    Menjalankan fn() `warmup` + `repeat` kali. Mengembalikan dict hasil dengan latensi per item (µs)
+    dan throughput (item/detik). `extra` ditambahkan apa adanya (mis. jumlah repetisi).
+    "Min (µs)" (putaran tercepat) paling tidak terpengaruh gangguan mesin dan dipakai untuk deteksi regresi.
+    """
+    for _ in range(warmup):
+        fn()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    per_item = np.array(times) / items * 1e6
+    return {
+        "Tahap": name,
+        "Item": items,
+        "Rata-rata (µs)": round(float(per_item.mean()), 3),
+        "Min (µs)": round(float(per_item.min()), 3),
+        "p50 (µs)": round(float(np.percentile(per_item, 50)), 3),
+        "p95 (µs)": round(float(np.percentile(per_item, 95)), 3),
+        "Throughput (/s)": round(float(1e6 / per_item.mean()), 1),
+        **extra,
+    }
+
+def bench_angles(sequence, repeat):
+    def scalar():
+        for k in sequence:
+            calculate_angle(k[6], k[8], k[10])
+
+    return [
+        measure("angle.calculate_angle", scalar, len(sequence), repeat),
+        measure("angle.calculate_angles", lambda: calculate_angles(sequence, ANGLE_TRIPLETS), len(sequence), repeat),
+    ]
+
+def bench_analyzer(sequences, repeat):
+    """Per latihan: analyze() per frame dan analyze_batch(). Jumlah repetisi ikut dicatat sebagai penjaga akurasi."""
+    rows = []
+    for exercise, sequence in sequences.items():
+        def per_frame():
+            analyzer = PoseAnalyzer(exercise)
+            for k in sequence:
+                analyzer.analyze(k)
+            return analyzer.counter
+
+        def batch():
+            analyzer = PoseAnalyzer(exercise)
+            analyzer.analyze_batch(sequence)
+            return analyzer.counter
+
+        rows.append(measure(f"analyzer.analyze.{exercise}", per_frame, len(sequence), repeat, Repetisi=per_frame()))
+        rows.append(measure(f"analyzer.analyze_batch.{exercise}", batch, len(sequence), repeat, Repetisi=batch()))
+    return rows
+
+def bench_frames(frames, keypoints, infer_size, repeat):
+    """Decode-independen: resize untuk inferensi, konversi warna dan overlay pada frame yang sudah ada di memori."""
+    h, w = frames[0].shape[:2]
+    renderer = OverlayRenderer(640)
+    people = np.concatenate([keypoints[:len(frames)], np.ones((len(frames), 17, 1), dtype=np.float32)], axis=-1)
+    people[..., :2] *= [w / 640, h / 360]
+
+    def resize():
+        for frame in frames:
+            resize_for_inference(frame, infer_size)
+
+    def convert():
+        for frame in frames:
+            cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+
+    def overlay():
+        for frame, person in zip(frames, people):
+            renderer.render(frame, person[np.newaxis])
+
+    return [
+        measure(f"frame.resize.{w}x{h}->{infer_size}", resize, len(frames), repeat),
+        measure(f"frame.cvtColor.{w}x{h}", convert, len(frames), repeat),
+        measure(f"overlay.render.{w}x{h}", overlay, len(frames), repeat),
+    ]
+
+def bench_history(rows, workdir, repeat):
+    """append (save_history) dan view/query (load_history) pada database berisi `rows` baris."""
+    store = HistoryStore(os.path.join(workdir, f"history_{rows}.db"), legacy_csv=None)
+    try:
+        start = time.perf_counter()
+        for i in range(rows):
+            store.append(EXERCISE_TYPES[i % len(EXERCISE_TYPES)], i % 30)
+        fill_time = time.perf_counter() - start
+
+        results = [{
+            "Tahap": f"history.append.fill_{rows}",
+            "Item": rows,
+            "Rata-rata (µs)": round(fill_time / rows * 1e6, 3),
+            "p50 (µs)": None, "p95 (µs)": None,
+            "Throughput (/s)": round(rows / fill_time, 1),
+        }]
+        results.append(measure(f"history.append.at_{rows}", lambda: store.append("PushUp", 10), 1, repeat * 4))
+
+        def cold_view():
+            # Koneksi baru = cache view kosong, sama seperti saat aplikasi pertama dibuka
+            fresh = HistoryStore(store.path, legacy_csv=None)
+            try:
+                return fresh.view()
+            finally:
+                fresh.close()
+
+        results.append(measure(f"history.view.cold_{rows}", cold_view, 1, repeat))
+        results.append(measure(f"history.view.cached_{rows}", store.view, 1, repeat * 4))
+        results.append(measure(f"history.query.exercise_{rows}", lambda: store.query(exercise="PullUp"), 1, repeat))
+        return results
+    finally:
+        store.close()
+
+def bench_inference(frames, models, devices, conf, repeat):
+    """Inferensi per model dan device pada frame video uji. Model yang gagal dimuat (mis. offline) dilewati."""
+    rows = []
+    for model_name in models:
+        for device in devices:
+            try:
+                model, active_device = load_model(model_name, device)
+            except Exception as e:
+                print(f"⚠️ Lewati inferensi {model_name} @ {device}: {e}")
+                continue
+            if active_device != device:
+                print(f"⚠️ Lewati inferensi {model_name} @ {device}: device tidak tersedia")
+                continue
+            runner = InferenceRunner(model, active_device, conf, max_det=1)
+
+            def run():
+                for frame in frames:
+                    runner([frame])
+
+            rows.append(measure(f"inference.{model_name}.{device}", run, len(frames), repeat, warmup=1))
+    return rows
+
+def environment_info():
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "opencv": cv2.__version__,
+    }
+
+def compare_results(rows, baseline_rows, tolerance, noise_floor=0.5):
+    """
+    Membandingkan hasil dengan baseline JSON. Mengembalikan list pesan regresi:
+    tahap yang Min (µs)-nya lebih lambat dari (1 + tolerance) x baseline dan selisihnya di atas
+    `noise_floor` µs, atau jumlah repetisi yang berubah. Tahap yang hanya diukur sekali (tanpa Min,
+    mis. video.decode dan history.append.fill) terlalu bising dan tidak dinilai waktunya.
+    """
+    baseline = {row["Tahap"]: row for row in baseline_rows}
+    regressions = []
+    for row in rows:
+        old = baseline.get(row["Tahap"])
+        if old is None:
+            continue
+        if old.get("Repetisi") is not None and row.get("Repetisi") != old["Repetisi"]:
+            regressions.append(f"{row['Tahap']}: repetisi {old['Repetisi']} -> {row.get('Repetisi')}")
+        before, after = old.get("Min (µs)"), row.get("Min (µs)")
+        if not before or after is None:
+            continue
+        if after > before * (1 + tolerance) and after - before > noise_floor:
+            regressions.append(f"{row['Tahap']}: min {before} -> {after} µs ({after / before:.2f}x)")
+    return regressions
+
+def print_table(rows, columns):
+    widths = [max(len(col), *(len(str(row.get(col, ""))) for row in rows)) for col in columns]
+    print("  ".join(col.ljust(w) for col, w in zip(columns, widths)))
+    for row in rows:
+        print("  ".join(str(row.get(col, "")).ljust(w) for col, w in zip(columns, widths)))
+
+def run_batch(args):
+    model, device = load_model(args.model, args.device)
+    rows = bench_batch_sizes(model, device, args.video, args.exercise, args.conf, parse_int_list(args.sizes))
+    print_table(rows, ["Batch", "Throughput (FPS)", "Latensi Batch (ms)", "Repetisi"])
+
+    reps = {row["Repetisi"] for row in rows}
+    if len(reps) > 1:
+        print("❌ Jumlah repetisi berbeda antar ukuran batch!")
+        return 1
+    print("✅ Jumlah repetisi identik di semua ukuran batch.")
+    return 0
+
+def run_resolution(args):
+    model, device = load_model(args.model, args.device)
+    rows = bench_resolutions(model, device, args.video, args.exercise, args.conf, parse_int_list(args.sizes))
+    print_table(rows, ["Ukuran", "Latensi/frame (ms)", "p95 (ms)", "Repetisi", "Selisih Repetisi", "Error Keypoint (px)"])
+    return 0
+
+def run_backends(args):
+    frames = load_frames(args.video, args.frames)
+    backends = [tuple(item.split(":")) for item in args.backends.split(",") if item.strip()]
+    models = args.models.split(",") if args.models else MODEL_CHOICES
+    rows = bench_backends(models, backends, args.device, frames, args.conf, args.threads or None)
+    print_table(rows, ["Model", "Backend", "Presisi", "Latensi/frame (ms)", "Error Keypoint (px)", "<= 5px"])
+    return 0
+
+def run_suite(args):
+    width, height = (int(x) for x in args.video_size.lower().split("x"))
+    sequences = {exercise: exercise_sequence(exercise, args.frames, noise=1.0) for exercise in EXERCISE_TYPES}
+
+    rows = []
+    rows += bench_angles(sequences["PushUp"], args.repeat)
+    rows += bench_analyzer(sequences, args.repeat)
+
+    with tempfile.TemporaryDirectory(prefix="bench_") as workdir:
+        video_path = write_video(os.path.join(workdir, "pushup.mp4"), sequences["PushUp"], (width, height))
+        cap = cv2.VideoCapture(video_path)
+        start = time.perf_counter()
+        frames = read_frames(cap, args.frames)
+        decode_time = time.perf_counter() - start
+        cap.release()
+        rows.append({
+            "Tahap": f"video.decode.{width}x{height}", "Item": len(frames),
+            "Rata-rata (µs)": round(decode_time / max(len(frames), 1) * 1e6, 3), "p50 (µs)": None, "p95 (µs)": None,
+            "Throughput (/s)": round(len(frames) / decode_time, 1) if decode_time else 0.0,
+        })
+
+        rows += bench_frames(frames, sequences["PushUp"], args.imgsz, args.repeat)
+        for history_rows in parse_int_list(args.history_rows):
+            rows += bench_history(history_rows, workdir, args.repeat)
+        if args.models:
+            inference_frames = frames[:args.inference_frames]
+            rows += bench_inference(inference_frames, args.models.split(","), args.devices.split(","), args.conf, args.repeat)
+
+    print_table(rows, ["Tahap", "Item", "Rata-rata (µs)", "Min (µs)", "p95 (µs)", "Throughput (/s)", "Repetisi"])
+
+    report = {"environment": environment_info(), "results": rows}
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"💾 Hasil disimpan: {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare_results(rows, baseline["results"], args.tolerance, args.noise_floor)
+        if regressions:
+            print(f"❌ Regresi dibanding {args.baseline} (toleransi {args.tolerance:.0%}):")
+            for message in regressions:
+                print(f"   - {message}")
+            return 1
+        print(f"✅ Tidak ada regresi dibanding {args.baseline}.")
+    return 0
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark pipeline AI Workout Assistant.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    batch = sub.add_parser("batch", help="Throughput dan latensi per ukuran batch inferensi.")
+    batch.add_argument("video")
+    batch.add_argument("--sizes", default="1,2,4,8,16", help="Daftar ukuran batch, dipisah koma.")
+    batch.add_argument("--exercise", choices=EXERCISE_TYPES, default="PushUp")
+    batch.add_argument("--model", choices=MODEL_CHOICES, default="yolov8n-pose.pt")
+    batch.add_argument("--device", choices=["cpu", "cuda:0"], default="cpu")
+    batch.add_argument("--conf", type=float, default=0.5)
+    batch.set_defaults(func=run_batch)
+
+    resolution = sub.add_parser("resolution", help="Akurasi repetisi vs latensi per ukuran inferensi.")
+    resolution.add_argument("video")
+    resolution.add_argument("--sizes", default="320,480,640,960,1280", help="Daftar ukuran inferensi, dipisah koma.")
+    resolution.add_argument("--exercise", choices=EXERCISE_TYPES, default="PushUp")
+    resolution.add_argument("--model", choices=MODEL_CHOICES, default="yolov8n-pose.pt")
+    resolution.add_argument("--device", choices=["cpu", "cuda:0"], default="cpu")
+    resolution.add_argument("--conf", type=float, default=0.5)
+    resolution.set_defaults(func=run_resolution)
+
+    backends = sub.add_parser("backends", help="Latensi & kecocokan keypoints backend ekspor vs baseline .pt.")
+    backends.add_argument("video")
+    backends.add_argument("--backends", default="onnx:fp32,onnx:int8,openvino:fp32,openvino:int8,torchscript:fp32",
+                          help="Daftar backend:presisi, dipisah koma.")
+    backends.add_argument("--models", default="", help="Daftar model dipisah koma (default: semua pilihan di sidebar).")
+    backends.add_argument("--frames", type=int, default=100, help="Jumlah frame pertama video yang dipakai.")
+    backends.add_argument("--threads", type=int, default=0, help="Thread CPU (0 = otomatis).")
+    backends.add_argument("--device", choices=["cpu", "cuda:0"], default="cpu")
+    backends.add_argument("--conf", type=float, default=0.5)
+    backends.set_defaults(func=run_backends)
+
+    suite = sub.add_parser("suite", help="Benchmark semua tahap pipeline dengan data sintetis, hasil ke JSON.")
+    suite.add_argument("--output", default="benchmark_suite.json", help="File JSON hasil.")
+    suite.add_argument("--baseline", default="", help="JSON hasil sebelumnya untuk deteksi regresi.")
+    suite.add_argument("--tolerance", type=float, default=0.25, help="Batas perlambatan relatif sebelum dianggap regresi.")
+    suite.add_argument("--noise-floor", type=float, default=0.5,
+                       help="Selisih minimum (µs per item) sebelum perlambatan dianggap regresi.")
+    suite.add_argument("--frames", type=int, default=300, help="Panjang urutan keypoints & video uji.")
+    suite.add_argument("--video-size", default="1280x720", help="Resolusi video uji (LEBARxTINGGI).")
+    suite.add_argument("--imgsz", type=int, default=640, help="Ukuran inferensi untuk tahap resize.")
+    suite.add_argument("--history-rows", default="10000", help="Jumlah baris riwayat, dipisah koma (mis. 10000,100000).")
+    suite.add_argument("--models", default="yolov8n-pose.pt",
+                       help="Model untuk tahap inferensi, dipisah koma (kosong = lewati inferensi).")
+    suite.add_argument("--devices", default="cpu", help="Device inferensi, dipisah koma (mis. cpu,cuda:0).")
+    suite.add_argument("--inference-frames", type=int, default=30, help="Jumlah frame video uji untuk inferensi.")
+    suite.add_argument("--repeat", type=int, default=15)
+    suite.add_argument("--conf", type=float, default=0.5)
+    suite.set_defaults(func=run_suite)
+
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    return args.func(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
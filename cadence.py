@@ -0,0 +1,193 @@
+import math
+import time
+
+import cv2
+import numpy as np
+
+from pose_analyzer import calculate_angles
+
+# Ukuran thumbnail grayscale untuk deteksi gerakan antar frame
+MOTION_SIZE = (64, 36)
+
+class _Anchor:
+    """Frame yang benar-benar diinferensi: acuan interpolasi untuk frame yang dilewati."""
+    __slots__ = ("index", "result", "keypoints", "box", "angles", "thumb")
+
+    def __init__(self, index, result, thumb, triplets):
+        self.index = index
+        self.result = result
+        self.thumb = thumb
+        self.keypoints = None  # (17, 3) x, y, conf
+        self.box = None        # (6,) x1, y1, x2, y2, conf, cls
+        self.angles = None     # (2,) sudut utama latihan sisi kanan & kiri
+        if result.keypoints is not None and len(result.keypoints.data) > 0:
+            self.keypoints = result.keypoints.data[0].cpu().numpy()
+            self.box = result.boxes.data[0].cpu().numpy()
+            self.angles = calculate_angles(self.keypoints[:, :2], triplets)
+
+class AdaptiveRunner:
+    """
+    Inferensi adaptif: model hanya dijalankan setiap k frame (atau saat ada gerakan besar),
+    keypoints frame di antaranya diinterpolasi/ekstrapolasi dari frame yang diinferensi.
+
+    - k diatur otomatis dari latensi inferensi di device aktif agar tetap real-time terhadap `fps`.
+    - Jika sudut utama latihan (mis. siku) dekat ambang UP/DOWN (atau diperkirakan mencapainya sebelum inferensi berikutnya),
+      setiap frame diinferensi, sehingga transisi stage tidak pernah terjadi di frame hasil interpolasi.
+
+    Interface sama dengan InferenceRunner: runner(frames) -> list hasil YOLO, satu per frame.
+    """
+    def __init__(self, runner, analyzer, fps=30.0, max_stride=4, motion_threshold=12.0,
+                 angle_margin=10.0, min_velocity=2.0):
+        self.runner = runner
+        self.analyzer = analyzer
+        self.fps = fps or 30.0
+        self.max_stride = max_stride
+        self.motion_threshold = motion_threshold
+        self.angle_margin = angle_margin
+        self.min_velocity = min_velocity  # derajat/frame, batas bawah kecepatan untuk perkiraan
+
+        self.stride = 1
+        self.skipped = 0
+        self.total = 0
+        self._index = 0
+        self._anchors = []  # maksimal 2 anchor terakhir
+        self._latency = None
+
+    @property
+    def device(self):
+        return self.runner.device
+
+    @property
+    def stats(self):
+        return self.runner.stats
+
+    @property
+    def skip_ratio(self):
+        return self.skipped / self.total if self.total else 0.0
+
+    def __call__(self, frames):
+        thumbs = [_thumbnail(frame) for frame in frames]
+        plan = self._plan(thumbs)
+
+        to_infer = [frame for frame, infer in zip(frames, plan) if infer]
+        inferred = iter(self._infer(to_infer)) if to_infer else iter(())
+
+        # Anchor setiap frame: hasil inferensi, atau None untuk frame yang dilewati
+        start_index = self._index
+        new_anchors = []
+        for offset, (infer, thumb) in enumerate(zip(plan, thumbs)):
+            if infer:
+                new_anchors.append(
+                    _Anchor(start_index + offset, next(inferred), thumb, self.analyzer.exercise.primary_triplets)
+                )
+            else:
+                new_anchors.append(None)
+
+        results = []
+        for offset, (frame, anchor) in enumerate(zip(frames, new_anchors)):
+            if anchor is not None:
+                self._push_anchor(anchor)
+                results.append(anchor.result)
+            else:
+                following = next((a for a in new_anchors[offset + 1:] if a is not None), None)
+                results.append(self._interpolate(frame, start_index + offset, following))
+
+        self._index += len(frames)
+        self.total += len(frames)
+        self.skipped += len(frames) - len(to_infer)
+        return results
+
+    # --- PERENCANAAN ---
+    def _plan(self, thumbs):
+        """Menentukan frame mana yang diinferensi (True) dan mana yang diinterpolasi (False)."""
+        stride = self._allowed_stride()
+        last = self._anchors[-1] if self._anchors else None
+        since = self._index - last.index if last is not None else stride
+        reference = last.thumb if last is not None else None
+
+        plan = []
+        for thumb in thumbs:
+            moved = reference is not None and float(cv2.absdiff(thumb, reference).mean()) > self.motion_threshold
+            if since >= stride or moved or reference is None:
+                plan.append(True)
+                since = 1
+                reference = thumb
+            else:
+                plan.append(False)
+                since += 1
+        return plan
+
+    def _allowed_stride(self):
+        """Lompatan frame maksimum yang aman terhadap ambang stage analyzer."""
+        if not self._anchors or self._anchors[-1].angles is None:
+            return 1
+
+        last = self._anchors[-1]
+        candidates = np.append(last.angles, last.angles.mean())
+        velocity = self.min_velocity
+        if len(self._anchors) == 2 and self._anchors[0].angles is not None:
+            prev = self._anchors[0]
+            prev_candidates = np.append(prev.angles, prev.angles.mean())
+            frames = max(last.index - prev.index, 1)
+            velocity = max(float(np.abs(candidates - prev_candidates).max()) / frames, self.min_velocity)
+
+        distance = min(abs(float(angle) - threshold)
+                       for angle in candidates for threshold in self.analyzer.stage_thresholds())
+        distance -= self.angle_margin
+        if distance <= 0:
+            return 1
+        return max(1, min(self.stride, int(distance / velocity)))
+
+    def _infer(self, frames):
+        # Seluruh panggilan diukur di sini: runner di dalamnya (mis. RoiRunner) bisa memanggil model
+        # lebih dari sekali, sehingga latensi batch terakhir di stats tidak mewakili panggilan ini
+        start = time.perf_counter()
+        results = self.runner(frames)
+        # Perbarui k dari latensi per frame (EMA) agar inferensi mengejar FPS sumber
+        per_frame = (time.perf_counter() - start) / len(frames)
+        self._latency = per_frame if self._latency is None else 0.8 * self._latency + 0.2 * per_frame
+        self.stride = int(min(self.max_stride, max(1, math.ceil(self._latency * self.fps))))
+        return results
+
+    # --- INTERPOLASI ---
+    def _push_anchor(self, anchor):
+        self._anchors.append(anchor)
+        if len(self._anchors) > 2:
+            self._anchors.pop(0)
+
+    def _interpolate(self, frame, index, following):
+        # Import lokal: modul ini di-import saat startup aplikasi, sebelum torch dimuat pemuat model
+        import torch
+        from ultralytics.engine.results import Results
+
+        last = self._anchors[-1]
+        if last.keypoints is None:
+            return Results(frame, path=last.result.path, names=last.result.names)
+
+        if following is not None and following.keypoints is not None:
+            # Interpolasi linear antara anchor sebelum dan sesudah (dalam batch yang sama)
+            start, end = last, following
+        elif len(self._anchors) == 2 and self._anchors[0].keypoints is not None:
+            # Ekstrapolasi linear dari dua anchor terakhir
+            start, end = self._anchors[0], last
+        else:
+            start = end = last
+
+        span = end.index - start.index
+        t = (index - start.index) / span if span else 0.0
+        keypoints = start.keypoints + t * (end.keypoints - start.keypoints)
+        box = start.box + t * (end.box - start.box)
+        keypoints[:, 2] = np.minimum(start.keypoints[:, 2], end.keypoints[:, 2])
+        box[4:] = last.box[4:]
+
+        return Results(
+            frame,
+            path=last.result.path,
+            names=last.result.names,
+            boxes=torch.from_numpy(box[np.newaxis].astype(np.float32)),
+            keypoints=torch.from_numpy(keypoints[np.newaxis].astype(np.float32)),
+        )
+
+def _thumbnail(frame):
+    small = cv2.resize(frame, MOTION_SIZE, interpolation=cv2.INTER_NEAREST)
+    return cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
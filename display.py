@@ -0,0 +1,67 @@
+"""
+Penjadwal tampilan Streamlit: memisahkan laju analisis dari laju update browser.
+
+Analisis tetap berjalan di setiap frame, tetapi frame video hanya dikirim ke browser maksimal
+`display_fps` kali per detik (sebagai JPEG dengan kualitas yang dipilih), dan widget teks/metrik
+hanya ditulis ulang jika nilainya berubah. Setiap pesan ke browser melewati websocket dan serialisasi
+protobuf, jadi memangkas pesan yang tidak perlu mengembalikan CPU untuk inferensi.
+"""
+import threading
+import time
+
+import cv2
+
+_MISSING = object()
+
+class RenderScheduler:
+    """
+    frame_due() dipanggil di thread analisis sebelum render: True jika frame ini perlu ditampilkan.
+    ui_due() membatasi update widget yang nilainya berubah terus (mis. sudut) ke laju yang sama.
+    changed(key, value) dipanggil di thread Streamlit: True jika widget `key` perlu ditulis ulang.
+    Dibuat baru setiap run script (placeholder Streamlit juga baru).
+    """
+    def __init__(self, display_fps=15.0, jpeg_quality=75):
+        self.interval = 1.0 / display_fps if display_fps else 0.0
+        self.jpeg_quality = int(jpeg_quality)
+        self.frames_sent = 0
+        self.frames_skipped = 0
+        self.updates_skipped = 0
+        self._next_frame = 0.0
+        self._next_ui = 0.0
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def frame_due(self, now=None):
+        with self._lock:
+            now = time.perf_counter() if now is None else now
+            if now < self._next_frame:
+                self.frames_skipped += 1
+                return False
+            # Jadwal tetap (bukan now + interval) agar laju rata-rata tepat display_fps;
+            # jika tertinggal jauh, jadwal diulang dari sekarang alih-alih mengejar dengan burst
+            self._next_frame = max(self._next_frame + self.interval, now)
+            self.frames_sent += 1
+            return True
+
+    def ui_due(self, now=None):
+        with self._lock:
+            now = time.perf_counter() if now is None else now
+            if now < self._next_ui:
+                return False
+            self._next_ui = max(self._next_ui + self.interval, now)
+            return True
+
+    def encode(self, frame_bgr):
+        """Frame BGR (output OverlayRenderer) -> bytes JPEG (kualitas `jpeg_quality`), siap untuk st.image."""
+        ok, buffer = cv2.imencode(".jpg", frame_bgr, [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality])
+        if not ok:
+            raise ValueError("Frame gagal di-encode ke JPEG")
+        return buffer.tobytes()
+
+    def changed(self, key, value):
+        """True (dan nilai dicatat) jika `value` berbeda dari nilai terakhir yang ditampilkan untuk `key`."""
+        if self._values.get(key, _MISSING) == value:
+            self.updates_skipped += 1
+            return False
+        self._values[key] = value
+        return True
@@ -0,0 +1,190 @@
+"""
+Definisi latihan berbasis data.
+
+Setiap latihan dideklarasikan sebagai dict (sudut sendi, ambang atas/bawah, aturan form, kebijakan sisi)
+lalu dikompilasi SEKALI menjadi tabel indeks numpy. PoseAnalyzer hanya menjalankan tabel milik latihan
+aktif, sehingga biaya per frame tidak bertambah ketika latihan baru didaftarkan.
+
+Format definisi:
+    angles:  {nama: (sendi_a, sendi_b, sendi_c)}, b adalah titik sudut. Sendi ditulis tanpa sisi
+             ("SHOULDER"), atau "NOSE". Setiap sudut dikompilasi untuk sisi kanan dan kiri.
+    primary: nama sudut yang menggerakkan state machine.
+    side:    "facing"  -> pakai satu sisi badan sesuai arah hadap (tampak samping, mis. push-up)
+             "average" -> rata-rata sisi kanan & kiri (tampak depan, mis. pull-up)
+    high / low:             ambang sudut utama (derajat).
+    high_stage / low_stage: nama stage saat sudut di atas `high` / di bawah `low`.
+                            Repetisi dihitung saat masuk low_stage dari high_stage.
+    rules:   list (nama_sudut, min, max, pesan). Sudut di luar [min, max] = form buruk,
+             dan repetisi tidak dihitung selama form buruk. None berarti tanpa batas.
+"""
+import numpy as np
+
+# Indeks keypoint COCO per sendi: (kanan, kiri). Titik tengah (NOSE) sama untuk kedua sisi.
+JOINTS = {
+    "NOSE": (0, 0),
+    "EYE": (2, 1),
+    "EAR": (4, 3),
+    "SHOULDER": (6, 5),
+    "ELBOW": (8, 7),
+    "WRIST": (10, 9),
+    "HIP": (12, 11),
+    "KNEE": (14, 13),
+    "ANKLE": (16, 15),
+}
+
+# Label tampilan nama sudut (dipakai panel statistik aplikasi)
+ANGLE_LABELS = {
+    "elbow": "Siku",
+    "body": "Badan",
+    "neck": "Leher",
+    "knee": "Lutut",
+    "hip": "Pinggul",
+}
+
+EXERCISE_DEFINITIONS = {
+    "PushUp": {
+        "angles": {
+            "elbow": ("SHOULDER", "ELBOW", "WRIST"),
+            "body": ("SHOULDER", "HIP", "ANKLE"),
+            "neck": ("EAR", "SHOULDER", "HIP"),
+        },
+        "primary": "elbow",
+        "side": "facing",
+        "high": 145, "low": 90,
+        "high_stage": "UP", "low_stage": "DOWN",
+        "rules": [
+            ("body", 150, None, "LURUSKAN PUNGGUNG!"),
+            ("neck", 140, None, "KEPALA LURUS KE DEPAN!"),
+        ],
+    },
+    "PullUp": {
+        "angles": {
+            "elbow": ("SHOULDER", "ELBOW", "WRIST"),
+        },
+        "primary": "elbow",
+        "side": "average",
+        "high": 145, "low": 90,
+        "high_stage": "DOWN", "low_stage": "UP",
+        "rules": [],
+    },
+    "Squat": {
+        "angles": {
+            "knee": ("HIP", "KNEE", "ANKLE"),
+            "hip": ("SHOULDER", "HIP", "KNEE"),
+        },
+        "primary": "knee",
+        "side": "facing",
+        "high": 160, "low": 100,
+        "high_stage": "UP", "low_stage": "DOWN",
+        "rules": [
+            ("hip", 45, None, "DADA TEGAK, JANGAN TERLALU MEMBUNGKUK!"),
+        ],
+    },
+}
+
+class CompiledExercise:
+    """
+    Tabel indeks hasil kompilasi satu definisi latihan (immutable, dipakai bersama semua analyzer).
+
+    triplets: (2A, 3) indeks keypoint; baris [0, A) sisi kanan, [A, 2A) sisi kiri, urutan sesuai `names`.
+    triplet_rows: isi `triplets` sebagai tuple int Python (jalur skalar satu frame PoseAnalyzer.analyze).
+    columns:  {"Kanan": (A,), "Kiri": (A,)} kolom sudut per sisi pada hasil calculate_angles(triplets).
+    rule_columns / rule_min / rule_max: aturan form sebagai indeks kolom (0..A-1) dan batas, dievaluasi vektor.
+    """
+    __slots__ = (
+        "name", "names", "primary", "side", "high", "low", "high_stage", "low_stage",
+        "triplets", "triplet_rows", "columns", "primary_triplets", "rule_columns", "rule_min", "rule_max", "rule_messages",
+    )
+
+    def __init__(self, name, definition):
+        angles = definition["angles"]
+        self.name = name
+        self.names = tuple(angles)
+        self.primary = self.names.index(definition["primary"])
+        self.side = definition["side"]
+        if self.side not in ("facing", "average"):
+            raise ValueError(f"Kebijakan sisi tidak dikenal untuk {name}: {self.side}")
+        self.high = float(definition["high"])
+        self.low = float(definition["low"])
+        if self.low >= self.high:
+            raise ValueError(f"Ambang {name} tidak valid: low ({self.low}) harus < high ({self.high})")
+        self.high_stage = definition["high_stage"]
+        self.low_stage = definition["low_stage"]
+
+        rows = [[JOINTS[joint][side] for joint in angles[angle_name]] for side in (0, 1) for angle_name in self.names]
+        self.triplets = np.array(rows, dtype=np.intp)
+        self.triplet_rows = tuple(tuple(row) for row in rows)
+        count = len(self.names)
+        self.columns = {"Kanan": np.arange(count), "Kiri": np.arange(count, 2 * count)}
+        self.primary_triplets = self.triplets[[self.primary, count + self.primary]]
+
+        rules = definition.get("rules", [])
+        self.rule_columns = np.array([self.names.index(rule[0]) for rule in rules], dtype=np.intp)
+        self.rule_min = np.array([-np.inf if rule[1] is None else rule[1] for rule in rules], dtype=np.float64)
+        self.rule_max = np.array([np.inf if rule[2] is None else rule[2] for rule in rules], dtype=np.float64)
+        self.rule_messages = tuple(rule[3] for rule in rules)
+
+    @property
+    def result_keys(self):
+        """Kunci sudut pada dict hasil PoseAnalyzer: "angle" untuk sudut utama, "<nama>_angle" untuk lainnya."""
+        return [("angle" if i == self.primary else f"{name}_angle", name) for i, name in enumerate(self.names)]
+
+    def side_angles(self, angles, is_left):
+        """Sudut (A,) yang dipakai state machine dari satu baris hasil calculate_angles(triplets)."""
+        if self.side == "average":
+            count = len(self.names)
+            return (angles[count:] + angles[:count]) / 2
+        return angles[self.columns["Kiri" if is_left else "Kanan"]]
+
+    def side_angles_batch(self, angles, is_left):
+        """Versi vektor side_angles untuk N frame: angles (N, 2A), is_left (N,). Mengembalikan (N, A)."""
+        count = len(self.names)
+        if self.side == "average":
+            return (angles[:, count:] + angles[:, :count]) / 2
+        return np.where(np.asarray(is_left)[:, np.newaxis], angles[:, count:], angles[:, :count])
+
+    def bad_form_batch(self, values):
+        """Mask (N,) frame yang melanggar minimal satu aturan form. values: (N, A)."""
+        if not len(self.rule_messages):
+            return np.zeros(len(values), dtype=bool)
+        checked = values[:, self.rule_columns]
+        return ((checked < self.rule_min) | (checked > self.rule_max)).any(axis=1)
+
+    def violations(self, values):
+        """Pesan aturan form yang dilanggar (tuple kosong jika form bagus)."""
+        if not len(self.rule_messages):
+            return ()
+        checked = values[self.rule_columns]
+        bad = (checked < self.rule_min) | (checked > self.rule_max)
+        return tuple(self.rule_messages[i] for i in np.flatnonzero(bad))
+
+# Registry latihan terkompilasi; EXERCISE_TYPES mengikuti urutan pendaftaran
+EXERCISES = {}
+EXERCISE_TYPES = []
+
+def register_exercise(name, definition):
+    """Mengkompilasi dan mendaftarkan latihan baru (atau mengganti yang sudah ada)."""
+    compiled = CompiledExercise(name, definition)
+    EXERCISE_DEFINITIONS[name] = definition
+    if name not in EXERCISES:
+        EXERCISE_TYPES.append(name)
+    EXERCISES[name] = compiled
+    return compiled
+
+def derive_exercise(name, **overrides):
+    """
+    Versi terkompilasi (tidak didaftarkan) dari latihan `name` dengan sebagian field definisi diganti,
+    mis. derive_exercise("PushUp", low=95) untuk mencoba ambang baru saat replay.
+    """
+    if name not in EXERCISE_DEFINITIONS:
+        raise ValueError(f"Latihan tidak dikenal: {name}")
+    return CompiledExercise(name, {**EXERCISE_DEFINITIONS[name], **overrides})
+
+def get_exercise(name):
+    try:
+        return EXERCISES[name]
+    except KeyError:
+        raise ValueError(f"Latihan tidak dikenal: {name}") from None
+
+for _name, _definition in EXERCISE_DEFINITIONS.items():
+    register_exercise(_name, _definition)
@@ -0,0 +1,190 @@
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+import pandas as pd
+
+from analytics import HistoryAnalytics
+
+# --- KONFIGURASI HISTORY ---
+HISTORY_DB = "workout_history.db"
+LEGACY_CSV = "workout_history.csv"
+COLUMNS = ["Tanggal", "Waktu", "Jenis Latihan", "Repetisi", "Status", "Atlet", "Trace"]
+# pandas >= 3 (atau mode.copy_on_write=True): salinan dangkal sudah aman diubah tanpa menyentuh data asal
+_COPY_ON_WRITE = int(pd.__version__.split(".")[0]) >= 3 or getattr(pd.options.mode, "copy_on_write", False) is True
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    tanggal TEXT NOT NULL,
+    waktu TEXT NOT NULL,
+    latihan TEXT NOT NULL,
+    repetisi INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    atlet TEXT,
+    trace TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_sessions_tanggal ON sessions (tanggal);
+CREATE INDEX IF NOT EXISTS idx_sessions_latihan ON sessions (latihan, tanggal);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+class HistoryStore:
+    """
+    Riwayat latihan berbasis SQLite.
+    Setiap sesi disimpan dengan satu INSERT (O(1)), bukan menulis ulang seluruh file.
+    view() hanya mengambil baris baru (id > id terakhir) ke list baris; DataFrame dibangun ulang sekali
+    saat ada baris baru, dan yang dikembalikan adalah salinan sehingga cache tidak bisa ikut berubah.
+    analytics() memakai pola yang sama untuk agregat HistoryAnalytics.
+    """
+    def __init__(self, path=HISTORY_DB, legacy_csv=LEGACY_CSV):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self._migrate()
+        self._conn.commit()
+
+        self._rows = []  # baris riwayat (urut id naik), sumber DataFrame view()
+        self._view = None
+        self._last_id = 0
+        self._analytics = HistoryAnalytics()
+        self._analytics_id = 0
+
+        if legacy_csv and os.path.exists(legacy_csv) and not self._get_meta("legacy_csv_imported"):
+            self.import_csv(legacy_csv)
+            self._set_meta("legacy_csv_imported", legacy_csv)
+
+    def append(self, exercise, count, status="Selesai", when=None, athlete=None, trace=None):
+        """
+        Menambahkan satu sesi latihan. athlete opsional (mis. "Atlet #2"), trace opsional (direktori
+        rekaman keypoints untuk replay). Mengembalikan id baris baru.
+        """
+        now = when or datetime.now()
+        tanggal = now.strftime("%Y-%m-%d")
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "INSERT INTO sessions (tanggal, waktu, latihan, repetisi, status, atlet, trace) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (tanggal, now.strftime("%H:%M:%S"), exercise, int(count), status, athlete, trace),
+            )
+            # Agregat langsung diperbarui jika sudah memuat semua baris sebelumnya (selain itu: disusul analytics())
+            if cursor.lastrowid == self._analytics_id + 1:
+                self._analytics.fold(tanggal, exercise, int(count))
+                self._analytics_id = cursor.lastrowid
+        return cursor.lastrowid
+
+    def import_csv(self, csv_path):
+        """
+        Mengimpor file CSV riwayat lama (format save_history versi CSV, baris terbaru di atas).
+        Mengembalikan jumlah baris yang diimpor.
+        """
+        df = pd.read_csv(csv_path)
+        if df.empty:
+            return 0
+        # CSV lama menyimpan baris terbaru di atas, dibalik agar id naik sesuai urutan waktu
+        rows = [
+            (str(r["Tanggal"]), str(r["Waktu"]), str(r["Jenis Latihan"]), int(r["Repetisi"]), str(r["Status"]),
+             r["Atlet"] if isinstance(r.get("Atlet"), str) else None, None)
+            for _, r in df.iloc[::-1].iterrows()
+        ]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO sessions (tanggal, waktu, latihan, repetisi, status, atlet, trace) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+        return len(rows)
+
+    def view(self):
+        """
+        DataFrame riwayat (terbaru di atas). Baris baru diambil inkremental; DataFrame hanya dibangun ulang
+        jika ada baris baru. Hasilnya salinan milik pemanggil (dengan Copy-on-Write pandas salinan ini
+        murah), jadi boleh diubah tanpa merusak cache.
+        """
+        with self._lock:
+            new_rows = self._conn.execute(
+                "SELECT id, tanggal, waktu, latihan, repetisi, status, atlet, trace FROM sessions WHERE id > ? ORDER BY id",
+                (self._last_id,),
+            ).fetchall()
+            if new_rows:
+                self._rows.extend(row[1:] for row in new_rows)
+                self._last_id = new_rows[-1][0]
+                self._view = None
+            if self._view is None:
+                self._view = pd.DataFrame(self._rows[::-1], columns=COLUMNS)
+            return self._view.copy(deep=not _COPY_ON_WRITE)
+
+    def analytics(self):
+        """Agregat riwayat (HistoryAnalytics). Hanya baris baru sejak panggilan terakhir yang di-fold."""
+        with self._lock:
+            new_rows = self._conn.execute(
+                "SELECT id, tanggal, latihan, repetisi FROM sessions WHERE id > ? ORDER BY id",
+                (self._analytics_id,),
+            ).fetchall()
+            for row_id, tanggal, exercise, count in new_rows:
+                self._analytics.fold(tanggal, exercise, count)
+                self._analytics_id = row_id
+            return self._analytics
+
+    def query(self, date_from=None, date_to=None, exercise=None):
+        """Mengambil riwayat dengan filter tanggal (YYYY-MM-DD) dan/atau jenis latihan memakai index."""
+        clauses, params = [], []
+        if date_from:
+            clauses.append("tanggal >= ?")
+            params.append(date_from)
+        if date_to:
+            clauses.append("tanggal <= ?")
+            params.append(date_to)
+        if exercise:
+            clauses.append("latihan = ?")
+            params.append(exercise)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT tanggal, waktu, latihan, repetisi, status, atlet, trace FROM sessions {where} ORDER BY id DESC",
+                params,
+            ).fetchall()
+        return pd.DataFrame(rows, columns=COLUMNS)
+
+    def traces(self):
+        """Sesi yang punya rekaman keypoints: list tuple (id, tanggal, waktu, latihan, repetisi, trace), terbaru dulu."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT id, tanggal, waktu, latihan, repetisi, trace FROM sessions WHERE trace IS NOT NULL ORDER BY id DESC"
+            ).fetchall()
+
+    def clear(self):
+        """Menghapus seluruh riwayat."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM sessions")
+            # AUTOINCREMENT tidak mengulang id setelah DELETE; agregat kosong dianggap sudah memuat
+            # semua id sampai nilai sequence agar append() berikutnya tetap di-fold langsung
+            row = self._conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'sessions'").fetchone()
+            self._rows = []
+            self._view = None
+            self._last_id = row[0] if row else 0
+            self._analytics = HistoryAnalytics()
+            self._analytics_id = self._last_id
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _migrate(self):
+        """Menambahkan kolom yang belum ada di database versi lama."""
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(sessions)")}
+        for column in ("atlet", "trace"):
+            if column not in columns:
+                self._conn.execute(f"ALTER TABLE sessions ADD COLUMN {column} TEXT")
+
+    def _get_meta(self, key):
+        row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key, value):
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
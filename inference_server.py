@@ -0,0 +1,435 @@
+"""
+Server inferensi bersama: satu model per (model, device, backend, presisi) untuk semua sesi/stasiun.
+
+Frame dari semua klien masuk satu antrian. Thread server menggabungkannya menjadi batch dinamis: batch
+dikirim ke model begitu berisi `max_batch` frame, atau begitu permintaan tertua sudah menunggu
+`max_latency` detik. Satu klien saja tetap mendapat latensi rendah (paling lama menunggu `max_latency`),
+sedangkan banyak klien bersamaan berbagi satu panggilan model yang lebih efisien, dengan satu salinan
+bobot di memori. Model juga tidak lagi dipanggil dari beberapa thread sesi sekaligus.
+
+Dua cara pakai:
+- Dalam proses (Streamlit): InferenceService(...).client(nama, conf) -> callable pengganti InferenceRunner.
+- Socket lokal (multiprocessing.connection): server dijalankan sebagai proses sendiri, klien memakai
+  RemoteClient dengan interface yang sama. Hanya keypoints & box yang dikirim balik, bukan frame.
+  multiprocessing.connection meng-unpickle setiap pesan, jadi koneksi wajib memakai kunci rahasia:
+  INFERENCE_AUTHKEY, atau kunci acak yang dibuat server di AUTHKEY_PATH (izin 0600).
+
+Contoh:
+    python inference_server.py --model yolo11n-pose.pt --device cuda:0 --port 6010 --max-latency-ms 10
+"""
+import argparse
+import os
+import secrets
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Listener
+
+import numpy as np
+
+from model_utils import (
+    _DEFAULT, BACKENDS, EXPORT_DIR, MODEL_CHOICES, BatchStats, InferenceRunner, load_model, rescale_result,
+    resize_for_inference, warmup,
+)
+
+DEFAULT_HOST = "localhost"
+DEFAULT_PORT = 6010
+# File kunci autentikasi socket jika INFERENCE_AUTHKEY tidak diset (dibuat server, hanya bisa dibaca pemiliknya)
+AUTHKEY_PATH = os.path.join(EXPORT_DIR, "inference.key")
+MAX_BATCH = 8
+MAX_LATENCY = 0.010
+# Klien tanpa permintaan selama ini (detik) dihapus dari metrik
+CLIENT_TTL = 300.0
+
+def load_authkey(path=AUTHKEY_PATH, create=False):
+    """
+    Kunci autentikasi koneksi socket (server & klien harus sama): INFERENCE_AUTHKEY, atau isi file `path`.
+    create=True (server): jika keduanya tidak ada, kunci acak dibuat dan ditulis ke `path` dengan izin 0600.
+    """
+    key = os.environ.get("INFERENCE_AUTHKEY")
+    if key:
+        return key.encode()
+    try:
+        with open(path, "rb") as f:
+            key = f.read().strip()
+    except FileNotFoundError:
+        key = None
+    if key:
+        return key
+    if not create:
+        raise RuntimeError(f"Kunci server inferensi tidak ditemukan: set INFERENCE_AUTHKEY atau jalankan "
+                           f"server dulu agar {path} dibuat.")
+    key = secrets.token_hex(32).encode()
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "wb") as f:
+        f.write(key)
+    return key
+
+class ClientStats:
+    """Metrik satu klien: frame yang masih antri, latensi total (antri + inferensi) dan waktu antri."""
+    def __init__(self, name):
+        self.name = name
+        self.queued = 0
+        self.latency = BatchStats()
+        self.wait = BatchStats()
+        self.last_seen = time.perf_counter()
+
+    def snapshot(self):
+        return {
+            "queue_depth": self.queued,
+            "requests": self.latency.batches,
+            "frames": self.latency.frames,
+            "p50_ms": round(self.latency.percentile_latency_ms(50), 2),
+            "p95_ms": round(self.latency.percentile_latency_ms(95), 2),
+            "wait_p95_ms": round(self.wait.percentile_latency_ms(95), 2),
+        }
+
+class _Request:
+    __slots__ = ("stats", "frames", "options", "future", "submitted")
+
+    def __init__(self, stats, frames, options):
+        self.stats = stats
+        self.frames = frames
+        self.options = options
+        self.future = Future()
+        self.submitted = time.perf_counter()
+
+class InferenceService:
+    """
+    Satu model + satu thread inferensi yang melayani banyak klien dengan batch dinamis.
+
+    Permintaan hanya digabung jika opsinya sama (conf, max_det, ukuran inferensi); permintaan lain tetap
+    antri dan dilayani sesuai urutan datang. Fallback GPU -> CPU ditangani InferenceRunner di dalamnya.
+    infer_size: ukuran inferensi untuk klien yang tidak menentukan ukurannya sendiri (mis. hasil auto-tune).
+    """
+    def __init__(self, model, device, max_batch=MAX_BATCH, max_latency=MAX_LATENCY, half=False, infer_size=None,
+                 client_ttl=CLIENT_TTL):
+        self.runner = InferenceRunner(model, device, conf=0.5, infer_size=infer_size, half=half)
+        self.names = getattr(model, "names", None)
+        self.max_batch = max_batch
+        self.max_latency = max_latency
+        self.client_ttl = client_ttl
+        self.batch_sizes = deque(maxlen=1000)
+        self._pending = deque()
+        self._clients = {}
+        self._closed = False
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._serve, name="inference-service", daemon=True)
+        self._thread.start()
+
+    @property
+    def device(self):
+        return self.runner.device
+
+    @property
+    def infer_size(self):
+        return self.runner.infer_size
+
+    def client(self, name, conf, max_det=1, infer_size=_DEFAULT):
+        """Handle untuk satu klien (mis. satu sesi Streamlit). Nama sama = metrik yang sama."""
+        return ServiceClient(self, name, conf, max_det, infer_size)
+
+    def submit(self, name, frames, conf, max_det=1, infer_size=_DEFAULT):
+        """Memasukkan frame ke antrian. Mengembalikan Future berisi list hasil YOLO (satu per frame)."""
+        infer_size = self.infer_size if infer_size is _DEFAULT else infer_size
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Server inferensi sudah ditutup")
+            stats = self._clients.get(name)
+            if stats is None:
+                stats = self._clients[name] = ClientStats(name)
+            request = _Request(stats, list(frames), (conf, max_det, infer_size))
+            stats.queued += len(request.frames)
+            stats.last_seen = request.submitted
+            self._pending.append(request)
+            self._cond.notify()
+        return request.future
+
+    def metrics(self):
+        """Dict: device, mean_batch (frame per panggilan model), pending (frame antri), clients {nama: metrik}."""
+        now = time.perf_counter()
+        with self._cond:
+            for name, stats in list(self._clients.items()):
+                if not stats.queued and now - stats.last_seen > self.client_ttl:
+                    del self._clients[name]
+            clients = {name: stats.snapshot() for name, stats in self._clients.items()}
+            pending = sum(len(request.frames) for request in self._pending)
+        return {
+            "device": self.device,
+            "mean_batch": round(float(np.mean(self.batch_sizes)), 2) if self.batch_sizes else 0.0,
+            "pending": pending,
+            "clients": clients,
+        }
+
+    def close(self):
+        """Menghentikan thread server setelah antrian yang ada selesai dilayani."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join()
+
+    def _serve(self):
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            self._run(batch)
+
+    def _next_batch(self):
+        """Menunggu sampai batch penuh atau tenggat permintaan tertua habis. None jika server ditutup."""
+        with self._cond:
+            while not self._pending:
+                if self._closed:
+                    return None
+                self._cond.wait()
+            deadline = self._pending[0].submitted + self.max_latency
+            while True:
+                batch, frames = self._collect()
+                remaining = deadline - time.perf_counter()
+                if frames >= self.max_batch or remaining <= 0 or self._closed:
+                    break
+                self._cond.wait(remaining)
+            for request in batch:
+                self._pending.remove(request)
+            return batch
+
+    def _collect(self):
+        """Permintaan antri (urut datang) dengan opsi sama seperti yang tertua, sampai `max_batch` frame."""
+        options = self._pending[0].options
+        batch, frames = [], 0
+        for request in self._pending:
+            if request.options != options:
+                continue
+            if batch and frames + len(request.frames) > self.max_batch:
+                break
+            batch.append(request)
+            frames += len(request.frames)
+        return batch, frames
+
+    def _run(self, batch):
+        conf, max_det, infer_size = batch[0].options
+        frames = [frame for request in batch for frame in request.frames]
+        start = time.perf_counter()
+        try:
+            # Hanya thread ini yang memakai runner, jadi opsi per batch aman diubah langsung
+            self.runner.conf, self.runner.max_det = conf, max_det
+            results = self.runner(frames, infer_size=infer_size)
+        except Exception as e:
+            results, error = None, e
+        else:
+            error = None
+            self.batch_sizes.append(len(frames))
+        done = time.perf_counter()
+
+        offset = 0
+        with self._cond:
+            for request in batch:
+                count = len(request.frames)
+                request.stats.queued -= count
+                request.stats.wait.record(count, start - request.submitted)
+                request.stats.latency.record(count, done - request.submitted)
+        for request in batch:
+            count = len(request.frames)
+            if error is None:
+                request.future.set_result(results[offset:offset + count])
+            else:
+                request.future.set_exception(error)
+            offset += count
+
+class ServiceClient:
+    """
+    Pengganti InferenceRunner untuk satu klien InferenceService: runner(frames) -> list hasil YOLO.
+    Bisa dibungkus RoiRunner / AdaptiveRunner seperti InferenceRunner biasa.
+    infer_size tidak diisi = ukuran inferensi bawaan service.
+    """
+    def __init__(self, service, name, conf, max_det=1, infer_size=_DEFAULT):
+        self.service = service
+        self.name = name
+        self.conf = conf
+        self.max_det = max_det
+        self.infer_size = infer_size
+        self.stats = BatchStats()
+
+    @property
+    def device(self):
+        return self.service.device
+
+    def __call__(self, frames, infer_size=_DEFAULT):
+        start = time.perf_counter()
+        infer_size = self.infer_size if infer_size is _DEFAULT else infer_size
+        results = self.service.submit(self.name, frames, self.conf, self.max_det, infer_size).result()
+        self.stats.record(len(frames), time.perf_counter() - start)
+        return results
+
+    def metrics(self):
+        return self.service.metrics()
+
+    def close(self):
+        pass
+
+def _to_arrays(result):
+    """Hasil YOLO -> (box (P, 6), keypoints (P, 17, 3)) numpy untuk dikirim lewat socket."""
+    boxes = None if result.boxes is None else result.boxes.data.cpu().numpy()
+    keypoints = None if result.keypoints is None else result.keypoints.data.cpu().numpy()
+    return boxes, keypoints
+
+def _from_arrays(frame, arrays, names, scale=None):
+    """Kebalikan _to_arrays: Results untuk `frame`; koordinat dikali `scale` jika frame dikecilkan sebelum dikirim."""
+    import torch
+    from ultralytics.engine.results import Results
+
+    boxes, keypoints = (None if a is None else torch.from_numpy(a) for a in arrays)
+    result = Results(frame, path="", names=names, boxes=boxes, keypoints=keypoints)
+    return rescale_result(result, frame, scale) if scale else result
+
+class RemoteClient:
+    """
+    Klien server inferensi lewat socket lokal, interface sama dengan InferenceRunner.
+    Frame dikecilkan ke ukuran inferensi di sisi klien sebelum dikirim (lebih sedikit byte di socket),
+    dan keypoints dikembalikan ke koordinat frame asli di sini.
+    infer_size tidak diisi = ukuran inferensi server (mis. hasil auto-tune server).
+    authkey None = load_authkey().
+    """
+    def __init__(self, address, name, conf, max_det=1, infer_size=_DEFAULT, authkey=None):
+        self.name = name
+        self.conf = conf
+        self.max_det = max_det
+        self.stats = BatchStats()
+        self._lock = threading.Lock()  # satu koneksi dipakai thread pipeline & thread UI (metrik)
+        self._conn = Client(address, authkey=authkey or load_authkey())
+        self._conn.send(("hello", name))
+        self.device, self._names, server_infer_size = self._conn.recv()
+        self.infer_size = server_infer_size if infer_size is _DEFAULT else infer_size
+
+    def __call__(self, frames, infer_size=_DEFAULT):
+        start = time.perf_counter()
+        infer_size = self.infer_size if infer_size is _DEFAULT else infer_size
+        resized = [resize_for_inference(frame, infer_size) for frame in frames]
+        payload = self._request(("infer", [small for small, _ in resized], self.conf, self.max_det, infer_size))
+        self.device, outputs = payload
+        results = [
+            _from_arrays(frame, arrays, self._names, scale)
+            for frame, arrays, (_, scale) in zip(frames, outputs, resized)
+        ]
+        self.stats.record(len(frames), time.perf_counter() - start)
+        return results
+
+    def metrics(self):
+        return self._request(("metrics",))
+
+    def close(self):
+        self._conn.close()
+
+    def _request(self, message):
+        with self._lock:
+            self._conn.send(message)
+            status, payload = self._conn.recv()
+        if status == "error":
+            raise RuntimeError(f"Server inferensi: {payload}")
+        return payload
+
+def parse_address(text, default_port=DEFAULT_PORT):
+    """"host:port" atau "host" -> tuple (host, port)."""
+    host, _, port = text.strip().rpartition(":")
+    if not host:
+        return port or DEFAULT_HOST, default_port
+    return host, int(port)
+
+def serve(service, address, authkey):
+    """Menerima koneksi RemoteClient (satu thread per koneksi) sampai proses dihentikan."""
+    with Listener(address, authkey=authkey) as listener:
+        while True:
+            try:
+                conn = listener.accept()
+            except (OSError, AuthenticationError):
+                continue  # Autentikasi gagal / koneksi terputus saat handshake
+            threading.Thread(target=_handle, args=(service, conn), daemon=True).start()
+
+def _handle(service, conn):
+    with conn:
+        try:
+            _, name = conn.recv()
+            conn.send((service.device, service.names, service.infer_size))
+            while True:
+                message = conn.recv()
+                try:
+                    if message[0] == "infer":
+                        _, frames, conf, max_det, infer_size = message
+                        results = service.submit(name, frames, conf, max_det, infer_size).result()
+                        conn.send(("ok", (service.device, [_to_arrays(result) for result in results])))
+                    elif message[0] == "metrics":
+                        conn.send(("ok", service.metrics()))
+                    else:
+                        conn.send(("error", f"Perintah tidak dikenal: {message[0]}"))
+                except Exception as e:
+                    conn.send(("error", str(e)))
+        except (EOFError, OSError):
+            pass  # Klien menutup koneksi
+
+def print_metrics(service, interval):
+    while True:
+        time.sleep(interval)
+        metrics = service.metrics()
+        print(f"📊 {metrics['device']} · batch rata-rata {metrics['mean_batch']} · antri {metrics['pending']} frame")
+        for name, stats in sorted(metrics["clients"].items()):
+            print(f"   {name}: antrian {stats['queue_depth']}, {stats['frames']} frame, "
+                  f"p50 {stats['p50_ms']} ms, p95 {stats['p95_ms']} ms (antri p95 {stats['wait_p95_ms']} ms)")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Server inferensi pose bersama (socket lokal).")
+    parser.add_argument("--model", choices=MODEL_CHOICES, default="yolov8n-pose.pt")
+    parser.add_argument("--device", choices=["cpu", "cuda:0"], default="cpu")
+    parser.add_argument("--backend", choices=BACKENDS, default="pytorch")
+    parser.add_argument("--precision", choices=["fp32", "fp16", "int8"], default="fp32")
+    parser.add_argument("--threads", type=int, default=None, help="Thread CPU untuk inferensi.")
+    parser.add_argument("--host", default=DEFAULT_HOST,
+                        help="Alamat listen. Default hanya localhost; buka ke jaringan hanya jika perlu.")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--max-batch", type=int, default=MAX_BATCH, help="Frame maksimum per panggilan model.")
+    parser.add_argument("--max-latency-ms", type=float, default=MAX_LATENCY * 1000,
+                        help="Waktu tunggu maksimum permintaan tertua sebelum batch dikirim (ms).")
+    parser.add_argument("--autotune", action="store_true",
+                        help="Terapkan profil auto-tune (FP16/thread/channels-last/ukuran inferensi) untuk model & "
+                             "device ini.")
+    parser.add_argument("--tune-video", default=None,
+                        help="Video contoh untuk --autotune (frame awalnya harus berisi orang). "
+                             "Default: frame sintetis.")
+    parser.add_argument("--key-file", default=AUTHKEY_PATH,
+                        help="File kunci autentikasi jika INFERENCE_AUTHKEY tidak diset (dibuat jika belum ada).")
+    parser.add_argument("--stats-interval", type=float, default=0,
+                        help="Cetak metrik per klien tiap N detik (0 = tidak).")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    authkey = load_authkey(args.key_file, create=True)
+    model, device = load_model(args.model, args.device, backend=args.backend, precision=args.precision,
+                               threads=args.threads)
+    profile = {}
+    if args.autotune:
+        from autotune import load_or_tune, read_sample_frames
+        frames = read_sample_frames(args.tune_video) if args.tune_video else None
+        profile, _ = load_or_tune(model, args.model, device, args.backend, args.precision, frames=frames,
+                                  log=print)
+        profile = profile or {}
+    warmup(model, device)
+    service = InferenceService(model, device, max_batch=args.max_batch, max_latency=args.max_latency_ms / 1000,
+                               half=profile.get("half", False), infer_size=profile.get("infer_size"))
+    print(f"🚀 Server inferensi {args.model} ({args.backend}, {args.precision}) di {device.upper()}, "
+          f"ukuran inferensi {service.infer_size or 'asli'}, mendengarkan {args.host}:{args.port}")
+    if not os.environ.get("INFERENCE_AUTHKEY"):
+        print(f"🔑 Kunci autentikasi: {args.key_file}")
+    if args.stats_interval > 0:
+        threading.Thread(target=print_metrics, args=(service, args.stats_interval), daemon=True).start()
+    try:
+        serve(service, (args.host, args.port), authkey)
+    except KeyboardInterrupt:
+        print("\n🛑 Server dihentikan.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,153 @@
+import csv
+import os
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+
+# Urutan tahap loop utama (tahap lain tetap dicatat, ditampilkan setelahnya)
+STAGES = ["capture", "inference", "analysis", "render", "display"]
+
+class StageMetrics:
+    """
+    Pencatat latensi per tahap loop utama dengan overhead rendah.
+
+    Setiap tahap punya ring buffer numpy berukuran `window` (tanpa alokasi per sampel); persentil
+    hanya dihitung saat snapshot() dipanggil. Aman dipakai dari beberapa thread pipeline sekaligus.
+    Selain latensi, dicatat juga counter (mis. frame yang dibuang), info (mis. device aktif)
+    dan FPS tampilan dari tick().
+    """
+    def __init__(self, window=300):
+        self.window = window
+        self.counters = {}
+        self.info = {}
+        self._samples = {}
+        self._totals = {}
+        self._ticks = np.zeros(window, dtype=np.float64)
+        self._tick_count = 0
+        self._lock = threading.Lock()
+
+    def record(self, stage, elapsed, count=1):
+        """Mencatat satu pengukuran `elapsed` detik untuk `count` item (latensi per item disimpan)."""
+        with self._lock:
+            ring = self._samples.get(stage)
+            if ring is None:
+                ring = self._samples[stage] = [np.zeros(self.window, dtype=np.float64), 0]
+                self._totals[stage] = [0, 0.0]
+            buffer, n = ring
+            buffer[n % self.window] = elapsed / count
+            ring[1] = n + 1
+            totals = self._totals[stage]
+            totals[0] += count
+            totals[1] += elapsed
+
+    def time(self, stage, count=1):
+        """Context manager: `with metrics.time("analysis"): ...`."""
+        return _StageTimer(self, stage, count)
+
+    def tick(self):
+        """Dipanggil sekali per frame yang ditampilkan, untuk menghitung FPS efektif."""
+        with self._lock:
+            self._ticks[self._tick_count % self.window] = time.perf_counter()
+            self._tick_count += 1
+
+    def incr(self, name, value=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def set_info(self, name, value):
+        self.info[name] = value
+
+    @property
+    def fps(self):
+        with self._lock:
+            n = min(self._tick_count, self.window)
+            if n < 2:
+                return 0.0
+            ticks = self._ticks[:n]
+            span = ticks.max() - ticks.min()
+        return (n - 1) / span if span > 0 else 0.0
+
+    def snapshot(self):
+        """
+        Ringkasan per tahap: dict {tahap: {"count", "mean_ms", "p50_ms", "p95_ms", "p99_ms"}}.
+        Rata-rata dari seluruh sesi, persentil dari `window` sampel terakhir.
+        """
+        with self._lock:
+            copies = {
+                stage: (buffer[:min(n, self.window)].copy(), *self._totals[stage])
+                for stage, (buffer, n) in self._samples.items()
+            }
+        ordered = [s for s in STAGES if s in copies] + sorted(s for s in copies if s not in STAGES)
+        summary = {}
+        for stage in ordered:
+            samples, count, total = copies[stage]
+            p50, p95, p99 = np.percentile(samples, [50, 95, 99]) * 1000.0
+            summary[stage] = {
+                "count": count,
+                "mean_ms": 1000.0 * total / count if count else 0.0,
+                "p50_ms": float(p50), "p95_ms": float(p95), "p99_ms": float(p99),
+            }
+        return summary
+
+    def to_prometheus(self, prefix="workout"):
+        """Format teks eksposisi Prometheus (bisa dibaca node_exporter textfile collector)."""
+        lines = [
+            f"# HELP {prefix}_stage_latency_ms Latensi per item tiap tahap loop utama.",
+            f"# TYPE {prefix}_stage_latency_ms summary",
+        ]
+        for stage, stats in self.snapshot().items():
+            for quantile, key in (("0.5", "p50_ms"), ("0.95", "p95_ms"), ("0.99", "p99_ms")):
+                lines.append(f'{prefix}_stage_latency_ms{{stage="{stage}",quantile="{quantile}"}} {stats[key]:.3f}')
+            lines.append(f'{prefix}_stage_latency_ms_count{{stage="{stage}"}} {stats["count"]}')
+            lines.append(f'{prefix}_stage_latency_ms_sum{{stage="{stage}"}} {stats["mean_ms"] * stats["count"]:.3f}')
+        lines.append(f"# TYPE {prefix}_fps gauge")
+        lines.append(f"{prefix}_fps {self.fps:.2f}")
+        for name, value in sorted(self.counters.items()):
+            lines.append(f"# TYPE {prefix}_{name}_total counter")
+            lines.append(f"{prefix}_{name}_total {value}")
+        if self.info:
+            labels = ",".join(f'{name}="{value}"' for name, value in sorted(self.info.items()))
+            lines.append(f"# TYPE {prefix}_info gauge")
+            lines.append(f"{prefix}_info{{{labels}}} 1")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path):
+        """Menulis file .prom secara atomik (tulis file sementara lalu rename)."""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(self.to_prometheus())
+        os.replace(tmp_path, path)
+
+    def append_csv(self, path):
+        """Menambahkan satu baris per tahap (dengan timestamp) ke file CSV."""
+        new_file = not os.path.exists(path)
+        now = datetime.now().isoformat(timespec="seconds")
+        fps = round(self.fps, 2)
+        dropped = self.counters.get("dropped_frames", 0)
+        device = self.info.get("device", "")
+        with open(path, "a", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            if new_file:
+                writer.writerow(["timestamp", "stage", "count", "mean_ms", "p50_ms", "p95_ms", "p99_ms",
+                                 "fps", "dropped_frames", "device"])
+            for stage, stats in self.snapshot().items():
+                writer.writerow([now, stage, stats["count"], round(stats["mean_ms"], 3), round(stats["p50_ms"], 3),
+                                 round(stats["p95_ms"], 3), round(stats["p99_ms"], 3), fps, dropped, device])
+
+class _StageTimer:
+    __slots__ = ("metrics", "stage", "count", "start")
+
+    def __init__(self, metrics, stage, count):
+        self.metrics = metrics
+        self.stage = stage
+        self.count = count
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.metrics.record(self.stage, time.perf_counter() - self.start, self.count)
+        return False
@@ -0,0 +1,414 @@
+import os
+import shutil
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+# torch & ultralytics (beberapa detik untuk di-import) baru dimuat saat model benar-benar dibutuhkan,
+# sehingga UI, batch CLI dan replay bisa mulai tanpa menunggu keduanya.
+
+# Daftar model yang tersedia di sidebar (YOLOv8 dan YOLO11, tanpa P6)
+MODEL_CHOICES = [
+    # YOLOv8 Standard
+    "yolov8n-pose.pt", "yolov8s-pose.pt", "yolov8m-pose.pt", "yolov8l-pose.pt", "yolov8x-pose.pt",
+    # YOLO11 Standard
+    "yolo11n-pose.pt", "yolo11s-pose.pt", "yolo11m-pose.pt", "yolo11l-pose.pt", "yolo11x-pose.pt"
+]
+
+# Pilihan ukuran inferensi (sisi terpanjang, piksel). None = frame asli diberikan langsung ke model.
+INFER_SIZES = [320, 480, 640, 960, 1280]
+
+# --- BACKEND MODEL ---
+# Artefak hasil ekspor disimpan di sini dan dipakai ulang saat start berikutnya
+EXPORT_DIR = "model_cache"
+BACKENDS = ["pytorch", "onnx", "openvino", "torchscript"]
+# Presisi yang didukung per backend. fp16 untuk onnx/torchscript hanya bisa diekspor di GPU.
+PRECISIONS = {
+    "pytorch": ["fp32"],
+    "onnx": ["fp32", "fp16", "int8"],
+    "openvino": ["fp32", "fp16", "int8"],
+    "torchscript": ["fp32", "fp16"],
+}
+_EXPORT_SUFFIX = {"onnx": ".onnx", "openvino": "_openvino_model", "torchscript": ".torchscript"}
+EXPORT_IMGSZ = 640
+
+def exported_model_path(model_name, backend, precision="fp32", imgsz=EXPORT_IMGSZ):
+    """Lokasi artefak ekspor di cache, mis. model_cache/yolov8n-pose_fp32_640.onnx."""
+    stem = os.path.splitext(os.path.basename(model_name))[0]
+    return os.path.join(EXPORT_DIR, f"{stem}_{precision}_{imgsz}{_EXPORT_SUFFIX[backend]}")
+
+def export_model(model_name, backend, precision="fp32", device="cpu", imgsz=EXPORT_IMGSZ, warn=print):
+    """
+    Mengekspor bobot .pt ke backend lain (sekali saja) dan mengembalikan path artefak di cache.
+    INT8 ONNX memakai quantisasi dinamis onnxruntime (tanpa data kalibrasi).
+    """
+    if precision not in PRECISIONS[backend]:
+        raise ValueError(f"Presisi {precision} tidak didukung untuk backend {backend}.")
+    if precision == "fp16" and backend in ("onnx", "torchscript") and device == "cpu":
+        raise ValueError(f"Ekspor {backend} FP16 membutuhkan GPU (cuda:0).")
+
+    target = exported_model_path(model_name, backend, precision, imgsz)
+    if os.path.exists(target):
+        return target
+
+    os.makedirs(EXPORT_DIR, exist_ok=True)
+    warn(f"Mengekspor {model_name} ke {backend.upper()} ({precision}). Hanya dilakukan sekali...")
+    kwargs = {"format": backend, "imgsz": imgsz, "device": 0 if device == "cuda:0" else "cpu"}
+    if backend in ("onnx", "openvino"):
+        # Batch dan ukuran input dinamis agar tetap bisa dipakai untuk batch inferensi & Ukuran Inferensi
+        kwargs["dynamic"] = True
+    if precision == "fp16":
+        kwargs["half"] = True
+    if precision == "int8" and backend == "openvino":
+        kwargs["int8"] = True
+
+    from ultralytics import YOLO
+    exported = YOLO(model_name).export(**kwargs)
+    if backend == "onnx" and precision == "int8":
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+        quantize_dynamic(exported, target, weight_type=QuantType.QUInt8)
+        os.remove(exported)
+    else:
+        shutil.move(exported, target)
+    return target
+
+def load_model(model_name, device, warn=print, backend="pytorch", precision="fp32", threads=None):
+    """
+    Memuat model YOLO Pose di device yang diminta, dengan fallback ke CPU.
+    backend selain "pytorch" memakai artefak ekspor dari cache (diekspor otomatis jika belum ada).
+    threads (opsional) membatasi thread CPU PyTorch / ONNX Runtime.
+    warn dipanggil dengan pesan peringatan (st.warning di aplikasi, print di CLI).
+    Mengembalikan tuple: (model, device_yang_dipakai)
+    """
+    if precision not in PRECISIONS[backend]:
+        raise ValueError(f"Presisi {precision} tidak didukung untuk backend {backend} "
+                         f"(pilihan: {', '.join(PRECISIONS[backend])}).")
+    import torch
+    from ultralytics import YOLO
+
+    final_device = device
+    if device == 'cuda:0' and not torch.cuda.is_available():
+        final_device = 'cpu'
+        warn(f"GPU tidak terdeteksi oleh PyTorch. Otomatis beralih ke {final_device}.")
+
+    if threads:
+        torch.set_num_threads(threads)
+
+    if backend != "pytorch":
+        path = export_model(model_name, backend, precision, final_device, warn=warn)
+        model = YOLO(path, task="pose")
+        # Inferensi pertama membuat sesi backend; setelah itu jumlah thread ONNX Runtime bisa diatur
+        warmup(model, final_device)
+        if threads and backend == "onnx":
+            _set_onnx_threads(model, path, threads)
+        return model, final_device
+
+    try:
+        model = YOLO(model_name)
+        model.to(final_device)
+        return model, final_device
+    except Exception as e:
+        if final_device != 'cpu':
+            warn(f"Gagal memuat di {final_device}, mencoba CPU...")
+            model = YOLO(model_name)
+            model.to('cpu')
+            return model, 'cpu'
+        else:
+            raise e
+
+def cuda_available():
+    """True jika PyTorch melihat GPU CUDA (meng-import torch saat pertama dipanggil)."""
+    import torch
+    return torch.cuda.is_available()
+
+def find_local_weights(model_name):
+    """
+    Path bobot .pt yang sudah ada di disk (direktori kerja, lalu folder weights ultralytics), atau None.
+    Hanya memeriksa file lokal, tidak pernah mengakses jaringan. None berarti YOLO() akan mengunduh bobot.
+    """
+    if os.path.isfile(model_name):
+        return model_name
+    try:
+        from ultralytics.utils import SETTINGS
+        weights_dir = SETTINGS.get("weights_dir")
+    except ImportError:
+        weights_dir = None
+    if weights_dir:
+        candidate = os.path.join(weights_dir, os.path.basename(model_name))
+        if os.path.isfile(candidate):
+            return candidate
+    return None
+
+class ModelPreloader:
+    """
+    Memuat model di thread latar belakang (import torch/ultralytics, baca bobot, pindah device, warm-up),
+    sehingga UI tetap responsif dan frame pertama tidak menanggung biaya inisialisasi.
+
+    load(...) langsung mengembalikan Future; permintaan dengan argumen sama memakai Future yang sama.
+    device "auto" (GPU jika terdeteksi, selain itu CPU) ditentukan di thread pemuat, bukan thread pemanggil.
+    Satu thread pemuat: ganti model berulang kali di sidebar hanya mengantre, tidak memuat paralel.
+    Hasil Future: dict model, device, warnings (pesan untuk UI), weights_local, timings (detik per langkah),
+    profile (profil auto-tune tersimpan jika autotune=True dan profilnya sudah ada, selain itu None).
+    """
+    def __init__(self, keep=2):
+        self.keep = keep
+        self._futures = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="model-preload")
+
+    def load(self, model_name, device, backend="pytorch", precision="fp32", threads=None, warmup_size=EXPORT_IMGSZ,
+             autotune=False):
+        key = (model_name, device, backend, precision, threads, warmup_size, autotune)
+        with self._lock:
+            future = self._futures.pop(key, None)
+            if future is None or (future.done() and future.exception() is not None):
+                future = self._executor.submit(self._load, *key)
+            self._futures[key] = future  # urutan dict = urutan pemakaian terakhir
+            while len(self._futures) > self.keep:
+                self._futures.pop(next(iter(self._futures)))
+        return future
+
+    @staticmethod
+    def _load(model_name, device, backend, precision, threads, warmup_size, autotune):
+        warnings = []
+        timings = {}
+        start = time.perf_counter()
+        import torch  # noqa: F401  (waktu import dicatat terpisah dari waktu muat bobot)
+        import ultralytics  # noqa: F401
+        timings["import"] = time.perf_counter() - start
+        if device == "auto":
+            device = "cuda:0" if cuda_available() else "cpu"
+
+        weights_local = backend != "pytorch" or find_local_weights(model_name) is not None
+        if not weights_local:
+            warnings.append(f"Bobot {model_name} belum ada di disk, diunduh sekali...")
+
+        start = time.perf_counter()
+        model, final_device = load_model(
+            model_name, device, warn=warnings.append, backend=backend, precision=precision, threads=threads
+        )
+        timings["load"] = time.perf_counter() - start
+
+        profile = None
+        if autotune:
+            # Hanya profil tersimpan yang diterapkan di sini; pengukuran butuh frame sungguhan dari
+            # video/webcam, jadi dilakukan pemanggil saat pemrosesan dimulai (lihat autotune.load_or_tune)
+            from autotune import cached_profile
+            start = time.perf_counter()
+            profile = cached_profile(model, model_name, final_device, backend, precision)
+            timings["autotune"] = time.perf_counter() - start
+
+        # Inisialisasi CUDA/cuDNN & alokasi buffer terjadi di sini, bukan di frame pertama
+        # (backend ekspor sudah di-warm-up load_model pada EXPORT_IMGSZ)
+        start = time.perf_counter()
+        if backend == "pytorch" or warmup_size != EXPORT_IMGSZ:
+            warmup(model, final_device, warmup_size)
+        timings["warmup"] = time.perf_counter() - start
+        return {
+            "model": model,
+            "device": final_device,
+            "warnings": warnings,
+            "weights_local": weights_local,
+            "timings": timings,
+            "profile": profile,
+        }
+
+def warmup(model, device, imgsz=EXPORT_IMGSZ):
+    """Satu inferensi pada frame hitam agar inisialisasi backend tidak terjadi di frame pertama."""
+    model(np.zeros((imgsz, imgsz, 3), dtype=np.uint8), verbose=False, device=device)
+
+def move_model(model, device):
+    """Memindahkan model ke device; hanya berlaku untuk model PyTorch (.pt)."""
+    import torch
+    if isinstance(model.model, torch.nn.Module):
+        model.to(device)
+
+def _set_onnx_threads(model, path, threads):
+    import onnxruntime as ort
+
+    backend = model.predictor.model
+    options = ort.SessionOptions()
+    options.intra_op_num_threads = threads
+    options.inter_op_num_threads = 1
+    options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    backend.session = ort.InferenceSession(path, sess_options=options, providers=backend.session.get_providers())
+
+def read_frames(cap, count):
+    """Membaca hingga `count` frame dari cv2.VideoCapture. List lebih pendek berarti video habis."""
+    frames = []
+    while len(frames) < count:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(frame)
+    return frames
+
+def predict(model, frames, conf, device, max_det=1, imgsz=None, half=False):
+    """Inferensi satu batch frame sekaligus. Mengembalikan list hasil, satu per frame (urutan sama)."""
+    kwargs = {"imgsz": imgsz} if imgsz else {}
+    if half:
+        kwargs["half"] = True
+    return model(list(frames), verbose=False, conf=conf, device=device, max_det=max_det, **kwargs)
+
+def resize_for_inference(frame, infer_size):
+    """
+    Mengecilkan frame agar sisi terpanjang = infer_size (tidak pernah memperbesar).
+    Mengembalikan tuple: (frame_kecil, (skala_x, skala_y)) atau (frame, None) jika tidak diubah.
+    """
+    h, w = frame.shape[:2]
+    if not infer_size or max(h, w) <= infer_size:
+        return frame, None
+    ratio = infer_size / max(h, w)
+    new_w, new_h = max(1, round(w * ratio)), max(1, round(h * ratio))
+    small = cv2.resize(frame, (new_w, new_h), interpolation=cv2.INTER_AREA)
+    return small, (w / new_w, h / new_h)
+
+def rescale_result(result, frame, scale, offset=(0.0, 0.0)):
+    """
+    Memetakan box & keypoints hasil inferensi frame kecil kembali ke koordinat frame asli:
+    koordinat * skala + offset (offset dipakai untuk hasil inferensi potongan/ROI frame).
+    """
+    from ultralytics.engine.results import Results
+
+    sx, sy = scale
+    ox, oy = offset
+    boxes = keypoints = None
+    if result.boxes is not None:
+        boxes = result.boxes.data.clone()
+        boxes[:, [0, 2]] = boxes[:, [0, 2]] * sx + ox
+        boxes[:, [1, 3]] = boxes[:, [1, 3]] * sy + oy
+    if result.keypoints is not None:
+        keypoints = result.keypoints.data.clone()
+        keypoints[..., 0] = keypoints[..., 0] * sx + ox
+        keypoints[..., 1] = keypoints[..., 1] * sy + oy
+    return Results(frame, path=result.path, names=result.names, boxes=boxes, keypoints=keypoints)
+
+def person_keypoints(result):
+    """Mengambil keypoints (17, 2) orang pertama dari satu hasil YOLO, atau None jika tidak ada."""
+    if result.keypoints is None:
+        return None
+    keypoints = result.keypoints.xy.cpu().numpy()
+    if len(keypoints) > 0:
+        return keypoints[0]
+    return None
+
+def all_keypoints(result):
+    """Keypoints semua orang dari satu hasil YOLO sebagai array (P, 17, 3) x, y, conf."""
+    if result.keypoints is None:
+        return np.zeros((0, 17, 3), dtype=np.float32)
+    return result.keypoints.data.cpu().numpy()
+
+def all_boxes(result):
+    """Box semua orang dari satu hasil YOLO sebagai array (P, 4) x1, y1, x2, y2."""
+    if result.boxes is None:
+        return np.zeros((0, 4), dtype=np.float32)
+    return result.boxes.xyxy.cpu().numpy()
+
+class BatchStats:
+    """Mencatat throughput dan latensi per batch inferensi (latensi disimpan untuk `window` batch terakhir)."""
+    def __init__(self, window=1000):
+        self.batches = 0
+        self.frames = 0
+        self.total_time = 0.0
+        self.latencies = deque(maxlen=window)
+
+    def record(self, frame_count, elapsed):
+        self.batches += 1
+        self.frames += frame_count
+        self.total_time += elapsed
+        self.latencies.append(elapsed)
+
+    @property
+    def throughput(self):
+        """Frame per detik (hanya waktu inferensi)."""
+        return self.frames / self.total_time if self.total_time > 0 else 0.0
+
+    @property
+    def mean_latency_ms(self):
+        return 1000.0 * self.total_time / self.batches if self.batches else 0.0
+
+    def percentile_latency_ms(self, q):
+        if not self.latencies:
+            return 0.0
+        return 1000.0 * float(np.percentile(self.latencies, q))
+
+# Penanda argumen tidak diisi (None sudah berarti "ukuran asli")
+_DEFAULT = object()
+
+class InferenceRunner:
+    """
+    Callable inferensi dengan fallback otomatis ke CPU jika GPU error saat runtime.
+    Aman dipanggil dari thread pipeline; UI cukup membaca `device` untuk mendeteksi fallback.
+
+    infer_size (opsional) memisahkan resolusi inferensi dari resolusi capture: frame dikecilkan dulu,
+    lalu keypoints dikembalikan ke koordinat asli sehingga ambang PoseAnalyzer dan overlay tidak berubah.
+    half: inferensi FP16 (hanya berlaku di GPU).
+
+    Fallback ke CPU tidak permanen: setelah `retry_after` detik GPU dicoba lagi. Jika masih gagal,
+    jeda berikutnya digandakan (maks. `max_retry_after`) agar error berulang tidak memperlambat loop.
+    """
+    def __init__(self, model, device, conf, max_det=1, infer_size=None, half=False, retry_after=30.0,
+                 max_retry_after=600.0):
+        self.model = model
+        self.device = device
+        self.preferred_device = device
+        self.conf = conf
+        self.max_det = max_det
+        self.infer_size = infer_size
+        self.half = half
+        self.retry_after = retry_after
+        self.max_retry_after = max_retry_after
+        self.fallbacks = 0
+        self.stats = BatchStats()
+        self._cooldown = retry_after
+        self._fallback_at = None
+
+    def __call__(self, frames, infer_size=_DEFAULT):
+        """infer_size (opsional) mengganti ukuran inferensi untuk panggilan ini saja (mis. potongan ROI)."""
+        start = time.perf_counter()
+        infer_size = self.infer_size if infer_size is _DEFAULT else infer_size
+        resized = [resize_for_inference(frame, infer_size) for frame in frames]
+        inputs = [small for small, _ in resized]
+        if self._fallback_at is not None and start - self._fallback_at >= self._cooldown:
+            self._retry_preferred()
+        try:
+            results = self._predict(inputs, infer_size)
+        except Exception:
+            # Jika error GPU saat runtime, pindah ke CPU dan coba lagi
+            if self.device != 'cuda:0':
+                raise
+            self._fall_back(start)
+            results = self._predict(inputs, infer_size)
+
+        results = [
+            rescale_result(result, frame, scale) if scale else result
+            for result, frame, (_, scale) in zip(results, frames, resized)
+        ]
+        self.stats.record(len(frames), time.perf_counter() - start)
+        return results
+
+    def _predict(self, inputs, infer_size):
+        half = self.half and self.device != 'cpu'
+        return predict(self.model, inputs, self.conf, self.device, self.max_det, infer_size, half=half)
+
+    def _fall_back(self, now):
+        if self.fallbacks:
+            # Device awal gagal lagi setelah dicoba ulang: jeda berikutnya lebih lama
+            self._cooldown = min(self._cooldown * 2, self.max_retry_after)
+        self.device = 'cpu'
+        self.fallbacks += 1
+        self._fallback_at = now
+        move_model(self.model, 'cpu')
+
+    def _retry_preferred(self):
+        """Memindahkan model kembali ke device awal; jika gagal, tetap di CPU sampai jeda berikutnya."""
+        try:
+            move_model(self.model, self.preferred_device)
+            self.device = self.preferred_device
+            self._fallback_at = None
+        except Exception:
+            self._fall_back(time.perf_counter())
@@ -0,0 +1,92 @@
+import cv2
+import numpy as np
+
+# Pasangan keypoint COCO yang digambar sebagai tulang (sama dengan skeleton ultralytics, indeks mulai 0)
+SKELETON = [
+    (15, 13), (13, 11), (16, 14), (14, 12), (11, 12), (5, 11), (6, 12), (5, 6), (5, 7), (6, 8),
+    (7, 9), (8, 10), (1, 2), (0, 1), (0, 2), (1, 3), (2, 4), (3, 5), (4, 6),
+]
+
+# Palet warna pose ultralytics (RGB) agar tampilan sama dengan results.plot()
+_POSE_PALETTE = np.array([
+    [255, 128, 0], [255, 153, 51], [255, 178, 102], [230, 230, 0], [255, 153, 255],
+    [153, 204, 255], [255, 102, 255], [255, 51, 255], [102, 178, 255], [51, 153, 255],
+    [255, 153, 153], [255, 102, 102], [255, 51, 51], [153, 255, 153], [102, 255, 102],
+    [51, 255, 51], [0, 255, 0], [0, 0, 255], [255, 0, 0], [255, 255, 255],
+], dtype=np.uint8)
+# Warna dalam urutan BGR karena frame output tetap BGR (siap untuk cv2.imencode)
+LIMB_COLORS = [tuple(int(c) for c in _POSE_PALETTE[i][::-1]) for i in [9, 9, 9, 9, 7, 7, 7, 0, 0, 0, 0, 0, 16, 16, 16, 16, 16, 16, 16]]
+KPT_COLORS = [tuple(int(c) for c in _POSE_PALETTE[i][::-1]) for i in [16, 16, 16, 16, 16, 0, 0, 0, 0, 0, 0, 9, 9, 9, 9, 9, 9]]
+
+class OverlayRenderer:
+    """
+    Renderer ringan pengganti results[0].plot() pada frame resolusi penuh.
+    Frame dikecilkan langsung ke buffer output selebar tampilan (tetap BGR, tanpa konversi warna),
+    lalu hanya 17 keypoints dan tulang skeleton yang digambar di buffer kecil tersebut.
+
+    Buffer output dialokasikan sekali dan dipakai bergiliran (`buffers` buah) karena frame
+    sebelumnya bisa masih menunggu di antrian pipeline saat frame berikutnya digambar.
+    enabled=False mematikan render sepenuhnya (render() mengembalikan None), untuk mode headless.
+    """
+    def __init__(self, display_width=640, enabled=True, draw_skeleton=True, kpt_conf=0.5, buffers=6):
+        self.display_width = display_width
+        self.enabled = enabled
+        self.draw_skeleton = draw_skeleton
+        self.kpt_conf = kpt_conf
+        self._buffer_count = buffers
+        self._source_shape = None
+        self._buffers = []
+        self._next = 0
+
+    def render(self, frame, keypoints=None, labels=None):
+        """
+        frame: frame BGR resolusi asli. keypoints: array (P, 17, 3) x, y, conf di koordinat asli (opsional).
+        labels: teks per orang (mis. ID atlet) yang ditulis di atas skeleton (opsional).
+        Mengembalikan frame BGR selebar display_width, atau None jika renderer dimatikan.
+        """
+        if not self.enabled:
+            return None
+
+        h, w = frame.shape[:2]
+        if self._source_shape != (h, w):
+            self._allocate(h, w)
+
+        out = self._buffers[self._next]
+        self._next = (self._next + 1) % self._buffer_count
+        display_h, display_w = out.shape[:2]
+        cv2.resize(frame, (display_w, display_h), dst=out, interpolation=cv2.INTER_LINEAR)
+
+        if self.draw_skeleton and keypoints is not None and len(keypoints) > 0:
+            self._draw(out, keypoints, display_w / w, display_h / h, labels)
+        return out
+
+    def _allocate(self, h, w):
+        display_h = int(self.display_width * (h / w))
+        self._source_shape = (h, w)
+        self._buffers = [np.empty((display_h, self.display_width, 3), dtype=np.uint8)
+                         for _ in range(self._buffer_count)]
+        self._next = 0
+
+    def _draw(self, canvas, keypoints, sx, sy, labels=None):
+        points = np.empty(keypoints.shape[:2] + (2,), dtype=np.int32)
+        points[..., 0] = np.rint(keypoints[..., 0] * sx)
+        points[..., 1] = np.rint(keypoints[..., 1] * sy)
+        visible = (keypoints[..., 0] != 0) & (keypoints[..., 1] != 0)
+        if keypoints.shape[-1] == 3:
+            visible &= keypoints[..., 2] >= self.kpt_conf
+
+        for person_points, person_visible in zip(points.tolist(), visible.tolist()):
+            for (a, b), color in zip(SKELETON, LIMB_COLORS):
+                if person_visible[a] and person_visible[b]:
+                    cv2.line(canvas, person_points[a], person_points[b], color, 2, cv2.LINE_AA)
+            for i, point in enumerate(person_points):
+                if person_visible[i]:
+                    cv2.circle(canvas, point, 3, KPT_COLORS[i], -1, cv2.LINE_AA)
+
+        if labels is not None:
+            for label, person_points, person_visible in zip(labels, points.tolist(), visible.tolist()):
+                shown = [p for p, v in zip(person_points, person_visible) if v]
+                if shown:
+                    x, y = min(shown, key=lambda p: p[1])
+                    cv2.putText(canvas, str(label), (x, max(y - 10, 12)), cv2.FONT_HERSHEY_SIMPLEX,
+                                0.5, (255, 255, 255), 1, cv2.LINE_AA)
@@ -0,0 +1,249 @@
+"""
+Pemrosesan banyak video secara paralel dengan process pool.
+
+Setiap worker memuat model SEKALI (initializer) dan membatasi thread PyTorch / ONNX Runtime / OpenCV
+ke jatah core-nya, sehingga N worker tidak saling berebut core. Video dipecah menjadi segmen
+(start, end) yang diambil worker dari antrean bersama pool; video panjang pun bisa memakai semua core.
+
+Worker hanya menjalankan inferensi (bagian mahal) dan mengembalikan keypoints segmennya. Setiap segmen
+ikut menginferensi `overlap` frame sebelum start; proses induk memakai frame tumpang tindih itu untuk
+mencocokkan posisi segmen (seek OpenCV tidak selalu tepat frame), membuang duplikatnya, lalu
+menjalankan SATU PoseAnalyzer berurutan lintas segmen. State analyzer (stage, filter, dwell) dengan
+begitu tersambung di batas segmen.
+
+Jika pencocokan tidak meyakinkan (tidak ada orang di area tumpang tindih, pose diam sehingga beberapa
+posisi sama cocoknya, atau seek meleset lebih dari `overlap` frame), segmen itu dibaca ulang tanpa seek
+(frame sebelumnya dilewati satu per satu) sehingga posisinya pasti, bukan disambung dengan tebakan.
+"""
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import get_context
+
+import cv2
+import numpy as np
+
+from autotune import apply_profile
+from model_utils import BatchStats, InferenceRunner, all_keypoints, load_model, read_frames
+
+# Panjang segmen default (frame) dan frame tumpang tindih antar segmen
+SEGMENT_FRAMES = 1800
+OVERLAP_FRAMES = 8
+# Selisih keypoints rata-rata (piksel) maksimum agar posisi segmen dianggap cocok; frame yang sama
+# menghasilkan keypoints (hampir) identik
+ALIGN_TOLERANCE = 1.0
+
+# State per proses worker (diisi _init_worker)
+_worker = {}
+
+def worker_threads(workers):
+    """Jatah thread CPU per worker agar total thread tidak melebihi jumlah core."""
+    return max(1, (os.cpu_count() or 1) // max(1, workers))
+
+def plan_segments(video_path, segment_frames=SEGMENT_FRAMES):
+    """
+    Memecah video menjadi segmen [start, end). Segmen terakhir end=None (baca sampai habis),
+    karena CAP_PROP_FRAME_COUNT hanya perkiraan untuk sebagian container.
+    Mengembalikan tuple: (list segmen, fps).
+    """
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise IOError(f"Video tidak bisa dibuka: {video_path}")
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0)
+    cap.release()
+
+    if not segment_frames or total <= segment_frames:
+        return [(0, None)], fps
+    starts = list(range(0, total - segment_frames // 2, segment_frames))
+    segments = [(start, start + segment_frames) for start in starts[:-1]]
+    segments.append((starts[-1], None))
+    return segments, fps
+
+def _init_worker(model_name, device, backend, precision, threads, conf, infer_size, half, profile):
+    cv2.setNumThreads(1)
+    model, final_device = load_model(model_name, device, backend=backend, precision=precision, threads=threads)
+    if profile:
+        # Jumlah thread tetap jatah worker, bukan hasil auto-tune untuk satu proses
+        apply_profile(model, {**profile, "threads": threads})
+    _worker["runner"] = InferenceRunner(model, final_device, conf, max_det=1, infer_size=infer_size, half=half)
+
+def extract_segment(runner, video_path, start, end, overlap=OVERLAP_FRAMES, batch_size=1, exact=False):
+    """
+    Inferensi frame [start - overlap, end) satu video (end=None: sampai habis).
+    exact=True: frame sebelum seek dilewati dengan grab() satu per satu (lebih lambat, posisi pasti).
+    Mengembalikan dict: seek (frame awal yang dibaca), exact (posisi pasti), keypoints (M, 17, 3) x, y, conf
+    orang pertama (nol jika tidak terdeteksi), detected (M,) bool, waktu & jumlah frame inferensi.
+    """
+    seek = max(0, start - overlap)
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise IOError(f"Video tidak bisa dibuka: {video_path}")
+    if seek and exact:
+        for _ in range(seek):
+            if not cap.grab():
+                break
+    elif seek:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, seek)
+
+    runner.stats = BatchStats()
+    remaining = None if end is None else end - seek
+    keypoints_list = []
+    detected = []
+    try:
+        while remaining is None or remaining > 0:
+            count = batch_size if remaining is None else min(batch_size, remaining)
+            frames = read_frames(cap, count)
+            if not frames:
+                break
+            for result in runner(frames):
+                people = all_keypoints(result)
+                detected.append(len(people) > 0)
+                keypoints_list.append(people[0] if len(people) else np.zeros((17, 3), dtype=np.float32))
+            if remaining is not None:
+                remaining -= len(frames)
+            if len(frames) < count:
+                break
+    finally:
+        cap.release()
+
+    keypoints = np.stack(keypoints_list) if keypoints_list else np.zeros((0, 17, 3), dtype=np.float32)
+    return {
+        "seek": seek,
+        "exact": exact or seek == 0,
+        "keypoints": keypoints.astype(np.float32, copy=False),
+        "detected": np.array(detected, dtype=bool),
+        "inference_time": runner.stats.total_time,
+        "batches": runner.stats.batches,
+    }
+
+def _run_segment(task):
+    video_index, segment_index, video_path, start, end, overlap, batch_size, exact = task
+    segment = extract_segment(_worker["runner"], video_path, start, end, overlap, batch_size, exact)
+    segment["device"] = _worker["runner"].device
+    return video_index, segment_index, segment
+
+def _alignment_shift(keypoints, detected, segment, overlap, tolerance=ALIGN_TOLERANCE):
+    """
+    Selisih frame (δ) antara posisi yang diminta dan yang benar-benar dibaca segmen: frame ke-j segmen
+    dianggap frame global seek + j + δ, untuk |δ| <= overlap. Hanya δ yang dibandingkan pada minimal
+    overlap // 2 frame terdeteksi yang dinilai. Mengembalikan δ jika tepat satu δ cocok (selisih keypoints
+    <= `tolerance` piksel), selain itu None (tidak meyakinkan).
+    """
+    seek, head, head_detected = segment["seek"], segment["keypoints"], segment["detected"]
+    min_pairs = max(2, overlap // 2)
+    matches = []
+    for shift in range(-overlap, overlap + 1):
+        j = np.arange(len(head))
+        target = seek + j + shift
+        valid = (target >= 0) & (target < len(keypoints))
+        j, target = j[valid], target[valid]
+        both = head_detected[j] & detected[target]
+        if np.count_nonzero(both) < min_pairs:
+            continue
+        error = np.abs(head[j[both], :, :2] - keypoints[target[both], :, :2]).mean()
+        if error <= tolerance:
+            matches.append(shift)
+    return matches[0] if len(matches) == 1 else None
+
+def stitch_segments(segments, overlap=OVERLAP_FRAMES):
+    """
+    Menyambung segmen (urut start) menjadi satu urutan frame. Frame tumpang tindih dipakai untuk
+    mengoreksi seek yang meleset, lalu dibuang. Segmen exact dipakai apa adanya.
+    Mengembalikan tuple: (keypoints (N, 17, 3), detected (N,), indeks segmen yang sambungannya tidak
+    meyakinkan). Jika indeks itu tidak kosong, hasil sambungan tidak bisa dipercaya: baca ulang segmen
+    tersebut dengan exact=True lalu sambung lagi.
+    """
+    keypoints = np.zeros((0, 17, 3), dtype=np.float32)
+    detected = np.zeros(0, dtype=bool)
+    uncertain = []
+    for index, segment in enumerate(segments):
+        shift = 0
+        if len(keypoints) and not segment.get("exact"):
+            shift = _alignment_shift(keypoints, detected, segment, overlap) if overlap else None
+            if shift is None:
+                uncertain.append(index)
+                shift = 0
+        first_new = max(0, len(keypoints) - segment["seek"] - shift)
+        keypoints = np.concatenate([keypoints, segment["keypoints"][first_new:]])
+        detected = np.concatenate([detected, segment["detected"][first_new:]])
+    return keypoints, detected, uncertain
+
+def extract_videos_parallel(video_paths, model_name, device, conf, workers, batch_size=1, infer_size=None,
+                            backend="pytorch", precision="fp32", segment_frames=SEGMENT_FRAMES,
+                            overlap=OVERLAP_FRAMES, on_done=None, half=False, profile=None):
+    """
+    Inferensi semua video di process pool berisi `workers` proses.
+    on_done(video_path, hasil) dipanggil di proses induk begitu semua segmen satu video selesai.
+    profile (opsional): profil auto-tune yang diterapkan di setiap worker (lihat autotune.py).
+    Mengembalikan list dict (urutan sama dengan video_paths): keypoints (N, 17, 3), detected (N,), fps,
+    segments, realigned (segmen yang dibaca ulang tanpa seek), inference_time (jumlah semua worker),
+    batches, wall_time, device. Video yang gagal (di worker atau di on_done) berisi "error";
+    video lain tetap diproses. BrokenProcessPool (worker mati) tetap dilempar.
+    """
+    plans = []
+    tasks = []
+    for video_index, video_path in enumerate(video_paths):
+        try:
+            segments, fps = plan_segments(video_path, segment_frames)
+        except Exception as e:
+            plans.append({"error": f"{video_path}: {e!r}"})
+            continue
+        plans.append({"fps": fps, "ranges": segments, "segments": [None] * len(segments), "pending": len(segments),
+                      "realigned": 0, "start": time.perf_counter()})
+        for segment_index, (start, end) in enumerate(segments):
+            tasks.append((video_index, segment_index, video_path, start, end, overlap, batch_size, False))
+
+    init_args = (model_name, device, backend, precision, worker_threads(workers), conf, infer_size, half, profile)
+    # spawn: aman untuk CUDA dan sama perilakunya di semua OS
+    with ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn"),
+                             initializer=_init_worker, initargs=init_args) as pool:
+        pending = {pool.submit(_run_segment, task): task for task in tasks}
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                task = pending.pop(future)
+                video_index, _, video_path = task[:3]
+                plan = plans[video_index]
+                if "error" in plan:
+                    continue
+                try:
+                    _, segment_index, segment = future.result()
+                except BrokenProcessPool:
+                    raise
+                except Exception as e:
+                    # Satu video rusak tidak menghentikan video lain
+                    plan["error"] = f"{video_path}: {e!r}"
+                    continue
+                plan["segments"][segment_index] = segment
+                plan["pending"] -= 1
+                if plan["pending"]:
+                    continue
+
+                keypoints, detected, uncertain = stitch_segments(plan["segments"], overlap)
+                if uncertain:
+                    # Sambungan tidak meyakinkan: segmen itu dibaca ulang tanpa seek, lalu disambung lagi
+                    for segment_index in uncertain:
+                        start, end = plan["ranges"][segment_index]
+                        retry = (video_index, segment_index, video_path, start, end, overlap, batch_size, True)
+                        pending[pool.submit(_run_segment, retry)] = retry
+                    plan["pending"] = len(uncertain)
+                    plan["realigned"] += len(uncertain)
+                    continue
+
+                plan.update({
+                    "keypoints": keypoints,
+                    "detected": detected,
+                    "segments": len(plan["segments"]),
+                    "inference_time": sum(s["inference_time"] for s in plan["segments"]),
+                    "batches": sum(s["batches"] for s in plan["segments"]),
+                    "wall_time": time.perf_counter() - plan["start"],
+                    "device": plan["segments"][0]["device"],
+                })
+                if on_done:
+                    try:
+                        on_done(video_path, plan)
+                    except Exception as e:
+                        plan["error"] = f"{video_path}: {e!r}"
+    return plans
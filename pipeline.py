@@ -0,0 +1,164 @@
+import queue
+import threading
+import time
+
+from model_utils import read_frames
+
+# Penanda akhir stream di setiap antrian
+_END = object()
+
+class FramePipeline:
+    """
+    Pipeline producer/consumer: capture -> inferensi -> analisis/render, masing-masing di thread sendiri
+    dan dihubungkan antrian terbatas. FPS dibatasi tahap paling lambat, bukan jumlah semua tahap.
+
+    - infer_fn(frames) -> list hasil YOLO, satu per frame.
+    - process_fn(frame, result) -> item output (mis. data analisis + frame tampilan).
+    - live=True (webcam): jika antrian penuh, item paling lama dibuang agar frame tidak basi.
+    - live=False (file video): producer menunggu (backpressure), tidak ada frame yang dibuang.
+
+    Thread Streamlit cukup mengiterasi objek ini untuk mengambil hasil yang sudah jadi.
+    metrics (opsional, StageMetrics) mencatat latensi tahap capture & inference serta frame yang dibuang.
+    """
+    def __init__(self, cap, infer_fn, process_fn, frames_per_call=1, live=False, queue_size=2, metrics=None):
+        self.cap = cap
+        self.infer_fn = infer_fn
+        self.process_fn = process_fn
+        self.frames_per_call = frames_per_call
+        self.live = live
+        self.metrics = metrics
+
+        self.dropped = 0
+        self.finished = False  # True jika sumber video habis (bukan dihentikan)
+        self.error = None
+
+        self._frame_queue = queue.Queue(maxsize=queue_size)
+        self._result_queue = queue.Queue(maxsize=queue_size)
+        self._output_queue = queue.Queue(maxsize=queue_size)
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._threads = [
+            threading.Thread(target=self._run, args=(self._capture_loop,), name="capture", daemon=True),
+            threading.Thread(target=self._run, args=(self._infer_loop,), name="inference", daemon=True),
+            threading.Thread(target=self._run, args=(self._process_loop,), name="analysis", daemon=True),
+        ]
+
+    def start(self):
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def stop(self, timeout=2.0):
+        """
+        Menghentikan pipeline. Thread capture & inferensi ditunggu maks. `timeout` detik (bisa tertahan
+        kamera/model); thread analisis selalu ditunggu sampai selesai, sehingga setelah stop() kembali
+        process_fn (analyzer, perekam trace) dijamin tidak dipanggil lagi.
+        """
+        self._stop.set()
+        *others, analysis = self._threads
+        for thread in others:
+            if thread.is_alive():
+                thread.join(timeout)
+        if analysis.is_alive() and analysis is not threading.current_thread():
+            analysis.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+        return False
+
+    def __iter__(self):
+        while True:
+            item = self._get(self._output_queue)
+            if item is _END or item is None:
+                break
+            yield item
+        if self.error is not None:
+            raise self.error
+
+    # --- WORKER ---
+    def _run(self, loop):
+        try:
+            loop()
+        except Exception as e:
+            # Error di satu tahap menghentikan seluruh pipeline dan dilempar ulang ke consumer
+            self.error = e
+            self._stop.set()
+
+    def _capture_loop(self):
+        while not self._stop.is_set():
+            start = time.perf_counter()
+            frames = read_frames(self.cap, self.frames_per_call)
+            if frames and self.metrics is not None:
+                self.metrics.record("capture", time.perf_counter() - start, len(frames))
+            if frames:
+                self._put(self._frame_queue, frames)
+            if len(frames) < self.frames_per_call:
+                self.finished = True
+                break
+        self._put(self._frame_queue, _END)
+
+    def _infer_loop(self):
+        while True:
+            frames = self._get(self._frame_queue)
+            if frames is None:
+                return
+            if frames is _END:
+                self._put(self._result_queue, _END)
+                return
+            start = time.perf_counter()
+            results = self.infer_fn(frames)
+            if self.metrics is not None:
+                self.metrics.record("inference", time.perf_counter() - start, len(frames))
+            self._put(self._result_queue, (frames, results))
+
+    def _process_loop(self):
+        while True:
+            item = self._get(self._result_queue)
+            if item is None:
+                return
+            if item is _END:
+                self._put(self._output_queue, _END)
+                return
+            frames, results = item
+            for frame, result in zip(frames, results):
+                if self._stop.is_set():
+                    return
+                self._put(self._output_queue, self.process_fn(frame, result))
+
+    # --- ANTRIAN ---
+    def _get(self, q):
+        """Mengambil item; mengembalikan None jika pipeline dihentikan."""
+        while not self._stop.is_set():
+            try:
+                return q.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return None
+
+    def _put(self, q, item):
+        if self.live and item is not _END:
+            # Webcam: buang item paling lama agar consumer selalu mendapat frame terbaru
+            while not self._stop.is_set():
+                try:
+                    q.put_nowait(item)
+                    return
+                except queue.Full:
+                    try:
+                        q.get_nowait()
+                        with self._lock:
+                            self.dropped += 1
+                        if self.metrics is not None:
+                            self.metrics.incr("dropped_frames")
+                    except queue.Empty:
+                        pass
+        else:
+            # File video / penanda akhir: backpressure, tunggu sampai ada tempat
+            while not self._stop.is_set():
+                try:
+                    q.put(item, timeout=0.1)
+                    return
+                except queue.Full:
+                    continue
@@ -0,0 +1,322 @@
+
+import numpy as np
+
+from exercises import EXERCISE_TYPES, CompiledExercise, get_exercise
+from smoothing import AngleRing, make_filter
+
+# --- INDEKS KEYPOINT COCO (17 TITIK) ---
+NOSE = 0
+L_EAR, R_EAR = 3, 4
+L_SHOULDER, R_SHOULDER = 5, 6
+L_ELBOW, R_ELBOW = 7, 8
+L_WRIST, R_WRIST = 9, 10
+L_HIP, R_HIP = 11, 12
+L_KNEE, R_KNEE = 13, 14
+L_ANKLE, R_ANKLE = 15, 16
+
+# Tabel triplet (a, b, c) PushUp hasil kompilasi exercises.py (siku, badan, leher; kanan lalu kiri).
+# b adalah titik sudut. Latihan lain punya tabel sendiri di EXERCISES[nama].triplets.
+ANGLE_TRIPLETS = get_exercise("PushUp").triplets
+
+
+# --- FUNGSI UTILITAS MATEMATIKA ---
+def calculate_angle(a, b, c):
+    """Menghitung sudut antara tiga titik (a, b, c). b adalah titik sudut."""
+    a = np.array(a)
+    b = np.array(b)
+    c = np.array(c)
+
+    radians = np.arctan2(c[1]-b[1], c[0]-b[0]) - np.arctan2(a[1]-b[1], a[0]-b[0])
+    angle = np.abs(radians*180.0/np.pi)
+
+    if angle > 180.0:
+        angle = 360-angle
+
+    return angle
+
+def calculate_angles(keypoints, triplets):
+    """
+    Versi vektor dari calculate_angle.
+    keypoints: array (17, 2) untuk satu frame atau (N, 17, 2) untuk N frame.
+    triplets: array (T, 3) berisi indeks keypoint (a, b, c), b adalah titik sudut.
+    Mengembalikan array (T,) atau (N, T) dalam derajat, hasilnya sama dengan calculate_angle.
+    """
+    keypoints = np.asarray(keypoints)
+    triplets = np.asarray(triplets, dtype=np.intp)
+
+    a = keypoints[..., triplets[:, 0], :]
+    b = keypoints[..., triplets[:, 1], :]
+    c = keypoints[..., triplets[:, 2], :]
+
+    radians = np.arctan2(c[..., 1]-b[..., 1], c[..., 0]-b[..., 0]) - np.arctan2(a[..., 1]-b[..., 1], a[..., 0]-b[..., 0])
+    angle = np.abs(radians*180.0/np.pi)
+
+    return np.where(angle > 180.0, 360-angle, angle)
+
+def select_sides(keypoints):
+    """
+    Menentukan sisi badan yang dianalisis untuk PushUp (versi vektor).
+    keypoints: array (N, 17, 2). Mengembalikan (is_left, facing_right, facing_left), masing-masing array bool (N,).
+    """
+    keypoints = np.asarray(keypoints)
+    nose_x = keypoints[:, NOSE, 0]
+    l_shoulder_x, r_shoulder_x = keypoints[:, L_SHOULDER, 0], keypoints[:, R_SHOULDER, 0]
+    l_hip_x, r_hip_x = keypoints[:, L_HIP, 0], keypoints[:, R_HIP, 0]
+
+    facing_right = (nose_x > l_shoulder_x) & (nose_x > r_shoulder_x)
+    facing_left = (nose_x < l_shoulder_x) & (nose_x < r_shoulder_x)
+
+    only_left = (l_hip_x > 0) & (r_hip_x == 0)
+    both_facing_left = (l_hip_x > 0) & (r_hip_x > 0) & facing_left
+    return only_left | both_facing_left, facing_right, facing_left
+
+def _frame_angles_single(keypoints, triplet_rows):
+    """
+    Versi frame_angles untuk SATU pose. keypoints: array (17, 2); triplet_rows: exercise.triplet_rows.
+    Untuk 17 titik, overhead fancy indexing numpy jauh lebih besar daripada hitungannya sendiri, jadi selisih
+    koordinat diambil dari list Python. Selisih dua nilai float32 yang dihitung dalam float64 lalu dibulatkan
+    ke float32 sama persis dengan pengurangan float32, dan sisa rumus (arctan2 dst.) memakai operasi & dtype
+    yang sama dengan calculate_angles, sehingga sudutnya identik bit per bit dengan analyze_batch.
+    Mengembalikan tuple: (angles (T,), is_left, facing_right, facing_left)
+    """
+    points = keypoints.tolist()
+    dx, dy = [], []  # per triplet: c - b, lalu a - b
+    for a, b, c in triplet_rows:
+        (ax, ay), (bx, by), (cx, cy) = points[a], points[b], points[c]
+        dx += (cx - bx, ax - bx)
+        dy += (cy - by, ay - by)
+    radians = np.arctan2(np.array(dy, dtype=keypoints.dtype), np.array(dx, dtype=keypoints.dtype))
+    angle = np.abs((radians[0::2] - radians[1::2])*180.0/np.pi)
+    angles = np.where(angle > 180.0, 360-angle, angle)
+
+    nose_x = points[NOSE][0]
+    l_shoulder_x, r_shoulder_x = points[L_SHOULDER][0], points[R_SHOULDER][0]
+    l_hip_x, r_hip_x = points[L_HIP][0], points[R_HIP][0]
+    facing_right = nose_x > l_shoulder_x and nose_x > r_shoulder_x
+    facing_left = nose_x < l_shoulder_x and nose_x < r_shoulder_x
+    is_left = l_hip_x > 0 and (r_hip_x == 0 or (r_hip_x > 0 and facing_left))
+    return angles, is_left, facing_right, facing_left
+
+def frame_angles(keypoints, triplets=ANGLE_TRIPLETS):
+    """
+    Menghitung semua sudut `triplets` (mis. EXERCISES[nama].triplets) dan pemilihan sisi untuk N pose sekaligus
+    (N frame dari satu orang, atau N orang dalam satu frame).
+    keypoints: array (N, 17, 2). Mengembalikan tuple: (angles (N, T), is_left, facing_right, facing_left)
+    """
+    keypoints = np.asarray(keypoints)
+    return (calculate_angles(keypoints, triplets),) + select_sides(keypoints)
+
+
+# --- KELAS ANALISIS POSE ---
+FEEDBACK_NOT_COUNTED = "Repetisi tidak dihitung (Form Buruk)"
+# Pengaturan bawaan PoseAnalyzer (juga nilai awal sidebar aplikasi): perilaku hitung lama, tanpa
+# penghalusan/histeresis. Histeresis menggeser ambang atas mendekati puncak gerakan (mis. Squat 160° + 5°
+# vs puncak ~170°), sehingga dengan lag filter repetisi bisa tidak terhitung; jadi hanya diaktifkan manual.
+ANALYZER_DEFAULTS = {"smoothing": None, "hysteresis": 0.0, "min_dwell": 1}
+
+class PoseAnalyzer:
+    """
+    Penghitung repetisi streaming: satu frame masuk, state machine stage diperbarui.
+
+    Logika latihan tidak ditulis di sini, melainkan diambil dari definisi terkompilasi di exercises.py
+    (tabel triplet sudut, ambang atas/bawah, aturan form, kebijakan sisi). State disimpan di atribut
+    __slots__ dan array numpy berukuran tetap:
+    - smoothing ("ema" / "one_euro", opsional): filter inkremental pada vektor sudut latihan
+      sebelum masuk state machine, meredam jitter keypoints model kecil.
+    - hysteresis (derajat): sudut harus melewati ambang sejauh margin ini sebelum stage berubah.
+    - min_dwell (frame): kondisi transisi harus bertahan sekian frame berturut-turut.
+    - angle_history: ring buffer `history` frame terakhir (sudut yang sudah dihaluskan).
+    Nilai default (tanpa smoothing, hysteresis 0, min_dwell 1) sama persis dengan perilaku lama.
+    """
+    __slots__ = (
+        "exercise_type", "exercise", "counter", "stage", "feedback", "form_status",
+        "smoothing", "hysteresis", "min_dwell", "angle_history",
+        "_filter", "_pending", "_pending_frames",
+    )
+
+    def __init__(self, exercise_type, smoothing=None, fps=30.0, hysteresis=0.0, min_dwell=1, history=64):
+        # exercise_type: nama latihan terdaftar, atau CompiledExercise (mis. hasil derive_exercise untuk replay)
+        if isinstance(exercise_type, CompiledExercise):
+            self.exercise = exercise_type
+        else:
+            self.exercise = get_exercise(exercise_type)
+        self.exercise_type = self.exercise.name
+        self.counter = 0
+        self.stage = None
+        self.feedback = ()
+        self.form_status = "OK"
+
+        self.smoothing = smoothing
+        self.hysteresis = hysteresis
+        self.min_dwell = max(1, int(min_dwell))
+        self.angle_history = AngleRing(history, len(self.exercise.triplets))
+        self._filter = make_filter(smoothing, fps)
+        self._pending = None
+        self._pending_frames = 0
+
+    def stage_thresholds(self):
+        """Ambang sudut utama yang memicu perubahan stage untuk latihan aktif: (atas, bawah)."""
+        return (self.exercise.high, self.exercise.low)
+
+    def reset(self):
+        """Mengosongkan hitungan, stage, filter dan riwayat sudut (pengaturan tetap)."""
+        self.counter = 0
+        self.stage = None
+        self.feedback = ()
+        self.form_status = "OK"
+        self.angle_history.clear()
+        if self._filter is not None:
+            self._filter.reset()
+        self._pending = None
+        self._pending_frames = 0
+
+    def analyze(self, keypoints):
+        """Satu frame (webcam/live). keypoints: array (17, 2). Banyak frame sekaligus: analyze_batch()."""
+        if keypoints.shape[0] == 0:
+            return None, "Tidak ada orang terdeteksi"
+
+        angles, is_left, facing_right, facing_left = _frame_angles_single(
+            np.asarray(keypoints), self.exercise.triplet_rows
+        )
+        if self.exercise.side == "facing":
+            return self.update_from_angles(angles, is_left, facing_right, facing_left)
+        # Kebijakan "average" tidak butuh pemilihan sisi
+        return self.update_from_angles(angles, False, False, False)
+
+    def analyze_batch(self, keypoints_seq):
+        """
+        Menganalisis banyak frame sekaligus (mode offline / video).
+        keypoints_seq: array (N, 17, 2). Semua sudut dihitung dalam satu panggilan calculate_angles,
+        lalu state machine dijalankan berurutan per frame. Mengembalikan list hasil seperti analyze().
+        """
+        keypoints_seq = np.asarray(keypoints_seq)
+        if keypoints_seq.shape[0] == 0:
+            return []
+
+        angles, is_left, facing_right, facing_left = frame_angles(keypoints_seq, self.exercise.triplets)
+        return [
+            self.update_from_angles(angles[i], is_left[i], facing_right[i], facing_left[i])
+            for i in range(angles.shape[0])
+        ]
+
+    def count_batch(self, keypoints_seq):
+        """
+        Versi cepat analyze_batch untuk re-scoring (mis. replay trace): hanya memperbarui counter & stage,
+        tanpa dict hasil per frame. Hasil counter/stage sama dengan analyze_batch.
+
+        State machine dijalankan secara vektor: kondisi atas/bawah per frame -> panjang run (min_dwell)
+        -> urutan event terkonfirmasi; repetisi = jumlah event "atas" yang langsung diikuti event "bawah"
+        dengan form bagus. Hanya filter smoothing (jika aktif) yang berjalan per frame.
+        """
+        keypoints_seq = np.asarray(keypoints_seq)
+        if keypoints_seq.shape[0] == 0:
+            return self.counter
+
+        exercise = self.exercise
+        angles, is_left, _, _ = frame_angles(keypoints_seq, exercise.triplets)
+        if self._filter is not None:
+            angles = np.stack([self._filter(row) for row in angles])
+        self.angle_history.extend(angles)
+
+        values = exercise.side_angles_batch(angles, is_left)
+        primary = values[:, exercise.primary]
+        was_high = self.stage == exercise.high_stage
+
+        # Run yang sedang berjalan dari batch sebelumnya (state debounce _confirm) ikut diteruskan
+        high_cond = primary > exercise.high + self.hysteresis
+        low_cond = primary < exercise.low - self.hysteresis
+        high_runs = _run_lengths(high_cond, self._pending_frames if self._pending == exercise.high_stage else 0)
+        low_carry = self._pending_frames if self._pending == exercise.low_stage and was_high else 0
+        low_runs = _run_lengths(low_cond, low_carry)
+        high = high_runs >= self.min_dwell
+        low_good = (low_runs >= self.min_dwell) & ~exercise.bad_form_batch(values)
+
+        if high_cond[-1]:
+            self._pending, self._pending_frames = exercise.high_stage, int(high_runs[-1])
+        elif low_cond[-1]:
+            self._pending, self._pending_frames = exercise.low_stage, int(low_runs[-1])
+        else:
+            self._pending, self._pending_frames = None, 0
+
+        events = np.flatnonzero(high | low_good)
+        if len(events) == 0:
+            return self.counter
+        is_high = high[events]
+        # Stage sebelum batch ini berperan sebagai event sebelum event pertama
+        previous_high = np.concatenate([[was_high], is_high[:-1]])
+        self.counter += int(np.count_nonzero(previous_high & ~is_high))
+        if is_high[-1]:
+            self.stage = exercise.high_stage
+        elif was_high or is_high.any():
+            self.stage = exercise.low_stage
+        # Selain itu tidak pernah masuk stage atas: event bawah tidak mengubah stage
+        return self.counter
+
+    def update_from_angles(self, angles, is_left, facing_right, facing_left):
+        """
+        Menjalankan state machine untuk satu frame dari baris hasil frame_angles(..., exercise.triplets)
+        (sudut kedua sisi + hasil select_sides). Mengembalikan hasil seperti analyze().
+        """
+        exercise = self.exercise
+        if self._filter is not None:
+            angles = self._filter(angles)
+        self.angle_history.push(angles)
+
+        values = exercise.side_angles(angles, is_left)
+        primary = values[exercise.primary]
+        feedback = exercise.violations(values)
+        self.form_status = "BAD" if feedback else "OK"
+
+        if self._confirm(exercise.high_stage, primary > exercise.high + self.hysteresis):
+            self.stage = exercise.high_stage
+        if self.stage == exercise.high_stage and self._confirm(exercise.low_stage, primary < exercise.low - self.hysteresis):
+            if self.form_status == "OK":
+                self.stage = exercise.low_stage
+                self.counter += 1
+            else:
+                feedback += (FEEDBACK_NOT_COUNTED,)
+        self.feedback = feedback
+
+        result = {
+            "count": self.counter,
+            "stage": self.stage,
+            "feedback": feedback,
+            "angle": primary,
+        }
+        for i, name in enumerate(exercise.names):
+            if i != exercise.primary:
+                result[f"{name}_angle"] = values[i]
+        if exercise.side == "facing":
+            result["orientation"] = _orientation_label(facing_right, facing_left)
+            result["side"] = "Kiri" if is_left else "Kanan"
+        else:
+            result["orientation"] = "Depan/Belakang"
+        return result
+
+    def _confirm(self, target, condition):
+        """Debounce transisi: True jika `condition` untuk stage `target` sudah bertahan min_dwell frame."""
+        if not condition:
+            if self._pending == target:
+                self._pending, self._pending_frames = None, 0
+            return False
+        if self._pending == target:
+            self._pending_frames += 1
+        else:
+            self._pending, self._pending_frames = target, 1
+        return self._pending_frames >= self.min_dwell
+
+def _run_lengths(condition, carry=0):
+    """
+    Panjang run `condition` yang benar berturut-turut sampai tiap frame (0 jika salah).
+    carry: panjang run yang sudah berjalan sebelum frame pertama.
+    """
+    index = np.arange(len(condition))
+    last_false = np.maximum.accumulate(np.where(condition, -1 - carry, index))
+    return np.where(condition, index - last_false, 0)
+
+def _orientation_label(facing_right, facing_left):
+    if facing_right:
+        return "Menghadap Kanan"
+    elif facing_left:
+        return "Menghadap Kiri"
+    return "Depan/Belakang"
@@ -0,0 +1,57 @@
+"""
+Replay trace keypoints: hitung ulang repetisi dengan ambang/pengaturan baru tanpa menjalankan YOLO.
+
+Contoh:
+    python replay.py traces/20240101_080000_000000_PushUp --low 95
+    python replay.py --history --smoothing one_euro --hysteresis 5 --min-dwell 2
+"""
+import argparse
+import sys
+
+from exercises import EXERCISE_TYPES
+from history import HistoryStore
+from traces import replay_trace
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Hitung ulang repetisi dari trace keypoints tanpa inferensi.")
+    parser.add_argument("traces", nargs="*", help="Direktori trace.")
+    parser.add_argument("--history", action="store_true", help="Replay semua sesi di riwayat yang punya trace.")
+    parser.add_argument("--exercise", choices=EXERCISE_TYPES, default=None,
+                        help="Jenis latihan (default: sesuai saat rekam).")
+    parser.add_argument("--high", type=float, default=None, help="Ganti ambang atas sudut utama.")
+    parser.add_argument("--low", type=float, default=None, help="Ganti ambang bawah sudut utama.")
+    parser.add_argument("--smoothing", choices=["none", "ema", "one_euro"], default="none")
+    parser.add_argument("--hysteresis", type=float, default=0.0)
+    parser.add_argument("--min-dwell", type=int, default=1)
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    sessions = [(path, None) for path in args.traces]
+    if args.history:
+        store = HistoryStore()
+        sessions += [(row[5], row[4]) for row in store.traces()]
+        store.close()
+    if not sessions:
+        print("❌ Tidak ada trace untuk di-replay.")
+        return 1
+
+    overrides = {key: value for key, value in (("high", args.high), ("low", args.low)) if value is not None}
+    options = {
+        "smoothing": None if args.smoothing == "none" else args.smoothing,
+        "hysteresis": args.hysteresis,
+        "min_dwell": args.min_dwell,
+    }
+    for path, saved_count in sessions:
+        try:
+            result = replay_trace(path, args.exercise, overrides, **options)
+        except (OSError, ValueError) as e:
+            print(f"❌ {path}: {e}")
+            continue
+        saved = f" (tersimpan: {saved_count})" if saved_count is not None else ""
+        print(f"✅ {path}: {result['Repetisi']} Reps{saved}, {result['Frame Terdeteksi']}/{result['Frame']} frame, "
+              f"{result['Durasi Replay (ms)']} ms")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
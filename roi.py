@@ -0,0 +1,131 @@
+"""
+Inferensi region-of-interest (ROI): setelah atlet ditemukan, frame berikutnya hanya diinferensi pada
+potongan di sekitar skeleton sebelumnya, dengan ukuran inferensi kecil.
+
+Atlet mengisi sebagian besar potongan, sehingga inferensi potongan pada `roi_size` (mis. 320 px)
+memberi piksel per orang setara atau lebih banyak daripada frame penuh pada 640 px, dengan komputasi
+~4x lebih kecil. Keypoints dikembalikan ke koordinat frame penuh sebelum masuk PoseAnalyzer.
+"""
+import numpy as np
+
+from model_utils import rescale_result
+
+class RoiRunner:
+    """
+    Pembungkus InferenceRunner dengan mode tracking-ROI (hanya untuk satu orang).
+
+    Frame diinferensi penuh (pencarian) jika belum ada atlet, atau jika hasil potongan tidak meyakinkan:
+    tidak ada orang, rata-rata confidence keypoints < `min_confidence`, atau skeleton menyentuh tepi
+    potongan (atlet mungkin terpotong). Setiap `refresh_every` frame juga dicari ulang di frame penuh.
+
+    Interface sama dengan InferenceRunner: runner(frames) -> list hasil YOLO, satu per frame.
+    Batch frame (Video Upload) tetap diinferensi sebagai batch: satu panggilan untuk semua potongan.
+    """
+    def __init__(self, runner, roi_size=320, padding=0.25, min_size=160, min_confidence=0.5,
+                 edge_margin=4, refresh_every=150):
+        self.runner = runner
+        self.roi_size = roi_size
+        self.padding = padding
+        self.min_size = min_size
+        self.min_confidence = min_confidence
+        self.edge_margin = edge_margin
+        self.refresh_every = refresh_every
+
+        self.roi_frames = 0
+        self.full_frames = 0
+        self.fallbacks = 0
+        self._box = None  # x1, y1, x2, y2 atlet di frame sebelumnya
+        self._since_search = 0
+
+    @property
+    def device(self):
+        return self.runner.device
+
+    @property
+    def stats(self):
+        return self.runner.stats
+
+    @property
+    def roi_ratio(self):
+        total = self.roi_frames + self.full_frames
+        return self.roi_frames / total if total else 0.0
+
+    def __call__(self, frames):
+        """
+        Saat atlet sedang diikuti, semua frame dipotong dengan box yang sama (dari frame terakhir batch
+        sebelumnya) dan diinferensi dalam SATU panggilan model; frame yang hasil potongannya tidak meyakinkan
+        diinferensi ulang di frame penuh, juga dalam satu panggilan.
+        """
+        results = [None] * len(frames)
+        crop = None
+        if self._box is not None:
+            roi_count = min(len(frames), max(0, self.refresh_every - self._since_search))
+            if roi_count:
+                x1, y1, x2, y2 = crop = self._crop_box(frames[0].shape)
+                crops = [frame[y1:y2, x1:x2] for frame in frames[:roi_count]]
+                for i, result in enumerate(self.runner(crops, infer_size=self.roi_size)):
+                    result = rescale_result(result, frames[i], (1.0, 1.0), (x1, y1))
+                    if self._person_box(result, crop, frames[i].shape) is not None:
+                        results[i] = result
+                    else:
+                        self.fallbacks += 1
+                self.roi_frames += sum(result is not None for result in results)
+
+        search = [i for i, result in enumerate(results) if result is None]
+        if search:
+            for i, result in zip(search, self.runner([frames[i] for i in search])):
+                results[i] = result
+            self.full_frames += len(search)
+            self._since_search = len(frames) - 1 - search[-1]
+        else:
+            self._since_search += len(frames)
+
+        # Potongan batch berikutnya mengikuti posisi atlet di frame terakhir
+        last = len(frames) - 1
+        if last >= 0:
+            last_crop = None if search and search[-1] == last else crop
+            self._box = self._person_box(results[last], last_crop, frames[last].shape)
+        return results
+
+    def _person_box(self, result, crop, shape):
+        """Box atlet (x1, y1, x2, y2) dari hasil; None jika tidak ada orang atau hasil potongan tidak bisa dipercaya."""
+        keypoints = None if result.keypoints is None else result.keypoints.data
+        if keypoints is None or len(keypoints) == 0:
+            return None
+        keypoints = keypoints[0].cpu().numpy()
+        box = result.boxes.data[0].cpu().numpy()[:4] if result.boxes is not None and len(result.boxes.data) else None
+        confident = keypoints[:, 2] >= self.min_confidence
+        if keypoints[:, 2].mean() < self.min_confidence or not confident.any():
+            return None
+
+        points = keypoints[confident, :2]
+        x1, y1 = points.min(axis=0)
+        x2, y2 = points.max(axis=0)
+        if box is not None:
+            x1, y1, x2, y2 = min(x1, box[0]), min(y1, box[1]), max(x2, box[2]), max(y2, box[3])
+
+        if crop is not None and self._touches_edge((x1, y1, x2, y2), crop, shape):
+            return None
+        return (x1, y1, x2, y2)
+
+    def _touches_edge(self, box, crop, shape):
+        """True jika box menempel tepi potongan yang bukan tepi frame."""
+        height, width = shape[:2]
+        cx1, cy1, cx2, cy2 = crop
+        x1, y1, x2, y2 = box
+        m = self.edge_margin
+        return ((cx1 > 0 and x1 <= cx1 + m) or (cy1 > 0 and y1 <= cy1 + m)
+                or (cx2 < width and x2 >= cx2 - m) or (cy2 < height and y2 >= cy2 - m))
+
+    def _crop_box(self, shape):
+        """Potongan (x1, y1, x2, y2) integer: box atlet + padding, minimal `min_size`, dibatasi frame."""
+        height, width = shape[:2]
+        x1, y1, x2, y2 = self._box
+        pad = self.padding * max(x2 - x1, y2 - y1)
+        cx, cy = (x1 + x2) / 2, (y1 + y2) / 2
+        half_w = max((x2 - x1) / 2 + pad, self.min_size / 2)
+        half_h = max((y2 - y1) / 2 + pad, self.min_size / 2)
+        return (
+            int(np.clip(cx - half_w, 0, width - 1)), int(np.clip(cy - half_h, 0, height - 1)),
+            int(np.clip(np.ceil(cx + half_w), 1, width)), int(np.clip(np.ceil(cy + half_h), 1, height)),
+        )
@@ -0,0 +1,108 @@
+import math
+
+import numpy as np
+
+# Pilihan penghalusan untuk PoseAnalyzer (None = sudut mentah per frame)
+SMOOTHING_CHOICES = [None, "ema", "one_euro"]
+
+class EmaFilter:
+    """Exponential moving average per elemen array: y = alpha * x + (1 - alpha) * y_sebelumnya."""
+    __slots__ = ("alpha", "_state")
+
+    def __init__(self, alpha=0.5):
+        self.alpha = alpha
+        self._state = None
+
+    def __call__(self, x, dt=None):
+        x = np.asarray(x, dtype=np.float64)
+        if self._state is None:
+            self._state = x.copy()
+        else:
+            self._state += self.alpha * (x - self._state)
+        return self._state.copy()
+
+    def reset(self):
+        self._state = None
+
+class OneEuroFilter:
+    """
+    Filter One-Euro (Casiez dkk., 2012) per elemen array.
+
+    Saat gerakan lambat, cutoff rendah (`min_cutoff` Hz) meredam jitter; saat gerakan cepat cutoff naik
+    sebesar `beta` x kecepatan sehingga lag tetap kecil. State hanya dua array (nilai & turunan),
+    diperbarui in-place setiap sampel.
+    """
+    __slots__ = ("min_cutoff", "beta", "d_cutoff", "dt", "_x", "_dx")
+
+    def __init__(self, fps=30.0, min_cutoff=1.0, beta=0.05, d_cutoff=1.0):
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self.dt = 1.0 / (fps or 30.0)
+        self._x = None
+        self._dx = None
+
+    def __call__(self, x, dt=None):
+        x = np.asarray(x, dtype=np.float64)
+        dt = dt or self.dt
+        if self._x is None:
+            self._x = x.copy()
+            self._dx = np.zeros_like(x)
+            return self._x.copy()
+
+        dx = (x - self._x) / dt
+        self._dx += _alpha(self.d_cutoff, dt) * (dx - self._dx)
+        cutoff = self.min_cutoff + self.beta * np.abs(self._dx)
+        self._x += _alpha(cutoff, dt) * (x - self._x)
+        return self._x.copy()
+
+    def reset(self):
+        self._x = None
+        self._dx = None
+
+def _alpha(cutoff, dt):
+    tau = 1.0 / (2 * math.pi * cutoff)
+    return 1.0 / (1.0 + tau / dt)
+
+def make_filter(smoothing, fps=30.0):
+    """Membuat filter dari nama di SMOOTHING_CHOICES. None berarti tanpa penghalusan."""
+    if smoothing is None:
+        return None
+    if smoothing == "ema":
+        return EmaFilter()
+    if smoothing == "one_euro":
+        return OneEuroFilter(fps)
+    raise ValueError(f"Penghalusan tidak dikenal: {smoothing}")
+
+class AngleRing:
+    """Ring buffer ukuran tetap untuk `width` sudut per frame (tanpa alokasi per frame)."""
+    __slots__ = ("_buffer", "_count")
+
+    def __init__(self, size=64, width=1):
+        self._buffer = np.zeros((size, width), dtype=np.float64)
+        self._count = 0
+
+    def push(self, values):
+        self._buffer[self._count % len(self._buffer)] = values
+        self._count += 1
+
+    def extend(self, rows):
+        """push() untuk banyak baris sekaligus; hanya `size` baris terakhir yang perlu ditulis."""
+        skipped = max(0, len(rows) - len(self._buffer))
+        self._count += skipped
+        for values in rows[skipped:]:
+            self.push(values)
+
+    def recent(self, n=None):
+        """n baris terakhir (default: semua yang tersimpan), urut dari yang paling lama."""
+        size = len(self._buffer)
+        available = min(self._count, size)
+        n = available if n is None else min(n, available)
+        idx = np.arange(self._count - n, self._count) % size
+        return self._buffer[idx]
+
+    def __len__(self):
+        return min(self._count, len(self._buffer))
+
+    def clear(self):
+        self._count = 0
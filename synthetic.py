@@ -0,0 +1,130 @@
+"""
+Data sintetis untuk benchmark dan pengujian offline (tanpa kamera, tanpa video asli).
+
+Urutan keypoints dibuat dengan sudut siku sinusoidal sehingga jumlah repetisinya bisa diprediksi,
+dan video uji dibuat dengan menggambar figur stik dari urutan tersebut.
+"""
+import cv2
+import numpy as np
+
+from overlay import SKELETON
+from pose_analyzer import (
+    L_ANKLE, L_EAR, L_ELBOW, L_HIP, L_KNEE, L_SHOULDER, L_WRIST, NOSE,
+    R_ANKLE, R_EAR, R_ELBOW, R_HIP, R_KNEE, R_SHOULDER, R_WRIST,
+)
+
+# Ukuran kanvas koordinat urutan sintetis (koordinat diskalakan saat ditulis ke video)
+CANVAS_SIZE = (640, 360)
+
+def elbow_angle_wave(frames, period=40, low=60.0, high=170.0):
+    """Sudut siku (derajat) per frame: mulai dari `high`, turun ke `low` di tengah periode."""
+    t = np.arange(frames)
+    mid, amp = (high + low) / 2, (high - low) / 2
+    return mid + amp * np.cos(2 * np.pi * t / period)
+
+def pushup_sequence(frames=300, period=40, facing="right", noise=0.0, seed=0):
+    """
+    Urutan keypoints (N, 17, 2) push-up tampak samping. Badan lurus, hanya lengan yang menekuk.
+    facing: "right" atau "left" (dicerminkan horizontal).
+    """
+    angle = np.deg2rad(elbow_angle_wave(frames, period))
+    k = np.zeros((frames, 17, 2), dtype=np.float32)
+
+    shoulder = np.array([450.0, 200.0])
+    k[:, R_SHOULDER], k[:, L_SHOULDER] = shoulder, shoulder + [-5, 0]
+    k[:, NOSE] = shoulder + [60, 0]
+    k[:, R_EAR], k[:, L_EAR] = shoulder + [30, -5], shoulder + [25, -5]
+    k[:, R_HIP], k[:, L_HIP] = shoulder + [-200, 0], shoulder + [-205, 0]
+    k[:, R_KNEE], k[:, L_KNEE] = shoulder + [-300, 0], shoulder + [-305, 0]
+    k[:, R_ANKLE], k[:, L_ANKLE] = shoulder + [-400, 0], shoulder + [-405, 0]
+
+    elbow = shoulder + [0, 80]
+    k[:, R_ELBOW], k[:, L_ELBOW] = elbow, elbow
+    wrist = np.stack([elbow[0] + 80 * np.sin(angle), elbow[1] - 80 * np.cos(angle)], axis=-1)
+    k[:, R_WRIST], k[:, L_WRIST] = wrist, wrist
+
+    if facing == "left":
+        k[..., 0] = CANVAS_SIZE[0] - k[..., 0]
+    return _add_noise(k, noise, seed)
+
+def pullup_sequence(frames=300, period=40, noise=0.0, seed=0):
+    """Urutan keypoints (N, 17, 2) pull-up tampak depan. Kedua siku menekuk bersamaan."""
+    angle = np.deg2rad(elbow_angle_wave(frames, period))
+    k = np.zeros((frames, 17, 2), dtype=np.float32)
+
+    # Tampak depan: sisi kiri badan berada di kanan gambar
+    r_shoulder, l_shoulder = np.array([280.0, 150.0]), np.array([360.0, 150.0])
+    k[:, R_SHOULDER], k[:, L_SHOULDER] = r_shoulder, l_shoulder
+    k[:, NOSE] = [320, 110]
+    k[:, R_EAR], k[:, L_EAR] = [305, 105], [335, 105]
+    k[:, R_HIP], k[:, L_HIP] = [295, 270], [345, 270]
+    k[:, R_KNEE], k[:, L_KNEE] = [295, 320], [345, 320]
+    k[:, R_ANKLE], k[:, L_ANKLE] = [295, 355], [345, 355]
+
+    r_elbow, l_elbow = r_shoulder + [-70, 0], l_shoulder + [70, 0]
+    k[:, R_ELBOW], k[:, L_ELBOW] = r_elbow, l_elbow
+    k[:, R_WRIST] = np.stack([r_elbow[0] + 70 * np.cos(angle), r_elbow[1] - 70 * np.sin(angle)], axis=-1)
+    k[:, L_WRIST] = np.stack([l_elbow[0] - 70 * np.cos(angle), l_elbow[1] - 70 * np.sin(angle)], axis=-1)
+    return _add_noise(k, noise, seed)
+
+def squat_sequence(frames=300, period=40, noise=0.0, seed=0):
+    """Urutan keypoints (N, 17, 2) squat tampak samping menghadap kanan. Sudut lutut 170° -> 70° -> 170°."""
+    knee_angle = elbow_angle_wave(frames, period, low=70.0, high=170.0)
+    bend = np.deg2rad(180.0 - knee_angle)  # total tekukan lutut, dibagi rata ke tulang kering & paha
+    k = np.zeros((frames, 17, 2), dtype=np.float32)
+
+    ankle = np.array([320.0, 340.0])
+    knee = np.stack([ankle[0] + 80 * np.sin(bend / 2), ankle[1] - 80 * np.cos(bend / 2)], axis=-1)
+    hip = np.stack([knee[:, 0] - 80 * np.sin(bend / 2), knee[:, 1] - 80 * np.cos(bend / 2)], axis=-1)
+    lean = bend / 3  # badan condong ke depan saat turun
+    shoulder = np.stack([hip[:, 0] + 110 * np.sin(lean), hip[:, 1] - 110 * np.cos(lean)], axis=-1)
+
+    for right, left, points in ((R_ANKLE, L_ANKLE, ankle), (R_KNEE, L_KNEE, knee), (R_HIP, L_HIP, hip),
+                                (R_SHOULDER, L_SHOULDER, shoulder)):
+        k[:, right], k[:, left] = points, points + [-5, 0]
+    k[:, R_EAR], k[:, L_EAR] = shoulder + [10, -30], shoulder + [5, -30]
+    k[:, NOSE] = shoulder + [35, -30]
+    k[:, R_ELBOW], k[:, L_ELBOW] = shoulder + [40, 20], shoulder + [35, 20]
+    k[:, R_WRIST], k[:, L_WRIST] = shoulder + [80, 20], shoulder + [75, 20]
+    return _add_noise(k, noise, seed)
+
+def exercise_sequence(exercise, frames=300, period=40, noise=0.0, seed=0):
+    """Urutan keypoints sintetis untuk jenis latihan di EXERCISE_TYPES."""
+    if exercise == "PushUp":
+        return pushup_sequence(frames, period, noise=noise, seed=seed)
+    if exercise == "PullUp":
+        return pullup_sequence(frames, period, noise=noise, seed=seed)
+    if exercise == "Squat":
+        return squat_sequence(frames, period, noise=noise, seed=seed)
+    raise ValueError(f"Latihan tidak dikenal: {exercise}")
+
+def _add_noise(keypoints, noise, seed):
+    if noise > 0:
+        rng = np.random.default_rng(seed)
+        keypoints = keypoints + rng.normal(0.0, noise, keypoints.shape).astype(np.float32)
+    return keypoints
+
+def render_frame(keypoints, size=(1280, 720)):
+    """Menggambar satu pose (17, 2) sebagai figur stik BGR berukuran `size` (lebar, tinggi)."""
+    width, height = size
+    scale = np.array([width / CANVAS_SIZE[0], height / CANVAS_SIZE[1]], dtype=np.float32)
+    frame = np.full((height, width, 3), 90, dtype=np.uint8)
+    frame[int(height * 0.8):] = 60  # lantai
+    points = np.rint(keypoints * scale).astype(np.int32).tolist()
+    thickness = max(2, width // 80)
+    for a, b in SKELETON:
+        cv2.line(frame, points[a], points[b], (200, 170, 150), thickness, cv2.LINE_AA)
+    cv2.circle(frame, points[NOSE], thickness * 2, (150, 180, 220), -1, cv2.LINE_AA)
+    return frame
+
+def write_video(path, keypoints_seq, size=(1280, 720), fps=30):
+    """Menulis video uji (mp4v) dari urutan keypoints (N, 17, 2). Mengembalikan path."""
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), fps, size)
+    if not writer.isOpened():
+        raise IOError(f"Video uji tidak bisa ditulis: {path}")
+    try:
+        for keypoints in keypoints_seq:
+            writer.write(render_frame(keypoints, size))
+    finally:
+        writer.release()
+    return path
@@ -0,0 +1,98 @@
+"""Inferensi adaptif (cadence.py) dengan runner palsu yang lambat: frame dilewati hanya jauh dari ambang stage."""
+import time
+
+import numpy as np
+import pytest
+
+torch = pytest.importorskip("torch")
+pytest.importorskip("ultralytics")
+from ultralytics.engine.results import Results  # noqa: E402
+
+from cadence import MOTION_SIZE, AdaptiveRunner  # noqa: E402
+from model_utils import BatchStats, person_keypoints  # noqa: E402
+from pose_analyzer import PoseAnalyzer  # noqa: E402
+from synthetic import pushup_sequence  # noqa: E402
+
+# Sudut siku 115 + 55*cos(2*pi*t/40): frame 0 = 170 derajat (jauh dari ambang 145), frame 6 ~ 147 (dekat)
+SEQUENCE = pushup_sequence(120, period=40)
+
+class TableRunner:
+    """Runner palsu: indeks frame dibaca dari dua piksel pertama, keypoints diambil dari tabel."""
+    device = "cpu"
+
+    def __init__(self, table, delay=0.0):
+        self.table = table
+        self.delay = delay
+        self.inferred = []
+        self.stats = BatchStats()
+
+    def __call__(self, frames):
+        time.sleep(self.delay)
+        results = []
+        for frame in frames:
+            index = int(frame[0, 0, 0]) + 256 * int(frame[0, 1, 0])
+            self.inferred.append(index)
+            keypoints = np.concatenate([self.table[index], np.full((17, 1), 0.9, np.float32)], axis=1)
+            x1, y1 = keypoints[:, :2].min(axis=0)
+            x2, y2 = keypoints[:, :2].max(axis=0)
+            results.append(Results(
+                frame, path=None, names={0: "person"},
+                boxes=torch.from_numpy(np.array([[x1, y1, x2, y2, 0.9, 0]], np.float32)),
+                keypoints=torch.from_numpy(keypoints[np.newaxis]),
+            ))
+        self.stats.record(len(frames), self.delay)
+        return results
+
+def _frame(index):
+    # Ukuran frame = ukuran thumbnail gerakan, sehingga dua piksel indeks tidak terbaca sebagai gerakan
+    frame = np.zeros((MOTION_SIZE[1], MOTION_SIZE[0], 3), np.uint8)
+    frame[0, 0], frame[0, 1] = index % 256, index // 256
+    return frame
+
+def _run(table, delay, frames, fps=120.0):
+    inner = TableRunner(table, delay)
+    runner = AdaptiveRunner(inner, PoseAnalyzer("PushUp"), fps=fps, max_stride=4)
+    results = [runner([_frame(i)])[0] for i in range(frames)]
+    return runner, inner, results
+
+def test_fast_runner_infers_every_frame():
+    runner, inner, _ = _run(np.repeat(SEQUENCE[:1], 20, axis=0), 0.0, 20)
+    assert runner.stride == 1 and runner.skipped == 0
+    assert inner.inferred == list(range(20))
+
+def test_slow_runner_skips_far_from_thresholds():
+    table = np.repeat(SEQUENCE[:1], 30, axis=0)
+    runner, inner, results = _run(table, 0.02, 30)
+    assert runner.stride > 1 and runner.skipped > 0
+    assert runner.skip_ratio == pytest.approx(runner.skipped / 30)
+    assert len(inner.inferred) == 30 - runner.skipped
+    for result in results:
+        np.testing.assert_allclose(person_keypoints(result), table[0], atol=1e-3)
+
+def test_near_threshold_infers_every_frame():
+    runner, inner, _ = _run(np.repeat(SEQUENCE[6:7], 30, axis=0), 0.02, 30)
+    assert runner.stride > 1 and runner.skipped == 0
+
+def test_large_motion_forces_inference():
+    inner = TableRunner(np.repeat(SEQUENCE[:1], 30, axis=0), 0.02)
+    runner = AdaptiveRunner(inner, PoseAnalyzer("PushUp"), fps=120.0, max_stride=4)
+    for i in range(20):
+        runner([_frame(i)])
+    assert runner.stride > 1
+    moved = _frame(20)
+    moved[5:] = 255
+    runner([moved])
+    assert inner.inferred[-1] == 20
+
+def test_counts_match_full_inference():
+    def count(delay):
+        runner, _, results = _run(SEQUENCE, delay, len(SEQUENCE))
+        analyzer = PoseAnalyzer("PushUp")
+        for result in results:
+            analyzer.analyze(person_keypoints(result))
+        return analyzer.counter, runner.skipped
+
+    full, _ = count(0.0)
+    adaptive, skipped = count(0.02)
+    assert skipped > 0
+    assert adaptive == full == 3
@@ -0,0 +1,76 @@
+"""Definisi latihan terkompilasi (exercises.py): validasi, registry, pemilihan sisi dan aturan form."""
+import numpy as np
+import pytest
+
+from exercises import (
+    EXERCISE_DEFINITIONS, EXERCISE_TYPES, EXERCISES, derive_exercise, get_exercise, register_exercise,
+)
+
+def test_builtin_exercises_registered_in_order():
+    assert EXERCISE_TYPES[:3] == list(EXERCISE_DEFINITIONS)[:3] == ["PushUp", "PullUp", "Squat"]
+    for name in EXERCISE_DEFINITIONS:
+        assert get_exercise(name).name == name
+
+def test_unknown_exercise_raises():
+    with pytest.raises(ValueError):
+        get_exercise("Burpee")
+    with pytest.raises(ValueError):
+        derive_exercise("Burpee", low=10)
+
+def test_invalid_definitions_rejected():
+    with pytest.raises(ValueError):
+        derive_exercise("PushUp", low=150, high=140)
+    with pytest.raises(ValueError):
+        derive_exercise("PushUp", side="diagonal")
+
+def test_derive_does_not_touch_registry():
+    derived = derive_exercise("PushUp", low=95)
+    assert derived.low == 95.0
+    assert get_exercise("PushUp").low == EXERCISE_DEFINITIONS["PushUp"]["low"]
+
+def test_triplets_cover_both_sides():
+    squat = get_exercise("Squat")
+    count = len(squat.names)
+    assert squat.triplets.shape == (2 * count, 3)
+    # Lutut kanan: HIP, KNEE, ANKLE kanan; lutut kiri di baris `count` berikutnya
+    assert squat.triplets[squat.primary].tolist() == [12, 14, 16]
+    assert squat.triplets[count + squat.primary].tolist() == [11, 13, 15]
+
+@pytest.mark.parametrize("name", ["PushUp", "PullUp", "Squat"])
+def test_side_angles_match_batch(name):
+    exercise = get_exercise(name)
+    rng = np.random.default_rng(0)
+    angles = rng.uniform(0, 180, (50, 2 * len(exercise.names)))
+    is_left = rng.random(50) < 0.5
+    batch = exercise.side_angles_batch(angles, is_left)
+    for i in range(len(angles)):
+        np.testing.assert_array_equal(exercise.side_angles(angles[i], is_left[i]), batch[i])
+
+def test_form_rules_match_batch():
+    pushup = get_exercise("PushUp")
+    body, neck = pushup.names.index("body"), pushup.names.index("neck")
+    values = np.full((3, len(pushup.names)), 170.0)
+    values[1, body] = 120.0  # punggung melengkung
+    values[2, neck] = 100.0  # kepala menunduk
+    np.testing.assert_array_equal(pushup.bad_form_batch(values), [False, True, True])
+    assert pushup.violations(values[0]) == ()
+    assert pushup.violations(values[1]) == ("LURUSKAN PUNGGUNG!",)
+    assert pushup.violations(values[2]) == ("KEPALA LURUS KE DEPAN!",)
+
+def test_register_new_exercise():
+    definition = {
+        "angles": {"elbow": ("SHOULDER", "ELBOW", "WRIST")},
+        "primary": "elbow", "side": "average",
+        "high": 150, "low": 80,
+        "high_stage": "DOWN", "low_stage": "UP",
+    }
+    try:
+        compiled = register_exercise("TestCurl", definition)
+        assert get_exercise("TestCurl") is compiled
+        assert "TestCurl" in EXERCISE_TYPES
+        assert len(compiled.rule_messages) == 0
+    finally:
+        EXERCISES.pop("TestCurl", None)
+        EXERCISE_DEFINITIONS.pop("TestCurl", None)
+        if "TestCurl" in EXERCISE_TYPES:
+            EXERCISE_TYPES.remove("TestCurl")
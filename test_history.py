@@ -0,0 +1,112 @@
+"""Riwayat SQLite (history.py) dan agregat inkremental (analytics.py)."""
+from datetime import date, datetime
+
+import pandas as pd
+import pytest
+
+from analytics import HistoryAnalytics
+from history import COLUMNS, HistoryStore
+
+@pytest.fixture
+def store(tmp_path):
+    store = HistoryStore(str(tmp_path / "history.db"), legacy_csv=None)
+    yield store
+    store.close()
+
+def _add(store, day, exercise, count):
+    store.append(exercise, count, when=datetime.fromisoformat(f"{day} 08:00:00"))
+
+def test_view_is_incremental_newest_first(store):
+    assert store.view().empty
+    _add(store, "2026-10-01", "PushUp", 10)
+    _add(store, "2026-10-02", "Squat", 12)
+    view = store.view()
+    assert list(view.columns) == COLUMNS
+    assert view["Jenis Latihan"].tolist() == ["Squat", "PushUp"]
+    _add(store, "2026-10-03", "PullUp", 5)
+    assert store.view()["Repetisi"].tolist() == [5, 12, 10]
+
+def test_view_result_cannot_corrupt_cache(store):
+    _add(store, "2026-10-01", "PushUp", 10)
+    view = store.view()
+    view.loc[0, "Repetisi"] = 999
+    view["Extra"] = 1
+    fresh = store.view()
+    assert fresh["Repetisi"].tolist() == [10]
+    assert list(fresh.columns) == COLUMNS
+
+def test_query_filters(store):
+    _add(store, "2026-10-01", "PushUp", 10)
+    _add(store, "2026-10-02", "Squat", 12)
+    _add(store, "2026-10-03", "PushUp", 8)
+    assert store.query(exercise="PushUp")["Repetisi"].tolist() == [8, 10]
+    assert store.query(date_from="2026-10-02")["Repetisi"].tolist() == [8, 12]
+    assert store.query(date_from="2026-10-02", date_to="2026-10-02", exercise="Squat")["Repetisi"].tolist() == [12]
+
+def test_analytics_daily_weekly_exercise(store):
+    _add(store, "2026-10-05", "PushUp", 10)
+    _add(store, "2026-10-05", "PushUp", 15)
+    _add(store, "2026-10-06", "Squat", 20)
+    _add(store, "2026-10-13", "PushUp", 5)
+    analytics = store.analytics()
+    assert analytics.daily[("2026-10-05", "PushUp")] == [2, 25]
+    assert analytics.weekly[("2026-W41", "PushUp")] == [2, 25]
+    assert analytics.weekly[("2026-W42", "PushUp")] == [1, 5]
+    assert analytics.exercises["PushUp"] == {"sesi": 3, "repetisi": 30, "terbaik": 15, "tanggal_terbaik": "2026-10-05"}
+    daily = analytics.daily_table()
+    assert daily["Tanggal"].tolist() == ["2026-10-13", "2026-10-06", "2026-10-05"]
+    assert daily.loc[daily["Tanggal"] == "2026-10-05", "PushUp"].item() == 25
+    assert analytics.weekly_table()["Minggu"].tolist() == ["2026-W42", "2026-W41"]
+    assert analytics.streak(today=date(2026, 10, 13)) == (1, 2)
+    assert analytics.streak(today=date(2026, 10, 20)) == (0, 2)
+
+def test_analytics_rebuilt_from_existing_history(tmp_path):
+    path = str(tmp_path / "history.db")
+    first = HistoryStore(path, legacy_csv=None)
+    _add(first, "2026-10-01", "PushUp", 10)
+    _add(first, "2026-10-02", "PushUp", 11)
+    first.close()
+    second = HistoryStore(path, legacy_csv=None)
+    try:
+        assert second.analytics().daily == {("2026-10-01", "PushUp"): [1, 10], ("2026-10-02", "PushUp"): [1, 11]}
+    finally:
+        second.close()
+
+def test_clear_resets_and_keeps_folding(store):
+    _add(store, "2026-10-01", "PushUp", 10)
+    _add(store, "2026-10-02", "PushUp", 11)
+    store.analytics()
+    store.clear()
+    assert store.view().empty
+    assert store.analytics().daily == {}
+    # id AUTOINCREMENT tetap berlanjut setelah clear; sesi baru tetap masuk agregat tepat sekali
+    _add(store, "2026-10-03", "Squat", 7)
+    assert store.analytics().daily == {("2026-10-03", "Squat"): [1, 7]}
+    assert store.view()["Repetisi"].tolist() == [7]
+
+def test_summary_tables_cached_until_new_session():
+    analytics = HistoryAnalytics()
+    analytics.fold("2026-10-01", "PushUp", 10)
+    table = analytics.exercise_table()
+    assert analytics.exercise_table() is table
+    analytics.fold("2026-10-01", "PushUp", 12)
+    assert analytics.exercise_table() is not table
+    assert analytics.exercise_table()["Rekor"].item() == 12
+
+def test_import_legacy_csv(tmp_path):
+    csv_path = tmp_path / "old.csv"
+    pd.DataFrame([
+        {"Tanggal": "2026-09-02", "Waktu": "10:00:00", "Jenis Latihan": "Squat", "Repetisi": 8, "Status": "Selesai"},
+        {"Tanggal": "2026-09-01", "Waktu": "09:00:00", "Jenis Latihan": "PushUp", "Repetisi": 6, "Status": "Selesai"},
+    ]).to_csv(csv_path, index=False)
+    store = HistoryStore(str(tmp_path / "history.db"), legacy_csv=str(csv_path))
+    try:
+        assert store.view()["Jenis Latihan"].tolist() == ["Squat", "PushUp"]
+    finally:
+        store.close()
+    # Impor hanya sekali
+    again = HistoryStore(str(tmp_path / "history.db"), legacy_csv=str(csv_path))
+    try:
+        assert len(again.view()) == 2
+    finally:
+        again.close()
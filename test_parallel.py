@@ -0,0 +1,107 @@
+"""Pemecahan video per segmen dan penyambungan hasilnya (parallel.py), tanpa model: runner palsu membaca indeks frame."""
+import cv2
+import numpy as np
+import pytest
+
+import parallel
+from model_utils import BatchStats
+from synthetic import pushup_sequence
+
+FRAMES = 300
+# Keypoints "terdeteksi" per frame; frame 100-129 tanpa orang
+KEYPOINTS = pushup_sequence(FRAMES, period=40, noise=1.0)
+KEYPOINTS[100:130] = 0
+
+class _Array:
+    def __init__(self, data):
+        self.data = self
+        self._data = data
+
+    def cpu(self):
+        return self
+
+    def numpy(self):
+        return self._data
+
+class _Result:
+    def __init__(self, keypoints):
+        self.keypoints = _Array(keypoints)
+
+class IndexRunner:
+    """Runner palsu: indeks frame dibaca dari warna frame, keypoints diambil dari KEYPOINTS."""
+    device = "cpu"
+
+    def __init__(self):
+        self.stats = BatchStats()
+
+    def __call__(self, frames):
+        results = []
+        for frame in frames:
+            index = int(round(frame[:, :16].mean() / 16)) + 15 * int(round(frame[:, 16:].mean() / 12))
+            if KEYPOINTS[index].any():
+                people = np.concatenate([KEYPOINTS[index], np.ones((17, 1), np.float32)], axis=1)[np.newaxis]
+            else:
+                people = np.zeros((0, 17, 3), np.float32)
+            results.append(_Result(people))
+        self.stats.record(len(frames), 0.001)
+        return results
+
+@pytest.fixture(scope="module")
+def video(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("parallel") / "index.avi")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 30, (32, 16))
+    for i in range(FRAMES):
+        frame = np.zeros((16, 32, 3), np.uint8)
+        frame[:, :16] = (i % 15) * 16
+        frame[:, 16:] = (i // 15) * 12
+        writer.write(frame)
+    writer.release()
+    return path
+
+@pytest.fixture(scope="module")
+def segments(video):
+    ranges, _ = parallel.plan_segments(video, 100)
+    return [parallel.extract_segment(IndexRunner(), video, start, end, 8, 4) for start, end in ranges]
+
+def test_plan_segments(video):
+    ranges, fps = parallel.plan_segments(video, 100)
+    assert ranges == [(0, 100), (100, 200), (200, None)]
+    assert fps == pytest.approx(30.0)
+    assert parallel.plan_segments(video, 0)[0] == [(0, None)]
+
+def test_stitch_reproduces_sequential_read(segments):
+    keypoints, detected, uncertain = parallel.stitch_segments(segments, 8)
+    assert uncertain == []
+    assert len(keypoints) == FRAMES
+    np.testing.assert_array_equal(detected, KEYPOINTS.any(axis=(1, 2)))
+    np.testing.assert_allclose(keypoints[detected, :, :2], KEYPOINTS[detected], atol=1e-4)
+
+@pytest.mark.parametrize("error", [-6, -2, 3, 8])
+def test_seek_error_within_overlap_is_corrected(segments, error):
+    reference = parallel.stitch_segments(segments, 8)[0]
+    shifted = dict(segments[2], seek=segments[2]["seek"] - error)
+    keypoints, _, uncertain = parallel.stitch_segments([segments[0], segments[1], shifted], 8)
+    assert uncertain == []
+    np.testing.assert_array_equal(keypoints, reference)
+
+def test_seek_error_beyond_overlap_is_uncertain(segments):
+    shifted = dict(segments[2], seek=segments[2]["seek"] - 12)
+    assert parallel.stitch_segments([segments[0], segments[1], shifted], 8)[2] == [2]
+
+def test_overlap_without_person_is_uncertain(segments):
+    # Segmen kedua dimulai di frame 92; tanpa deteksi di area tumpang tindih posisi tidak bisa dicocokkan
+    blind = dict(segments[1], detected=segments[1]["detected"].copy())
+    blind["detected"][:16] = False
+    assert parallel.stitch_segments([segments[0], blind, segments[2]], 8)[2] == [1]
+
+def test_exact_segments_are_trusted(video, segments):
+    ranges, _ = parallel.plan_segments(video, 100)
+    exact = [parallel.extract_segment(IndexRunner(), video, start, end, 8, 4, exact=True) for start, end in ranges]
+    assert all(segment["exact"] for segment in exact)
+    keypoints, _, uncertain = parallel.stitch_segments(exact, 8)
+    assert uncertain == []
+    np.testing.assert_array_equal(keypoints, parallel.stitch_segments(segments, 8)[0])
+
+def test_worker_threads_split_cores():
+    assert parallel.worker_threads(1) >= 1
+    assert parallel.worker_threads(10 ** 6) == 1
@@ -0,0 +1,93 @@
+"""
+count_batch (state machine vektor) harus menghasilkan counter & stage yang sama persis dengan analyze_batch
+(state machine per frame) untuk semua kombinasi hysteresis, min_dwell dan smoothing.
+
+Jalankan: python -m pytest -q
+"""
+import numpy as np
+import pytest
+
+from pose_analyzer import ANALYZER_DEFAULTS, EXERCISE_TYPES, PoseAnalyzer, calculate_angle
+from synthetic import exercise_sequence
+
+SETTINGS = [
+    # (smoothing, hysteresis, min_dwell)
+    (None, 0.0, 1),
+    (None, 5.0, 1),
+    (None, 0.0, 3),
+    (None, 8.0, 4),
+    ("ema", 0.0, 1),
+    ("ema", 5.0, 3),
+    ("one_euro", 0.0, 1),
+    ("one_euro", 8.0, 4),
+]
+
+def _trace(exercise, noise, seed):
+    # Noise besar membuat sudut bergetar di sekitar ambang (menguji hysteresis & min_dwell);
+    # periode pendek menguji repetisi yang nyaris tidak lolos debounce
+    sequence = exercise_sequence(exercise, frames=400, period=24, noise=noise, seed=seed)
+    return np.concatenate([sequence, exercise_sequence(exercise, frames=200, period=60, noise=noise, seed=seed + 1)])
+
+@pytest.mark.parametrize("exercise", EXERCISE_TYPES)
+@pytest.mark.parametrize("smoothing, hysteresis, min_dwell", SETTINGS)
+@pytest.mark.parametrize("noise, seed", [(0.0, 0), (3.0, 1), (8.0, 2)])
+def test_count_batch_matches_analyze_batch(exercise, smoothing, hysteresis, min_dwell, noise, seed):
+    sequence = _trace(exercise, noise, seed)
+    options = {"smoothing": smoothing, "hysteresis": hysteresis, "min_dwell": min_dwell}
+
+    reference = PoseAnalyzer(exercise, **options)
+    results = reference.analyze_batch(sequence)
+    fast = PoseAnalyzer(exercise, **options)
+    fast.count_batch(sequence)
+
+    assert fast.counter == reference.counter == results[-1]["count"]
+    assert fast.stage == reference.stage
+    if noise == 0.0 and hysteresis == 0.0 and min_dwell == 1:
+        assert reference.counter > 0
+
+@pytest.mark.parametrize("exercise", EXERCISE_TYPES)
+@pytest.mark.parametrize("smoothing, hysteresis, min_dwell", SETTINGS)
+def test_count_batch_chunked_matches_analyze_batch(exercise, smoothing, hysteresis, min_dwell):
+    # State debounce & filter harus tersambung antar panggilan count_batch (mis. replay per potongan)
+    sequence = _trace(exercise, 3.0, 7)
+    options = {"smoothing": smoothing, "hysteresis": hysteresis, "min_dwell": min_dwell}
+
+    reference = PoseAnalyzer(exercise, **options)
+    fast = PoseAnalyzer(exercise, **options)
+    for start, end in [(0, 1), (1, 50), (50, 53), (53, 311), (311, len(sequence))]:
+        reference.analyze_batch(sequence[start:end])
+        fast.count_batch(sequence[start:end])
+        assert (fast.counter, fast.stage) == (reference.counter, reference.stage)
+
+@pytest.mark.parametrize("exercise", EXERCISE_TYPES)
+@pytest.mark.parametrize("period", [15, 20, 40])
+@pytest.mark.parametrize("noise", [0.0, 3.0, 8.0])
+def test_default_settings_count_every_rep(exercise, period, noise):
+    # Pengaturan bawaan aplikasi harus menghitung semua repetisi sintetis (600 frame = 600 // period reps)
+    analyzer = PoseAnalyzer(exercise, **ANALYZER_DEFAULTS)
+    analyzer.analyze_batch(exercise_sequence(exercise, frames=600, period=period, noise=noise, seed=1))
+    assert analyzer.counter == 600 // period
+
+@pytest.mark.parametrize("exercise", EXERCISE_TYPES)
+@pytest.mark.parametrize("noise", [0.0, 3.0])
+def test_analyze_matches_analyze_batch_and_calculate_angle(exercise, noise):
+    # Jalur skalar analyze() harus identik bit per bit dengan analyze_batch() dan calculate_angle(),
+    # agar perbandingan dengan ambang tidak pernah berbeda di antara kedua jalur
+    sequence = exercise_sequence(exercise, frames=200, period=24, noise=noise, seed=3)
+    rng = np.random.default_rng(4)
+    sequence = np.concatenate([sequence, rng.uniform(0, 640, (200, 17, 2)).astype(np.float32)])
+    streaming = PoseAnalyzer(exercise)
+    batch = PoseAnalyzer(exercise).analyze_batch(sequence)
+    exercise_def = streaming.exercise
+    count = len(exercise_def.names)
+
+    for keypoints, expected in zip(sequence, batch):
+        result = streaming.analyze(keypoints)
+        assert result == expected
+
+        right, left = exercise_def.triplets[[exercise_def.primary, count + exercise_def.primary]]
+        if exercise_def.side == "average":
+            angle = (calculate_angle(*keypoints[left]) + calculate_angle(*keypoints[right])) / 2
+        else:
+            angle = calculate_angle(*keypoints[left if result["side"] == "Kiri" else right])
+        assert result["angle"] == angle
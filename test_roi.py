@@ -0,0 +1,90 @@
+"""Inferensi ROI (roi.py) dengan runner palsu: orang = persegi terang di frame hitam."""
+import numpy as np
+import pytest
+
+torch = pytest.importorskip("torch")
+pytest.importorskip("ultralytics")
+from ultralytics.engine.results import Results  # noqa: E402
+
+from model_utils import BatchStats, person_keypoints  # noqa: E402
+from roi import RoiRunner  # noqa: E402
+
+HEIGHT, WIDTH = 360, 640
+
+class BrightRunner:
+    """Runner palsu: box = area piksel terang, 17 keypoints di diagonal box. Mencatat ukuran setiap input."""
+    device = "cpu"
+
+    def __init__(self):
+        self.stats = BatchStats()
+        self.calls = []
+
+    def __call__(self, frames, infer_size=None):
+        self.calls.append((len(frames), frames[0].shape[:2], infer_size))
+        results = []
+        for frame in frames:
+            ys, xs = np.nonzero(frame[..., 0] > 128)
+            if len(xs) == 0:
+                results.append(Results(frame, path=None, names={0: "person"}))
+                continue
+            x1, y1, x2, y2 = xs.min(), ys.min(), xs.max() + 1, ys.max() + 1
+            t = np.linspace(0.0, 1.0, 17)
+            keypoints = np.stack([x1 + (x2 - x1) * t, y1 + (y2 - y1) * t, np.full(17, 0.9)], axis=-1)
+            box = np.array([[x1, y1, x2, y2, 0.9, 0]], np.float32)
+            results.append(Results(
+                frame, path=None, names={0: "person"},
+                boxes=torch.from_numpy(box), keypoints=torch.from_numpy(keypoints[np.newaxis].astype(np.float32)),
+            ))
+        self.stats.record(len(frames), 0.001)
+        return results
+
+def _frame(x, y=120, size=(60, 120)):
+    frame = np.zeros((HEIGHT, WIDTH, 3), np.uint8)
+    if x is not None:
+        frame[y:y + size[1], x:x + size[0]] = 255
+    return frame
+
+def _keypoints(result):
+    return result.keypoints.data[0].cpu().numpy()
+
+def test_follows_person_with_crops():
+    inner = BrightRunner()
+    runner = RoiRunner(inner, roi_size=320)
+    for i in range(10):
+        frame = _frame(200 + 3 * i)
+        result = runner([frame])[0]
+        np.testing.assert_allclose(_keypoints(result), _keypoints(BrightRunner()([frame])[0]), atol=1e-3)
+    # Pencarian pertama di frame penuh, sisanya potongan kecil dengan ukuran inferensi ROI
+    assert inner.calls[0] == (1, (HEIGHT, WIDTH), None)
+    for count, shape, infer_size in inner.calls[1:]:
+        assert infer_size == 320 and shape[0] < HEIGHT and shape[1] < WIDTH
+    assert (runner.roi_frames, runner.full_frames, runner.fallbacks) == (9, 1, 0)
+    assert runner.roi_ratio == pytest.approx(0.9)
+
+def test_batch_crops_in_one_call():
+    inner = BrightRunner()
+    runner = RoiRunner(inner)
+    runner([_frame(200)])
+    results = runner([_frame(200 + i) for i in range(8)])
+    assert [call[0] for call in inner.calls] == [1, 8]
+    assert _keypoints(results[-1])[0, 0] == pytest.approx(207)
+
+def test_falls_back_to_full_frame():
+    inner = BrightRunner()
+    runner = RoiRunner(inner)
+    runner([_frame(100)])
+    # Atlet berpindah jauh: potongan kosong, frame dicari ulang di frame penuh
+    result = runner([_frame(500)])[0]
+    assert runner.fallbacks == 1 and runner.full_frames == 2
+    assert _keypoints(result)[0, 0] == pytest.approx(500)
+    # Tidak ada orang: tetap dicari di frame penuh dan tracking dilepas
+    assert person_keypoints(runner([_frame(None)])[0]) is None
+    runner([_frame(None)])
+    assert inner.calls[-1][2] is None
+
+def test_refresh_searches_full_frame_periodically():
+    inner = BrightRunner()
+    runner = RoiRunner(inner, refresh_every=5)
+    for _ in range(20):
+        runner([_frame(200)])
+    assert runner.full_frames == 4 and runner.fallbacks == 0
@@ -0,0 +1,72 @@
+"""Filter sudut (EMA, One-Euro) dan ring buffer riwayat sudut (smoothing.py)."""
+import numpy as np
+import pytest
+
+from smoothing import AngleRing, EmaFilter, OneEuroFilter, make_filter
+
+def test_make_filter():
+    assert make_filter(None) is None
+    assert isinstance(make_filter("ema"), EmaFilter)
+    assert isinstance(make_filter("one_euro", fps=60), OneEuroFilter)
+    with pytest.raises(ValueError):
+        make_filter("kalman")
+
+@pytest.mark.parametrize("smoothing", ["ema", "one_euro"])
+def test_constant_signal_passes_through(smoothing):
+    f = make_filter(smoothing)
+    for _ in range(20):
+        out = f(np.array([90.0, 170.0]))
+    np.testing.assert_allclose(out, [90.0, 170.0])
+
+@pytest.mark.parametrize("smoothing", ["ema", "one_euro"])
+def test_jitter_is_reduced(smoothing):
+    rng = np.random.default_rng(0)
+    raw = 120.0 + rng.normal(0.0, 3.0, 300)
+    f = make_filter(smoothing)
+    smoothed = np.array([f(np.array([x]))[0] for x in raw])
+    assert smoothed[50:].std() < raw[50:].std() * 0.8
+
+def test_one_euro_follows_fast_motion():
+    # Gerakan cepat (turunan besar) menaikkan cutoff sehingga lag tetap kecil
+    t = np.arange(60)
+    signal = 160.0 - 90.0 * (t / 59.0)
+    f = OneEuroFilter(fps=30.0)
+    out = np.array([f(np.array([x]))[0] for x in signal])
+    assert abs(out[-1] - signal[-1]) < 15.0
+
+@pytest.mark.parametrize("smoothing", ["ema", "one_euro"])
+def test_reset_forgets_state(smoothing):
+    f = make_filter(smoothing)
+    f(np.array([10.0]))
+    f(np.array([20.0]))
+    f.reset()
+    np.testing.assert_array_equal(f(np.array([170.0])), [170.0])
+
+def test_filter_returns_copy():
+    f = EmaFilter()
+    out = f(np.array([1.0]))
+    out[0] = 99.0
+    assert f(np.array([1.0]))[0] == 1.0
+
+def test_angle_ring_wraps_in_order():
+    ring = AngleRing(size=4, width=2)
+    assert len(ring) == 0
+    for i in range(6):
+        ring.push([i, -i])
+    assert len(ring) == 4
+    np.testing.assert_array_equal(ring.recent()[:, 0], [2, 3, 4, 5])
+    np.testing.assert_array_equal(ring.recent(2)[:, 1], [-4, -5])
+    ring.clear()
+    assert len(ring) == 0
+
+@pytest.mark.parametrize("count", [0, 3, 4, 5, 13])
+def test_angle_ring_extend_matches_push(count):
+    rows = np.arange(count * 2, dtype=np.float64).reshape(count, 2)
+    pushed, extended = AngleRing(size=4, width=2), AngleRing(size=4, width=2)
+    for ring in (pushed, extended):
+        ring.push([-1.0, -1.0])
+    for row in rows:
+        pushed.push(row)
+    extended.extend(rows)
+    assert len(extended) == len(pushed)
+    np.testing.assert_array_equal(extended.recent(), pushed.recent())
@@ -0,0 +1,74 @@
+"""Cache video upload (uploads.py): deduplikasi isi, eviksi LRU dan pembersihan file .part."""
+import io
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+from uploads import UploadCache
+
+class _Uploaded(io.BytesIO):
+    """Mirip UploadedFile Streamlit: punya getbuffer()."""
+
+def _files(directory):
+    return sorted(os.listdir(directory))
+
+@pytest.mark.parametrize("source_type", [io.BytesIO, _Uploaded])
+def test_ingest_deduplicates_by_content(tmp_path, source_type):
+    cache = UploadCache(str(tmp_path))
+    path, new = cache.ingest(source_type(b"video-a"), "latihan.MP4")
+    assert new and path.endswith(".mp4")
+    with open(path, "rb") as f:
+        assert f.read() == b"video-a"
+    again, new_again = cache.ingest(source_type(b"video-a"), "nama_lain.mp4")
+    assert again == path and not new_again
+    other, _ = cache.ingest(source_type(b"video-b"), "b.mp4")
+    assert other != path
+    assert not any(name.endswith(".part") for name in _files(tmp_path))
+
+def test_eviction_keeps_newest_within_limit(tmp_path):
+    cache = UploadCache(str(tmp_path), max_bytes=25)
+    first, _ = cache.ingest(io.BytesIO(b"a" * 10), "1.mp4")
+    os.utime(first, (time.time() - 100,) * 2)
+    second, _ = cache.ingest(io.BytesIO(b"b" * 10), "2.mp4")
+    os.utime(second, (time.time() - 50,) * 2)
+    third, _ = cache.ingest(io.BytesIO(b"c" * 10), "3.mp4")
+    assert not os.path.exists(first)
+    assert os.path.exists(second) and os.path.exists(third)
+
+def test_only_stale_parts_removed_on_start(tmp_path):
+    alive = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)"])
+    dead = subprocess.Popen([sys.executable, "-c", "pass"])
+    dead.wait()
+    try:
+        names = {
+            "alive": f"{alive.pid}_1.part",
+            "own": f"{os.getpid()}_2.part",
+            "unknown": "tanpa_pid.part",
+            "old": f"{alive.pid}_3.part",
+            "dead": f"{dead.pid}_1.part",
+        }
+        for name in names.values():
+            (tmp_path / name).write_bytes(b"x")
+        old = str(tmp_path / names["old"])
+        os.utime(old, (time.time() - 7200,) * 2)
+
+        UploadCache(str(tmp_path))
+        remaining = set(_files(tmp_path))
+        assert {names["alive"], names["own"], names["unknown"]} <= remaining
+        assert names["old"] not in remaining
+        if os.name != "nt":
+            assert names["dead"] not in remaining
+    finally:
+        alive.kill()
+        alive.wait()
+
+def test_clear_keeps_parts_in_progress(tmp_path):
+    cache = UploadCache(str(tmp_path))
+    cache.ingest(io.BytesIO(b"video"), "a.mp4")
+    part = tmp_path / f"{os.getpid()}_9.part"
+    part.write_bytes(b"x")
+    cache.clear()
+    assert _files(tmp_path) == [part.name]
@@ -0,0 +1,118 @@
+"""
+Rekaman keypoints per frame (trace) untuk replay tanpa inferensi ulang.
+
+Satu trace = satu direktori:
+    keypoints.npy  (N, 17, 3) float32 x, y, conf orang pertama (baris nol = tidak terdeteksi)
+    times.npy      (N,) float64 detik sejak awal rekaman
+    meta.json      jenis latihan, fps, jumlah frame, sumber, waktu rekam
+
+Selama merekam, data ditulis append ke file mentah (.part) sehingga memori tidak bertambah dan
+rekaman tetap utuh sampai frame terakhir; close() mengubahnya menjadi .npy. load_trace() membuka
+.npy sebagai memory-map, jadi sesi 30 menit (~11 MB) bisa di-replay tanpa membaca ulang video.
+"""
+import json
+import os
+import shutil
+import time
+from datetime import datetime
+
+import numpy as np
+
+from exercises import derive_exercise
+from pose_analyzer import PoseAnalyzer
+
+TRACE_DIR = "traces"
+KEYPOINT_SHAPE = (17, 3)
+
+class TraceRecorder:
+    """Perekam trace streaming. append() dipanggil sekali per frame yang dianalisis (aman dari satu thread)."""
+    def __init__(self, exercise, fps=None, source="", directory=TRACE_DIR):
+        stamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        self.path = os.path.join(directory, f"{stamp}_{exercise}")
+        os.makedirs(self.path, exist_ok=True)
+        self.exercise = exercise
+        self.fps = fps
+        self.source = source
+        self.frames = 0
+
+        self._start = time.perf_counter()
+        self._empty = np.zeros(KEYPOINT_SHAPE, dtype=np.float32)
+        self._keypoints_file = open(os.path.join(self.path, "keypoints.part"), "wb")
+        self._times_file = open(os.path.join(self.path, "times.part"), "wb")
+
+    def append(self, keypoints, t=None):
+        """keypoints: (17, 3) x, y, conf (atau (17, 2), conf dianggap 1), None jika tidak ada orang."""
+        if keypoints is None:
+            keypoints = self._empty
+        elif keypoints.shape[-1] == 2:
+            keypoints = np.concatenate([keypoints, np.ones((17, 1), dtype=np.float32)], axis=-1)
+        self._keypoints_file.write(np.ascontiguousarray(keypoints, dtype=np.float32).tobytes())
+        elapsed = time.perf_counter() - self._start if t is None else t
+        self._times_file.write(np.float64(elapsed).tobytes())
+        self.frames += 1
+
+    def close(self):
+        """Menyelesaikan rekaman menjadi .npy + meta.json. Mengembalikan path direktori trace."""
+        self._keypoints_file.close()
+        self._times_file.close()
+        keypoints_part = os.path.join(self.path, "keypoints.part")
+        times_part = os.path.join(self.path, "times.part")
+        np.save(os.path.join(self.path, "keypoints.npy"),
+                np.fromfile(keypoints_part, dtype=np.float32).reshape((-1,) + KEYPOINT_SHAPE))
+        np.save(os.path.join(self.path, "times.npy"), np.fromfile(times_part, dtype=np.float64))
+        os.remove(keypoints_part)
+        os.remove(times_part)
+
+        meta = {
+            "exercise": self.exercise,
+            "fps": self.fps,
+            "frames": self.frames,
+            "source": self.source,
+            "created": datetime.now().isoformat(timespec="seconds"),
+        }
+        with open(os.path.join(self.path, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump(meta, f, indent=2)
+        return self.path
+
+    def discard(self):
+        """Membatalkan rekaman dan menghapus direktorinya."""
+        self._keypoints_file.close()
+        self._times_file.close()
+        shutil.rmtree(self.path, ignore_errors=True)
+
+def load_trace(path):
+    """Membuka trace. Mengembalikan tuple: (keypoints memmap (N, 17, 3), times (N,), meta dict)."""
+    with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+        meta = json.load(f)
+    keypoints = np.load(os.path.join(path, "keypoints.npy"), mmap_mode="r")
+    times = np.load(os.path.join(path, "times.npy"), mmap_mode="r")
+    return keypoints, times, meta
+
+def detected_keypoints(keypoints):
+    """Keypoints (M, 17, 2) dari frame yang ada orangnya, urutan frame tetap (sama seperti saat live)."""
+    detected = keypoints[..., 2].any(axis=-1)
+    return np.asarray(keypoints[detected, :, :2])
+
+def replay_trace(path, exercise=None, overrides=None, **analyzer_options):
+    """
+    Menghitung ulang repetisi dari trace tanpa inferensi.
+    exercise: nama latihan (default: latihan saat rekam). overrides: field definisi latihan yang diganti,
+    mis. {"low": 95}. analyzer_options: smoothing, hysteresis, min_dwell (diteruskan ke PoseAnalyzer).
+    Mengembalikan dict: repetisi, frame, frame terdeteksi, waktu proses (ms).
+    """
+    start = time.perf_counter()
+    keypoints, _, meta = load_trace(path)
+    exercise = exercise or meta["exercise"]
+    definition = derive_exercise(exercise, **overrides) if overrides else exercise
+
+    poses = detected_keypoints(keypoints)
+    analyzer = PoseAnalyzer(definition, fps=meta.get("fps") or 30.0, **analyzer_options)
+    analyzer.count_batch(poses)
+    return {
+        "Trace": path,
+        "Jenis Latihan": exercise,
+        "Repetisi": analyzer.counter,
+        "Frame": len(keypoints),
+        "Frame Terdeteksi": len(poses),
+        "Durasi Replay (ms)": round((time.perf_counter() - start) * 1000, 2),
+    }
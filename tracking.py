@@ -0,0 +1,99 @@
+import numpy as np
+
+from exercises import get_exercise
+from pose_analyzer import PoseAnalyzer, frame_angles
+
+def box_iou(a, b):
+    """IoU antar semua pasangan box. a: (N, 4), b: (M, 4) format x1, y1, x2, y2. Mengembalikan (N, M)."""
+    a = np.asarray(a, dtype=np.float32)[:, np.newaxis, :]
+    b = np.asarray(b, dtype=np.float32)[np.newaxis, :, :]
+    inter_w = np.clip(np.minimum(a[..., 2], b[..., 2]) - np.maximum(a[..., 0], b[..., 0]), 0, None)
+    inter_h = np.clip(np.minimum(a[..., 3], b[..., 3]) - np.maximum(a[..., 1], b[..., 1]), 0, None)
+    inter = inter_w * inter_h
+    area_a = (a[..., 2] - a[..., 0]) * (a[..., 3] - a[..., 1])
+    area_b = (b[..., 2] - b[..., 0]) * (b[..., 3] - b[..., 1])
+    return inter / np.maximum(area_a + area_b - inter, 1e-6)
+
+class MultiPersonTracker:
+    """
+    Pelacakan banyak orang dengan ID stabil dan satu PoseAnalyzer per ID (per atlet).
+
+    ID dicocokkan secara greedy berdasarkan IoU box antar frame. Sudut semua orang dalam satu frame
+    dihitung dalam satu panggilan frame_angles, lalu state machine tiap atlet dijalankan terpisah.
+    Track yang hilang lebih dari `max_missing` frame dilepas, tetapi analyzer-nya tetap disimpan
+    agar repetisinya masih bisa disimpan ke riwayat.
+    analyzer_options diteruskan ke setiap PoseAnalyzer (mis. smoothing, hysteresis, min_dwell).
+    """
+    def __init__(self, exercise_type, iou_threshold=0.3, max_missing=60, analyzer_options=None):
+        self.exercise_type = exercise_type
+        self.analyzer_options = analyzer_options or {}
+        self.iou_threshold = iou_threshold
+        self.max_missing = max_missing
+        self.analyzers = {}
+
+        self._boxes = np.zeros((0, 4), dtype=np.float32)
+        self._ids = np.zeros(0, dtype=np.int64)
+        self._missing = np.zeros(0, dtype=np.int64)
+        self._next_id = 1
+
+    def update(self, keypoints, boxes):
+        """
+        keypoints: (P, 17, 2), boxes: (P, 4) untuk semua orang di satu frame.
+        Mengembalikan dict {track_id: hasil analisis} untuk orang yang terlihat di frame ini.
+        """
+        keypoints = np.asarray(keypoints)
+        ids = self.assign(boxes)
+        if len(ids) == 0:
+            return {}
+
+        triplets = get_exercise(self.exercise_type).triplets
+        angles, is_left, facing_right, facing_left = frame_angles(keypoints, triplets)
+        results = {}
+        for i, track_id in enumerate(ids.tolist()):
+            analyzer = self.analyzers.get(track_id)
+            if analyzer is None:
+                analyzer = self.analyzers[track_id] = PoseAnalyzer(self.exercise_type, **self.analyzer_options)
+            results[track_id] = analyzer.update_from_angles(angles[i], is_left[i], facing_right[i], facing_left[i])
+        return results
+
+    def assign(self, boxes):
+        """Mengembalikan ID track (P,) untuk setiap box, membuat ID baru bila tidak ada yang cocok."""
+        boxes = np.asarray(boxes, dtype=np.float32).reshape(-1, 4)
+        ids = np.zeros(len(boxes), dtype=np.int64)
+        matched_tracks = np.zeros(len(self._ids), dtype=bool)
+
+        if len(boxes) and len(self._ids):
+            iou = box_iou(boxes, self._boxes)
+            # Greedy: pasangan dengan IoU tertinggi dicocokkan lebih dulu
+            for flat in np.argsort(iou, axis=None)[::-1]:
+                det, track = divmod(int(flat), iou.shape[1])
+                if iou[det, track] < self.iou_threshold:
+                    break
+                if ids[det] or matched_tracks[track]:
+                    continue
+                ids[det] = self._ids[track]
+                matched_tracks[track] = True
+                self._boxes[track] = boxes[det]
+
+        # Track lama yang tidak cocok bertambah hitungan hilangnya, lalu dilepas jika terlalu lama
+        self._missing[matched_tracks] = 0
+        self._missing[~matched_tracks] += 1
+        keep = self._missing <= self.max_missing
+        self._boxes, self._ids, self._missing = self._boxes[keep], self._ids[keep], self._missing[keep]
+
+        new = ids == 0
+        if new.any():
+            new_ids = np.arange(self._next_id, self._next_id + new.sum())
+            self._next_id += len(new_ids)
+            ids[new] = new_ids
+            self._boxes = np.concatenate([self._boxes, boxes[new]])
+            self._ids = np.concatenate([self._ids, new_ids])
+            self._missing = np.concatenate([self._missing, np.zeros(len(new_ids), dtype=np.int64)])
+        return ids
+
+    def sessions(self):
+        """Daftar (track_id, analyzer) yang punya repetisi, untuk disimpan ke riwayat."""
+        return [(track_id, analyzer) for track_id, analyzer in sorted(self.analyzers.items()) if analyzer.counter > 0]
+
+    def reset(self):
+        self.__init__(self.exercise_type, self.iou_threshold, self.max_missing, self.analyzer_options)
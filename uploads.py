@@ -0,0 +1,151 @@
+"""
+Penyimpanan video upload di disk: disalin per chunk, dideduplikasi berdasarkan hash isi, dan dibersihkan otomatis.
+
+File disimpan sebagai <UPLOAD_DIR>/<sha256>.<ext>. Upload ulang file yang sama (isi identik) tidak
+disalin lagi, cukup dipakai ulang. Total ukuran cache dibatasi `max_bytes`; file yang paling lama tidak
+dipakai dihapus lebih dulu. Sisa salinan yang terputus (.part) dihapus saat cache dibuat, tetapi hanya
+yang sudah basi: prosesnya tidak berjalan lagi atau sudah lebih lama dari STALE_PART_SECONDS, sehingga
+salinan yang masih ditulis proses lain (mis. beberapa worker server) tidak ikut terhapus.
+"""
+import hashlib
+import os
+import threading
+import time
+
+UPLOAD_DIR = "upload_cache"
+CHUNK_SIZE = 4 * 1024 * 1024
+MAX_CACHE_BYTES = 4 * 1024 ** 3
+STALE_PART_SECONDS = 3600
+
+class UploadCache:
+    """Cache file upload (aman dipakai bersama beberapa sesi Streamlit dalam satu proses)."""
+    def __init__(self, directory=UPLOAD_DIR, max_bytes=MAX_CACHE_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self.remove_stale_parts()
+
+    def remove_stale_parts(self, max_age=STALE_PART_SECONDS):
+        """Menghapus file .part ({pid}_{thread}.part) milik proses yang sudah berhenti atau yang lebih tua dari max_age detik."""
+        now = time.time()
+        for name in os.listdir(self.directory):
+            if not name.endswith(".part"):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stale = now - os.path.getmtime(path) > max_age or not _process_alive(name.split("_", 1)[0])
+                if stale:
+                    os.remove(path)
+            except OSError:
+                continue  # Sudah dihapus/di-rename pemiliknya, atau masih dibuka di Windows
+
+    def ingest(self, source, name=""):
+        """
+        Menyimpan isi `source` ke cache dan mengembalikan tuple: (path, baru_disalin).
+        source: objek file (mis. UploadedFile Streamlit). Jika punya getbuffer(), isinya dibaca lewat
+        memoryview tanpa salinan sehingga hash dihitung lebih dulu dan file yang sudah ada tidak disalin.
+        """
+        ext = os.path.splitext(name)[1].lower()
+        if hasattr(source, "getbuffer"):
+            with source.getbuffer() as buffer:
+                chunks = [buffer[offset:offset + CHUNK_SIZE] for offset in range(0, len(buffer), CHUNK_SIZE)]
+                try:
+                    digest = hashlib.sha256()
+                    for chunk in chunks:
+                        digest.update(chunk)
+                    path = self._path(digest.hexdigest(), ext)
+                    if self._touch(path):
+                        return path, False
+                    part = self._copy(chunks)
+                finally:
+                    for chunk in chunks:
+                        chunk.release()
+        else:
+            # Stream biasa: hash dihitung sambil menyalin, duplikat dibuang setelah selesai
+            source.seek(0)
+            digest = hashlib.sha256()
+            part = self._copy(iter(lambda: source.read(CHUNK_SIZE), b""), digest)
+            path = self._path(digest.hexdigest(), ext)
+            if self._touch(path):
+                os.remove(part)
+                return path, False
+
+        os.replace(part, path)
+        self.evict(keep=path)
+        return path, True
+
+    def _copy(self, chunks, digest=None):
+        """Menulis chunk ke file .part sementara (dihapus jika gagal). Mengembalikan path .part."""
+        part = os.path.join(self.directory, f"{os.getpid()}_{threading.get_ident()}.part")
+        try:
+            with open(part, "wb") as f:
+                for chunk in chunks:
+                    if digest is not None:
+                        digest.update(chunk)
+                    f.write(chunk)
+        except BaseException:
+            os.remove(part)
+            raise
+        return part
+
+    def _path(self, digest, ext):
+        return os.path.join(self.directory, digest + ext)
+
+    @staticmethod
+    def _touch(path):
+        """Menandai file sebagai baru dipakai (untuk urutan eviksi). False jika file belum ada."""
+        try:
+            os.utime(path)
+            return True
+        except FileNotFoundError:
+            return False
+
+    def evict(self, keep=None):
+        """Menghapus file paling lama dipakai sampai total ukuran <= max_bytes (file `keep` tidak dihapus)."""
+        with self._lock:
+            entries = []
+            for name in os.listdir(self.directory):
+                path = os.path.join(self.directory, name)
+                if name.endswith(".part") or not os.path.isfile(path):
+                    continue
+                stat = os.stat(path)
+                entries.append((stat.st_mtime, stat.st_size, path))
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                if path == keep:
+                    continue
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue  # Masih dibuka di Windows; dicoba lagi pada eviksi berikutnya
+                total -= size
+
+    def clear(self):
+        """Menghapus semua file di cache (kecuali .part yang mungkin masih ditulis)."""
+        with self._lock:
+            for name in os.listdir(self.directory):
+                if name.endswith(".part"):
+                    continue
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except OSError:
+                    pass
+
+def _process_alive(pid_text):
+    """False hanya jika pid pasti tidak berjalan. Di Windows (os.kill akan menghentikan proses) selalu True."""
+    try:
+        pid = int(pid_text)
+    except ValueError:
+        return True
+    if pid == os.getpid() or os.name == "nt":
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True  # Ada, tetapi milik user lain
+    return True